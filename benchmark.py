@@ -0,0 +1,224 @@
+"""
+Benchmarks for the Equipment Maintenance Notification System
+Generates synthetic fleets of increasing size and times the different code paths
+
+Usage:
+    python benchmark.py model [sizes...]
+    python benchmark.py parallel [sizes...]
+    python benchmark.py snapshot [sizes...]
+    python benchmark.py tasks [sizes...]
+"""
+
+import gc
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Callable
+
+from due_engine import DueTable
+from equipment_model import FREQUENCY_ORDER, equipment_from_json, schedule_last_date
+from equipment_snapshot import load_equipment_json, save_equipment_json, snapshot_path_for
+from equipment_store import JsonEquipmentStore
+from task_catalog import TaskCatalog, catalog_path_for
+from parallel_due import SHARD_BY_SERIAL_HASH, find_due_parallel
+
+
+DEFAULT_SIZES = [1000, 10000, 50000]
+
+LOCATIONS = ["Cleanroom", "Warehouse", "Sterilizer Cage", "Lab", "Packaging", "Assembly"]
+
+TASKS = [
+    "Clean the whole unit with Isopropyl alcohol",
+    "Check for leaks, dust, rust and light indicators of the equipment",
+    "Perform a diameter check (Refer to manual)",
+    "Perform an actuator force check (Refer to manual)",
+    "Perform a temperature check (Refer to manual)",
+    "Check for worn out tubing & manifold and leak from connectors, replace as needed",
+]
+
+
+def generate_fleet(size: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Build a synthetic equipment_data.json array with the same shape as the real one."""
+    rng = random.Random(seed)
+    fleet = []
+    for i in range(size):
+        last_date = date(2024, 1, 1) + timedelta(days=rng.randint(0, 700))
+        schedule = {}
+        for frequency in rng.sample(FREQUENCY_ORDER, rng.randint(1, 3)):
+            schedule[frequency] = {"tasks": rng.sample(TASKS, rng.randint(1, 4))}
+            if rng.random() < 0.5:
+                schedule[frequency]["last_maintenance_date"] = (last_date + timedelta(days=rng.randint(0, 90))).isoformat()
+        fleet.append({
+            "equipment_name": f"Equipment {i % 500}",
+            "manufacturer": f"Manufacturer {i % 40}",
+            "model": f"M-{i % 120}",
+            "serial_number": f"SN{i:08d}",
+            "location": rng.choice(LOCATIONS),
+            "last_maintenance_date": last_date.isoformat(),
+            "maintenance_schedule": schedule
+        })
+    return fleet
+
+
+def timed(func: Callable[[], Any], repeat: int = 3) -> float:
+    """Best wall-clock time of several runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def retained_memory(build: Callable[[], Any]) -> int:
+    """Bytes still allocated by the object build() returns, once temporaries are freed."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def bench_model(sizes: List[int]) -> None:
+    """Compare raw JSON dicts with the __slots__ Equipment model."""
+    print(f"{'fleet':>8} | {'dicts MB':>9} | {'model MB':>9} | {'dict dates ms':>13} | {'model dates ms':>14}")
+    print("-" * 66)
+    for size in sizes:
+        text = json.dumps(generate_fleet(size))
+
+        dict_memory = retained_memory(lambda: json.loads(text))
+        model_memory = retained_memory(lambda: equipment_from_json(json.loads(text)))
+
+        records = json.loads(text)
+        models = equipment_from_json(records)
+
+        def dict_dates():
+            # What every caller did before: fallback lookup plus strptime on each access
+            for equipment in records:
+                for frequency in equipment.get("maintenance_schedule", {}):
+                    datetime.strptime(schedule_last_date(equipment, frequency), "%Y-%m-%d")
+
+        def model_dates():
+            for equipment in models:
+                for frequency in equipment.schedule:
+                    equipment.last_date_for(frequency)
+
+        print(
+            f"{size:>8} | {dict_memory / 1e6:>9.1f} | {model_memory / 1e6:>9.1f} | "
+            f"{timed(dict_dates) * 1000:>13.1f} | {timed(model_dates) * 1000:>14.1f}"
+        )
+
+
+def bench_parallel(sizes: List[int]) -> None:
+    """Compare the single-process due check with sharded process-pool checks."""
+    worker_counts = [2, 4]
+    today = date.today()
+    header = f"{'fleet':>8} | {'1 process ms':>12}"
+    for workers in worker_counts:
+        header += f" | {f'{workers} workers ms':>13} | {'speedup':>7}"
+    print(header)
+    print("-" * len(header))
+
+    pools = {workers: ProcessPoolExecutor(max_workers=workers) for workers in worker_counts}
+    try:
+        for size in sizes:
+            fleet = generate_fleet(size)
+            single = timed(lambda: DueTable(fleet).due_items(today, 14))
+            line = f"{size:>8} | {single * 1000:>12.1f}"
+            for workers, pool in pools.items():
+                # Warm up the pool so process start-up is not measured
+                find_due_parallel(fleet[:100], today, 14, pool, SHARD_BY_SERIAL_HASH, workers * 2)
+                parallel = timed(lambda: find_due_parallel(fleet, today, 14, pool, SHARD_BY_SERIAL_HASH, workers * 2))
+                line += f" | {parallel * 1000:>13.1f} | {single / parallel:>6.2f}x"
+            print(line)
+    finally:
+        for pool in pools.values():
+            pool.shutdown()
+
+
+def bench_snapshot(sizes: List[int]) -> None:
+    """Compare loading equipment_data.json by parsing JSON with loading its binary snapshot."""
+    print(f"{'fleet':>8} | {'JSON MB':>8} | {'snapshot MB':>11} | {'JSON load ms':>12} | {'snapshot load ms':>16} | {'speedup':>7}")
+    print("-" * 79)
+    directory = tempfile.mkdtemp(prefix="bench_snapshot_")
+    try:
+        path = os.path.join(directory, "equipment_data.json")
+        for size in sizes:
+            save_equipment_json(path, generate_fleet(size))
+
+            def load(use_snapshot: bool):
+                # Both include reading the file; the snapshot load also hashes it for validation
+                with open(path, 'rb') as f:
+                    return load_equipment_json(path, f.read(), use_snapshot)
+
+            json_load = timed(lambda: load(False))
+            snapshot_load = timed(lambda: load(True))
+            print(
+                f"{size:>8} | {os.path.getsize(path) / 1e6:>8.1f} | "
+                f"{os.path.getsize(snapshot_path_for(path)) / 1e6:>11.1f} | "
+                f"{json_load * 1000:>12.1f} | {snapshot_load * 1000:>16.1f} | {json_load / snapshot_load:>6.2f}x"
+            )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def bench_tasks(sizes: List[int]) -> None:
+    """Compare file size and loaded memory of plain task lists with the task catalog format."""
+    print(f"{'fleet':>8} | {'plain MB':>8} | {'catalog MB':>10} | {'plain mem MB':>12} | {'catalog mem MB':>14} | "
+          f"{'plain load ms':>13} | {'catalog load ms':>15}")
+    print("-" * 110)
+    directory = tempfile.mkdtemp(prefix="bench_tasks_")
+    try:
+        plain = JsonEquipmentStore(os.path.join(directory, "plain.json"))
+        compact = JsonEquipmentStore(os.path.join(directory, "compact.json"))
+        catalog_path = catalog_path_for(compact.path)
+        for size in sizes:
+            fleet = generate_fleet(size)
+            plain.save_all(fleet)
+            TaskCatalog().save(catalog_path)
+            compact.save_all(fleet)
+
+            def load_plain():
+                with open(plain.path, 'r') as f:
+                    return json.load(f)
+
+            catalog_size = os.path.getsize(compact.path) + os.path.getsize(catalog_path)
+            print(
+                f"{size:>8} | {os.path.getsize(plain.path) / 1e6:>8.1f} | {catalog_size / 1e6:>10.1f} | "
+                f"{retained_memory(load_plain) / 1e6:>12.1f} | {retained_memory(compact.load_all) / 1e6:>14.1f} | "
+                f"{timed(load_plain) * 1000:>13.1f} | {timed(compact.load_all) * 1000:>15.1f}"
+            )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+BENCHMARKS = {
+    "model": bench_model,
+    "parallel": bench_parallel,
+    "snapshot": bench_snapshot,
+    "tasks": bench_tasks,
+}
+
+
+def main():
+    """Main entry point."""
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print("Usage:")
+        print(f"  python benchmark.py <{'|'.join(BENCHMARKS)}> [sizes...]")
+        return
+    sizes = [int(size) for size in sys.argv[2:]] or DEFAULT_SIZES
+    BENCHMARKS[sys.argv[1]](sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Vectorized due-date engine for the Equipment Maintenance Notification System
+Turns every (equipment, frequency) pair into NumPy datetime64 arrays so next due
+dates, days until due and due/overdue masks are computed in a few array operations
+"""
+
+from datetime import datetime, date, time
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+
+from equipment_model import FREQUENCY_LABELS, FREQUENCY_ORDER, schedule_last_date
+
+
+# Months added to the last maintenance date for each frequency
+FREQUENCY_MONTHS = {
+    "bi_annual": 6,
+    "annual": 12,
+    "monthly": 1,
+}
+
+
+# Due stages, from least to most urgent
+STAGE_OK = "ok"
+STAGE_DUE_SOON = "due_soon"
+STAGE_DUE_TODAY = "due_today"
+STAGE_OVERDUE = "overdue"
+STAGE_ORDER = [STAGE_OK, STAGE_DUE_SOON, STAGE_DUE_TODAY, STAGE_OVERDUE]
+
+# datetime.date's range (years 1-9999); NumPy goes further but converts such dates to ints
+MIN_DATE = np.datetime64(date.min, "D")
+MAX_DATE = np.datetime64(date.max, "D")
+
+
+def record_key(equipment: Dict[str, Any]) -> str:
+    """Stable key for one equipment record: its serial number, or its name if it has none."""
+    return str(equipment.get("serial_number") or equipment.get("equipment_name", "")).strip()
+
+
+def entry_key(equipment: Dict[str, Any], frequency: str) -> Tuple[str, str]:
+    """Stable key for one schedule entry: (record key, frequency)."""
+    return (record_key(equipment), frequency)
+
+
+def due_stage(days_until_due: int, alert_days_before: int) -> str:
+    """Classify an entry by how many days remain until it is due."""
+    if days_until_due < 0:
+        return STAGE_OVERDUE
+    if days_until_due == 0:
+        return STAGE_DUE_TODAY
+    if days_until_due <= alert_days_before:
+        return STAGE_DUE_SOON
+    return STAGE_OK
+
+
+def _looks_like_iso_date(date_str: Any) -> bool:
+    """Cheap check for strings NumPy can parse the same way as strptime('%Y-%m-%d')."""
+    return (
+        isinstance(date_str, str)
+        and len(date_str) == 10
+        and date_str[4] == "-"
+        and date_str[7] == "-"
+        and date_str[:4].isdigit()
+        and date_str[5:7].isdigit()
+        and date_str[8:].isdigit()
+    )
+
+
+def _within_date_range(dates: np.ndarray) -> np.ndarray:
+    """The dates, with NaT for any outside datetime.date's range."""
+    return np.where((dates >= MIN_DATE) & (dates <= MAX_DATE), dates, np.datetime64("NaT", "D"))
+
+
+def _parse_one(date_str: Any) -> np.datetime64:
+    """Parse a single date string, returning NaT if it is not a valid YYYY-MM-DD date."""
+    try:
+        return np.datetime64(datetime.strptime(date_str, "%Y-%m-%d").date(), "D")
+    except Exception as e:
+        print(f"Error checking due date: {e}")
+        return np.datetime64("NaT", "D")
+
+
+def parse_dates(date_strs: List[str]) -> np.ndarray:
+    """
+    Parse YYYY-MM-DD strings into a datetime64[D] array.
+    Invalid dates become NaT so they are never reported as due.
+    """
+    parsed = np.full(len(date_strs), np.datetime64("NaT", "D"), dtype="datetime64[D]")
+    fast_idx = [i for i, s in enumerate(date_strs) if _looks_like_iso_date(s)]
+    slow_idx = [i for i, s in enumerate(date_strs) if not _looks_like_iso_date(s)]
+
+    if fast_idx:
+        try:
+            parsed[fast_idx] = np.array([date_strs[i] for i in fast_idx], dtype="datetime64[D]")
+        except ValueError:
+            # At least one out-of-range value (e.g. month 13) - fall back to parsing one by one
+            slow_idx = sorted(slow_idx + fast_idx)
+
+    for i in slow_idx:
+        parsed[i] = _parse_one(date_strs[i])
+
+    # strptime rejects year 0, which NumPy accepts
+    return _within_date_range(parsed)
+
+
+def add_months(dates: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """
+    Add a number of months to each date.
+    Matches relativedelta: the day is clamped to the last day of the target month
+    (e.g. Aug 31 + 6 months = Feb 28/29). Results after 9999-12-31 are NaT, where
+    relativedelta would raise.
+    """
+    month_start = dates.astype("datetime64[M]")
+    day_offset = dates - month_start.astype("datetime64[D]")
+
+    target_month = month_start + months.astype("timedelta64[M]")
+    target_start = target_month.astype("datetime64[D]")
+    month_length = (target_month + np.timedelta64(1, "M")).astype("datetime64[D]") - target_start
+
+    return _within_date_range(target_start + np.minimum(day_offset, month_length - np.timedelta64(1, "D")))
+
+
+class DueTable:
+    """
+    All (equipment, frequency) schedule entries of a fleet, laid out as parallel arrays.
+    If a previous table is given, next due dates of entries whose last maintenance
+    date did not change are reused instead of being parsed and recomputed.
+    """
+
+    def __init__(self, equipment_list: List[Dict[str, Any]], previous: Optional["DueTable"] = None):
+        self.equipment: List[Dict[str, Any]] = []
+        self.frequencies: List[str] = []
+        self.tasks: List[List[str]] = []
+        self.last_dates: List[str] = []
+        # Position of each row's equipment in equipment_list
+        self.record_index: List[int] = []
+
+        for index, equipment in enumerate(equipment_list):
+            maintenance_schedule = equipment.get("maintenance_schedule", {})
+            for frequency in FREQUENCY_ORDER:
+                if frequency not in maintenance_schedule:
+                    continue
+                last_maintenance = schedule_last_date(equipment, frequency)
+                if not last_maintenance:
+                    continue
+                self.equipment.append(equipment)
+                self.frequencies.append(frequency)
+                self.tasks.append(maintenance_schedule[frequency]["tasks"])
+                self.last_dates.append(last_maintenance)
+                self.record_index.append(index)
+
+        self.next_due = np.full(len(self.frequencies), np.datetime64("NaT", "D"), dtype="datetime64[D]")
+        reused = {}
+        if previous is not None:
+            reused = {
+                previous.key(row): (previous.last_dates[row], previous.next_due[row])
+                for row in range(len(previous))
+            }
+
+        # Only entries that are new or whose last date changed need parsing and month arithmetic
+        if reused:
+            compute_rows = []
+            for row in range(len(self.frequencies)):
+                cached = reused.get(self.key(row))
+                if cached is not None and cached[0] == self.last_dates[row]:
+                    self.next_due[row] = cached[1]
+                else:
+                    compute_rows.append(row)
+        else:
+            compute_rows = list(range(len(self.frequencies)))
+        self.recomputed = len(compute_rows)
+
+        if compute_rows:
+            months = np.array([FREQUENCY_MONTHS[self.frequencies[row]] for row in compute_rows], dtype=np.int64)
+            last_dates = parse_dates([self.last_dates[row] for row in compute_rows])
+            self.next_due[compute_rows] = add_months(last_dates, months)
+
+    def __len__(self) -> int:
+        return len(self.frequencies)
+
+    def days_until_due(self, today: date) -> np.ndarray:
+        """Days from today until each entry is due (negative when overdue, NaT for invalid dates)."""
+        return self.next_due - np.datetime64(today, "D")
+
+    def masks(self, today: date, alert_days_before: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return (due_or_due_soon, overdue) boolean masks.
+        Entries with an unparseable last maintenance date are never flagged.
+        """
+        valid = ~np.isnat(self.next_due)
+        days = self.days_until_due(today)
+        due_or_due_soon = valid & (days <= np.timedelta64(alert_days_before, "D"))
+        overdue = valid & (days < np.timedelta64(0, "D"))
+        return due_or_due_soon, overdue
+
+    def key(self, row: int) -> Tuple[str, str]:
+        """Entry key of a row (see entry_key)."""
+        return entry_key(self.equipment[row], self.frequencies[row])
+
+    def next_due_date(self, row: int) -> Optional[date]:
+        """Next due date of a row as a date, or None if the last date could not be parsed."""
+        value = self.next_due[row]
+        if np.isnat(value):
+            return None
+        return value.astype(object)
+
+    def next_due_datetime(self, row: int) -> Optional[datetime]:
+        """Next due date of a row as a datetime (midnight), matching relativedelta's result type."""
+        next_due = self.next_due_date(row)
+        if next_due is None:
+            return None
+        return datetime.combine(next_due, time())
+
+    def due_item(self, row: int) -> Dict[str, Any]:
+        """Build a single due_items entry for a row."""
+        return {
+            "equipment": self.equipment[row],
+            "frequency": FREQUENCY_LABELS[self.frequencies[row]],
+            "tasks": self.tasks[row],
+            "last_maintenance_date": self.last_dates[row],
+            "next_due_date": self.next_due_datetime(row)
+        }
+
+    def due_rows(self, today: date, alert_days_before: int, rows: Optional[List[int]] = None) -> List[int]:
+        """
+        Rows inside the alert window, in table order.
+        If rows is given, only those rows are considered.
+        """
+        due_mask, _ = self.masks(today, alert_days_before)
+        if rows is not None:
+            selected = np.zeros(len(self), dtype=bool)
+            selected[list(rows)] = True
+            due_mask &= selected
+        return np.flatnonzero(due_mask).tolist()
+
+    def due_items(self, today: date, alert_days_before: int, rows: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """Build the checker's due_items list for entries inside the alert window (see due_rows)."""
+        due_rows = self.due_rows(today, alert_days_before, rows)
+        # Convert all due dates in one call rather than one NumPy scalar at a time
+        next_due_dates = self.next_due[due_rows].astype(object)
+        midnight = time()
+        return [
+            {
+                "equipment": self.equipment[row],
+                "frequency": FREQUENCY_LABELS[self.frequencies[row]],
+                "tasks": self.tasks[row],
+                "last_maintenance_date": self.last_dates[row],
+                "next_due_date": datetime.combine(next_due, midnight)
+            }
+            for row, next_due in zip(due_rows, next_due_dates)
+        ]
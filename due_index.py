@@ -0,0 +1,209 @@
+"""
+Persistent next-due index
+A precomputed list of every schedule entry sorted by next due date, stored next to
+the equipment store's file, so questions like "what is overdue" or "what is due in the
+next 14 days" are answered with a binary search instead of a full scan
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import threading
+from datetime import date, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+
+from due_engine import DueTable, FREQUENCY_ORDER, record_key
+from file_lock import atomic_write_json
+
+
+def index_path_for(equipment_file: str) -> str:
+    """Path of the next-due index that belongs to an equipment data file (or database)."""
+    base, _ = os.path.splitext(equipment_file)
+    return f"{base}.due_index.json"
+
+
+def file_sha256(path: str) -> Optional[str]:
+    """SHA-256 of a file's content, or None if it cannot be read."""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _stamp_value(stamp: Any) -> Any:
+    """A store stamp as it reads back from the index file (tuples become lists), or None."""
+    try:
+        return json.loads(json.dumps(stamp))
+    except (TypeError, ValueError):
+        return None
+
+
+def _sort_key(entry: Dict[str, Any]) -> tuple:
+    """Entries are ordered by next due date, then equipment, then frequency."""
+    return (entry["next_due_date"], entry["key"], FREQUENCY_ORDER.index(entry["frequency"]))
+
+
+# Index file path -> (file stamp, index) of the last load, so repeated queries skip parsing
+_loaded: Dict[str, Tuple[Any, "DueIndex"]] = {}
+_loaded_lock = threading.Lock()
+
+
+class DueIndex:
+    """Schedule entries sorted by next due date, with O(log n) range lookups."""
+
+    def __init__(self, entries: Optional[List[Dict[str, Any]]] = None, source_version: Optional[str] = None,
+                 source_stamp: Any = None, presorted: bool = False):
+        # Saved indexes are already in order
+        self.entries = list(entries or []) if presorted else sorted(entries or [], key=_sort_key)
+        self.source_version = source_version
+        # store.stamp() of the data the index was built from: a cheap freshness check before hashing
+        self.source_stamp = source_stamp
+        # Sort keys kept in a parallel list for bisect
+        self._keys = [_sort_key(entry) for entry in self.entries]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def _entries_for(due_table: DueTable, rows: List[int]) -> List[Dict[str, Any]]:
+        """Index entries for the given DueTable rows (rows with invalid dates are skipped)."""
+        entries = []
+        for row in rows:
+            next_due = due_table.next_due_date(row)
+            if next_due is None:
+                continue
+            equipment = due_table.equipment[row]
+            entries.append({
+                "next_due_date": next_due.isoformat(),
+                "key": due_table.key(row)[0],
+                "frequency": due_table.frequencies[row],
+                "equipment_name": equipment.get("equipment_name", "Unknown"),
+                "serial_number": equipment.get("serial_number", ""),
+                "location": equipment.get("location", ""),
+                "last_maintenance_date": due_table.last_dates[row]
+            })
+        return entries
+
+    @classmethod
+    def build(cls, equipment_list: List[Dict[str, Any]], source_version: Optional[str] = None) -> "DueIndex":
+        """Build the index from equipment data."""
+        due_table = DueTable(equipment_list)
+        return cls(cls._entries_for(due_table, list(range(len(due_table)))), source_version)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["DueIndex"]:
+        """Load an index file, or return None if it is missing or unreadable."""
+        try:
+            with open(path, 'r') as f:
+                raw = json.load(f)
+            return cls(raw["entries"], raw.get("source_version"), raw.get("source_stamp"), presorted=True)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    @classmethod
+    def _load_cached(cls, path: str) -> Optional["DueIndex"]:
+        """load(), reusing the index parsed by an earlier query while the file is unchanged."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        file_stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with _loaded_lock:
+            cached = _loaded.get(path)
+        if cached is not None and cached[0] == file_stamp:
+            return cached[1]
+        index = cls.load(path)
+        if index is not None:
+            with _loaded_lock:
+                _loaded[path] = (file_stamp, index)
+        return index
+
+    @classmethod
+    def load_or_build(cls, store, equipment_list: Optional[List[Dict[str, Any]]] = None) -> "DueIndex":
+        """
+        Load the index for an equipment store, rebuilding and saving it if it is missing
+        or was built from a different version of the data. Freshness is checked with the
+        store's stamp; the data version (a hash for JSON files) is only computed when the
+        stamp differs. The returned index is shared and must not be modified.
+        """
+        path = index_path_for(store.path)
+        stamp = _stamp_value(store.stamp())
+        index = cls._load_cached(path)
+        if index is not None and stamp is not None and index.source_stamp == stamp:
+            return index
+
+        current_version = store.version()
+        if index is not None and index.source_version == current_version:
+            # Same data under a new stamp (e.g. the file was touched): remember the stamp
+            index = cls(index.entries, current_version, stamp, presorted=True)
+            index.save(path)
+            return index
+
+        if equipment_list is None:
+            try:
+                equipment_list = store.load_all()
+            except (OSError, ValueError):
+                equipment_list = []
+        index = cls.build(equipment_list, current_version)
+        index.source_stamp = stamp
+        index.save(path)
+        return index
+
+    def save(self, path: str) -> None:
+        """Write the index to disk."""
+        try:
+            atomic_write_json(path, {"source_version": self.source_version, "source_stamp": self.source_stamp,
+                                     "entries": self.entries}, indent=None)
+        except OSError as e:
+            print(f"Warning: Could not save due index {path}: {e}")
+
+    def update_equipment(self, equipment: Dict[str, Any]) -> None:
+        """Replace the entries of one equipment record in place (e.g. after a completion)."""
+        key = record_key(equipment)
+        keep = [i for i, entry in enumerate(self.entries) if entry["key"] != key]
+        if len(keep) != len(self.entries):
+            self.entries = [self.entries[i] for i in keep]
+            self._keys = [self._keys[i] for i in keep]
+
+        due_table = DueTable([equipment])
+        for entry in self._entries_for(due_table, list(range(len(due_table)))):
+            sort_key = _sort_key(entry)
+            position = bisect.bisect_left(self._keys, sort_key)
+            self._keys.insert(position, sort_key)
+            self.entries.insert(position, entry)
+
+    def between(self, start: Optional[date], end: Optional[date]) -> List[Dict[str, Any]]:
+        """Entries with start <= next due date <= end (either bound may be None)."""
+        low = 0 if start is None else bisect.bisect_left(self._keys, (start.isoformat(),))
+        high = len(self._keys) if end is None else bisect.bisect_left(self._keys, ((end + timedelta(days=1)).isoformat(),))
+        return self.entries[low:high]
+
+    def overdue(self, today: date) -> List[Dict[str, Any]]:
+        """Entries whose next due date is before today."""
+        return self.between(None, today - timedelta(days=1))
+
+    def due_within(self, days: int, today: date, include_overdue: bool = True) -> List[Dict[str, Any]]:
+        """Entries due within the next `days` days (and overdue ones unless include_overdue is False)."""
+        # Stay within the date range (between() looks one day past the end)
+        days = min(days, (date.max - today).days - 1)
+        return self.between(None if include_overdue else today, today + timedelta(days=days))
+
+
+def update_due_index(store, data: Optional[List[Dict[str, Any]]], changed: List[Dict[str, Any]], previous_version: Optional[str]) -> None:
+    """
+    Keep the index in step with changes to a few equipment records that were just saved.
+    The index is updated in place if it matched the store before the write,
+    otherwise it is rebuilt from the saved data (loaded from the store if not given).
+    """
+    path = index_path_for(store.path)
+    index = DueIndex.load(path)
+    if index is not None and index.source_version == previous_version:
+        for equipment in changed:
+            index.update_equipment(equipment)
+    else:
+        index = DueIndex.build(data if data is not None else store.load_all())
+    index.source_version = store.version()
+    index.source_stamp = _stamp_value(store.stamp())
+    index.save(path)
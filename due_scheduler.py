@@ -0,0 +1,105 @@
+"""
+Event-driven due-date scheduler
+Keeps a min-heap of the next due-status transition of every schedule entry
+(enters alert window, due today, becomes overdue) so the checker can sleep
+exactly until something changes and only re-evaluate the affected items
+"""
+
+import heapq
+import itertools
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from due_engine import DueTable, STAGE_DUE_SOON, STAGE_DUE_TODAY, STAGE_OVERDUE
+
+
+class DueScheduler:
+    """Min-heap of upcoming due-status transitions keyed by schedule entry."""
+
+    def __init__(self, alert_days_before: int = 14):
+        self.alert_days_before = alert_days_before
+        # Heap items: (transition_date, sequence, key, version, stage)
+        self._heap: List[Tuple[date, int, Tuple[str, str], int, str]] = []
+        self._sequence = itertools.count()
+        # key -> (version, next_due_date); heap items with an older version are stale
+        self._entries: Dict[Tuple[str, str], Tuple[int, date]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _transitions(self, next_due: date) -> List[Tuple[date, str]]:
+        """Dates on which an entry due on next_due changes stage."""
+        return [
+            (next_due - timedelta(days=self.alert_days_before), STAGE_DUE_SOON),
+            (next_due, STAGE_DUE_TODAY),
+            (next_due + timedelta(days=1), STAGE_OVERDUE),
+        ]
+
+    def schedule(self, key: Tuple[str, str], next_due: date, today: date) -> None:
+        """Add or re-key an entry, pushing only the transitions that are still ahead of today."""
+        version = self._entries[key][0] + 1 if key in self._entries else 0
+        self._entries[key] = (version, next_due)
+        for transition_date, stage in self._transitions(next_due):
+            if transition_date > today:
+                heapq.heappush(self._heap, (transition_date, next(self._sequence), key, version, stage))
+
+    def remove(self, key: Tuple[str, str]) -> None:
+        """Forget an entry. Its heap items become stale and are skipped lazily."""
+        self._entries.pop(key, None)
+
+    def _drop_stale(self) -> None:
+        """Pop heap items that belong to removed or re-keyed entries."""
+        while self._heap:
+            _, _, key, version, _ = self._heap[0]
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                return
+            heapq.heappop(self._heap)
+
+    def next_transition(self) -> Optional[date]:
+        """Date of the next pending transition, or None if nothing is scheduled."""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def next_wakeup(self) -> Optional[datetime]:
+        """Local midnight at which the next transition happens."""
+        transition_date = self.next_transition()
+        if transition_date is None:
+            return None
+        return datetime.combine(transition_date, time())
+
+    def pop_transitions(self, today: date) -> Set[Tuple[str, str]]:
+        """Pop every transition that has happened by today and return the affected keys."""
+        changed = set()
+        while True:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > today:
+                return changed
+            _, _, key, _, _ = heapq.heappop(self._heap)
+            changed.add(key)
+
+    def sync(self, due_table: DueTable, today: date) -> Set[Tuple[str, str]]:
+        """
+        Bring the heap in line with a (re)loaded DueTable.
+        Entries whose next due date changed (e.g. a completion was recorded) are
+        re-keyed, new entries are added and missing ones removed.
+        Returns the keys that were added or re-keyed.
+        """
+        changed = set()
+        seen = set()
+        for row in range(len(due_table)):
+            next_due = due_table.next_due_date(row)
+            if next_due is None:
+                continue
+            key = due_table.key(row)
+            seen.add(key)
+            entry = self._entries.get(key)
+            if entry is None or entry[1] != next_due:
+                self.schedule(key, next_due, today)
+                changed.add(key)
+
+        for key in list(self._entries):
+            if key not in seen:
+                self.remove(key)
+
+        return changed
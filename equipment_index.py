@@ -0,0 +1,212 @@
+"""
+In-memory equipment lookup index
+Dicts keyed by normalized serial number and equipment name, built once per data
+version and shared by the CLI, the Slack bot and the Excel updater, so exact
+lookups are O(1) instead of a scan that lowercases every record. A trigram index
+over name, manufacturer, model and location ranks fuzzy matches for the Slack bot
+"""
+
+import copy
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple
+
+# Fields covered by fuzzy search, with the weight of a trigram match in each
+SEARCH_FIELDS = [
+    ("equipment_name", 1.0),
+    ("model", 0.7),
+    ("manufacturer", 0.6),
+    ("location", 0.5),
+]
+
+
+def normalize_key(value: Any) -> str:
+    """Lookup key for a name or serial number: trimmed and case-insensitive."""
+    return str(value or "").strip().lower()
+
+
+def trigrams(text: str) -> set:
+    """Trigrams of each word, padded so that prefixes of a word match too ("crimper" -> "  c", " cr", "cri", ...)."""
+    grams = set()
+    for word in normalize_key(text).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class EquipmentIndex:
+    """Exact-match lookups over one version of the equipment data."""
+
+    def __init__(self, equipment_list: List[Dict[str, Any]], stamp: Any = None):
+        self.equipment = equipment_list
+        # Data version the index was built from (see get_equipment_index)
+        self.stamp = stamp
+        self.by_serial: Dict[str, Dict[str, Any]] = {}
+        # Several pieces of equipment can share a name
+        self.by_name: Dict[str, List[Dict[str, Any]]] = {}
+        # (normalized name, record) in file order, for substring searches
+        self.names: List[Tuple[str, Dict[str, Any]]] = []
+        for equipment in equipment_list:
+            serial = normalize_key(equipment.get("serial_number"))
+            if serial:
+                # First record wins, like a linear scan
+                self.by_serial.setdefault(serial, equipment)
+            name = normalize_key(equipment.get("equipment_name"))
+            self.by_name.setdefault(name, []).append(equipment)
+            self.names.append((name, equipment))
+        # Built on the first fuzzy search: trigram -> {record position: best field weight}
+        self._trigrams: Optional[Dict[str, Dict[int, float]]] = None
+        # Built on the first update (see replaced): id(record) -> record position
+        self._positions: Optional[Dict[int, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.equipment)
+
+    def get_by_serial(self, serial_number: str) -> Optional[Dict[str, Any]]:
+        """Equipment with this serial number, or None."""
+        return self.by_serial.get(normalize_key(serial_number))
+
+    def get_by_name(self, equipment_name: str) -> List[Dict[str, Any]]:
+        """All equipment with this name, in file order."""
+        return self.by_name.get(normalize_key(equipment_name), [])
+
+    def find(self, equipment_name: str, serial_number: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """First equipment with this name (and serial number, if given)."""
+        for equipment in self.get_by_name(equipment_name):
+            if serial_number is None or normalize_key(equipment.get("serial_number")) == normalize_key(serial_number):
+                return equipment
+        return None
+
+    def _trigram_index(self) -> Dict[str, Dict[int, float]]:
+        """Trigram postings over SEARCH_FIELDS, built once per index."""
+        if self._trigrams is None:
+            postings: Dict[str, Dict[int, float]] = {}
+            for position, equipment in enumerate(self.equipment):
+                for field, weight in SEARCH_FIELDS:
+                    for gram in trigrams(equipment.get(field)):
+                        entry = postings.setdefault(gram, {})
+                        if entry.get(position, 0.0) < weight:
+                            entry[position] = weight
+            self._trigrams = postings
+        return self._trigrams
+
+    def replaced(self, updates: List[Tuple[Dict[str, Any], Dict[str, Any]]], stamp: Any) -> "EquipmentIndex":
+        """
+        Copy of the index with some records swapped for updated versions, given as (indexed
+        record, new record) pairs. Only for updates that change no indexed or searched field
+        (e.g. a completion date): references are copied, nothing is re-parsed or re-keyed,
+        and the trigram postings are shared.
+        """
+        if self._positions is None:
+            self._positions = {id(equipment): position for position, equipment in enumerate(self.equipment)}
+        index = copy.copy(self)
+        index.stamp = stamp
+        index.equipment = list(self.equipment)
+        index.by_serial = dict(self.by_serial)
+        index.by_name = dict(self.by_name)
+        index.names = list(self.names)
+        index._positions = dict(self._positions)
+        for old, new in updates:
+            position = index._positions.pop(id(old))
+            index._positions[id(new)] = position
+            index.equipment[position] = new
+            name = index.names[position][0]
+            index.names[position] = (name, new)
+            index.by_name[name] = [new if equipment is old else equipment for equipment in index.by_name[name]]
+            serial = normalize_key(old.get("serial_number"))
+            if index.by_serial.get(serial) is old:
+                index.by_serial[serial] = new
+        return index
+
+    def search(self, query: str, limit: int = 5, min_score: float = 0.6,
+               budget_ms: float = 50.0) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Equipment ranked by how well name, model, manufacturer and location match the
+        query: (score, equipment) pairs, best first. The score is the weighted share of
+        the query's trigrams found in the record (1.0 = all of them in the name).
+        Rare trigrams are counted first; when budget_ms runs out the remaining ones are
+        skipped and the ranking uses what was counted so far.
+        """
+        grams = trigrams(query)
+        if not grams:
+            return []
+        postings = self._trigram_index()
+        deadline = time.perf_counter() + budget_ms / 1000.0
+        scores: Dict[int, float] = {}
+        for gram in sorted(grams, key=lambda g: len(postings.get(g, ()))):
+            for position, weight in postings.get(gram, {}).items():
+                scores[position] = scores.get(position, 0.0) + weight
+            if time.perf_counter() > deadline:
+                break
+
+        query_key = normalize_key(query)
+        ranked = []
+        for position, total in scores.items():
+            score = total / len(grams)
+            if score < min_score:
+                continue
+            name = self.names[position][0]
+            # Ties go to names starting with / containing the query, then to file order
+            ranked.append((-score, not name.startswith(query_key), query_key not in name, position))
+        ranked.sort()
+        return [(-key[0], self.equipment[key[3]]) for key in ranked[:limit]]
+
+
+# Store path -> index of the latest data version seen in this process
+_indexes: Dict[str, EquipmentIndex] = {}
+_indexes_lock = threading.Lock()
+# Held while loading data for an index, so concurrent requests wait for one load instead of each reading the file
+_build_lock = threading.Lock()
+
+
+def get_equipment_index(store) -> EquipmentIndex:
+    """
+    Index for the store's current data, rebuilt only when the store's stamp changes.
+    Safe to call from the Slack bot's request threads. Raises the store's load errors.
+    The indexed records are shared between callers and must not be modified.
+    """
+    stamp = store.stamp()
+    with _indexes_lock:
+        index = _indexes.get(store.path)
+    if index is not None and index.stamp == stamp:
+        return index
+
+    with _build_lock:
+        # Another thread may have loaded the same version while this one waited
+        stamp = store.stamp()
+        with _indexes_lock:
+            index = _indexes.get(store.path)
+        if index is not None and index.stamp == stamp:
+            return index
+        index = EquipmentIndex(store.load_all(), stamp)
+        with _indexes_lock:
+            _indexes[store.path] = index
+    return index
+
+
+def prime_equipment_index(store, equipment_list: List[Dict[str, Any]]) -> None:
+    """
+    Write-through: index data the caller has just saved, so the next lookup does not
+    read it back. The caller must hold the store's lock (the stamp must match the data).
+    """
+    index = EquipmentIndex(equipment_list, store.stamp())
+    with _indexes_lock:
+        _indexes[store.path] = index
+
+
+def cached_equipment_index(store, stamp: Any) -> Optional[EquipmentIndex]:
+    """Index already built in this process for this stamp of the store's data, or None (never loads)."""
+    with _indexes_lock:
+        index = _indexes.get(store.path)
+    return index if index is not None and index.stamp == stamp else None
+
+
+def replace_in_equipment_index(store, index: EquipmentIndex, updates: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> None:
+    """
+    Write-through for a few updated records (see EquipmentIndex.replaced), so the next
+    lookup does not reload the data. index must be the one cached for the data as it was
+    before the write, and the caller must hold the store's lock.
+    """
+    updated = index.replaced(updates, store.stamp())
+    with _indexes_lock:
+        _indexes[store.path] = updated
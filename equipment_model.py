@@ -0,0 +1,213 @@
+"""
+Typed equipment model
+Compact __slots__ classes for equipment records and their maintenance schedules.
+Dates are parsed once at load time and the fallback from a schedule's own
+last_maintenance_date to the equipment's top-level one lives in one place.
+Serializes back to the same JSON structure as equipment_data.json.
+"""
+
+import json
+from datetime import date, datetime
+from typing import List, Dict, Any, Optional
+
+
+# Display names of the maintenance frequencies
+FREQUENCY_LABELS = {
+    "bi_annual": "Bi-Annual",
+    "annual": "Annual",
+    "monthly": "Monthly",
+}
+
+# Order in which frequencies are reported for each equipment
+FREQUENCY_ORDER = ["bi_annual", "annual", "monthly"]
+
+
+def _parse_date(value: Any) -> Optional[date]:
+    """Parse a YYYY-MM-DD string, returning None if it is missing or invalid."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _date_fields(value: Any):
+    """
+    Split a date field into (parsed date, raw value to keep).
+    The raw value is only kept when it would not survive a round trip through the date.
+    """
+    parsed = _parse_date(value)
+    if parsed is not None and parsed.isoformat() == value:
+        return parsed, None
+    return parsed, value
+
+
+def schedule_last_date(equipment: Dict[str, Any], frequency: str) -> Optional[str]:
+    """
+    Last maintenance date string for one frequency of a raw equipment dict:
+    the schedule's own date, falling back to the equipment's top-level date.
+    """
+    schedule = equipment.get("maintenance_schedule", {}).get(frequency, {})
+    return schedule.get("last_maintenance_date") or equipment.get("last_maintenance_date")
+
+
+class ScheduleEntry:
+    """One maintenance frequency of an equipment record."""
+
+    __slots__ = ("frequency", "tasks", "last_date", "_raw_last_date", "extra")
+
+    def __init__(self, frequency: str, tasks: List[str], last_date: Optional[date] = None):
+        self.frequency = frequency
+        self.tasks = tasks
+        self.last_date = last_date
+        self._raw_last_date = None
+        # Unknown JSON keys, kept for round-tripping (None if there are none, to save memory)
+        self.extra: Optional[Dict[str, Any]] = None
+
+    @property
+    def label(self) -> str:
+        """Display name, e.g. "Bi-Annual"."""
+        return FREQUENCY_LABELS.get(self.frequency, self.frequency)
+
+    @classmethod
+    def from_dict(cls, frequency: str, data: Dict[str, Any]) -> "ScheduleEntry":
+        """Build an entry from its maintenance_schedule JSON object."""
+        entry = cls(frequency, data.get("tasks", []))
+        if "last_maintenance_date" in data:
+            entry.last_date, entry._raw_last_date = _date_fields(data["last_maintenance_date"])
+        entry.extra = {k: v for k, v in data.items() if k not in ("tasks", "last_maintenance_date")} or None
+        return entry
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize back to the maintenance_schedule JSON object."""
+        data: Dict[str, Any] = {"tasks": list(self.tasks)}
+        if self.last_date is not None or self._raw_last_date is not None:
+            data["last_maintenance_date"] = self._raw_last_date if self._raw_last_date is not None else self.last_date.isoformat()
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+class Equipment:
+    """One piece of equipment and its maintenance schedule."""
+
+    __slots__ = (
+        "equipment_name", "manufacturer", "model", "serial_number", "location",
+        "last_date", "_raw_last_date", "schedule", "extra"
+    )
+
+    # Plain string fields, in the order they appear in equipment_data.json
+    _TEXT_FIELDS = ("equipment_name", "manufacturer", "model", "serial_number", "location")
+
+    def __init__(
+        self,
+        equipment_name: str,
+        manufacturer: Optional[str] = None,
+        model: Optional[str] = None,
+        serial_number: Optional[str] = None,
+        location: Optional[str] = None,
+        last_date: Optional[date] = None
+    ):
+        self.equipment_name = equipment_name
+        self.manufacturer = manufacturer
+        self.model = model
+        self.serial_number = serial_number
+        self.location = location
+        self.last_date = last_date
+        self._raw_last_date = None
+        # Frequency -> ScheduleEntry, in file order
+        self.schedule: Dict[str, ScheduleEntry] = {}
+        # Unknown JSON keys, kept for round-tripping (None if there are none, to save memory)
+        self.extra: Optional[Dict[str, Any]] = None
+
+    def __repr__(self) -> str:
+        return f"Equipment({self.equipment_name!r}, serial_number={self.serial_number!r})"
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Equipment":
+        """Build an Equipment from one equipment_data.json record."""
+        equipment = cls(data.get("equipment_name"))
+        for field in ("manufacturer", "model", "serial_number", "location"):
+            setattr(equipment, field, data.get(field))
+        if "last_maintenance_date" in data:
+            equipment.last_date, equipment._raw_last_date = _date_fields(data["last_maintenance_date"])
+        equipment.schedule = {
+            frequency: ScheduleEntry.from_dict(frequency, entry)
+            for frequency, entry in data.get("maintenance_schedule", {}).items()
+        }
+        known = set(cls._TEXT_FIELDS) | {"last_maintenance_date", "maintenance_schedule"}
+        equipment.extra = {k: v for k, v in data.items() if k not in known} or None
+        return equipment
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize back to the equipment_data.json record format."""
+        data: Dict[str, Any] = {}
+        for field in self._TEXT_FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                data[field] = value
+        if self.last_date is not None or self._raw_last_date is not None:
+            data["last_maintenance_date"] = self._raw_last_date if self._raw_last_date is not None else self.last_date.isoformat()
+        data["maintenance_schedule"] = {frequency: entry.to_dict() for frequency, entry in self.schedule.items()}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def last_date_for(self, frequency: str) -> Optional[date]:
+        """Last maintenance date of a frequency, falling back to the equipment's general date."""
+        entry = self.schedule.get(frequency)
+        if entry is not None and entry.last_date is not None:
+            return entry.last_date
+        if entry is not None and entry._raw_last_date:
+            # Present but unparseable - do not silently fall back
+            return None
+        return self.last_date
+
+    def last_date_display(self, frequency: str, date_format: str = "%Y-%m-%d") -> str:
+        """Last maintenance date of a frequency formatted for display ("N/A" if unknown)."""
+        last_date = self.last_date_for(frequency)
+        if last_date is not None:
+            return last_date.strftime(date_format)
+        entry = self.schedule.get(frequency)
+        raw = (entry._raw_last_date if entry is not None else None) or self._raw_last_date
+        return raw or "N/A"
+
+    def frequencies(self) -> List[str]:
+        """Scheduled frequencies in reporting order (bi-annual, annual, monthly)."""
+        return [frequency for frequency in FREQUENCY_ORDER if frequency in self.schedule]
+
+    def set_last_date(self, frequency: str, last_date: date) -> None:
+        """
+        Record a completion. Also updates the general date when this is the
+        equipment's only schedule (for backward compatibility).
+        """
+        entry = self.schedule[frequency]
+        entry.last_date = last_date
+        entry._raw_last_date = None
+        if list(self.schedule.keys()) == [frequency]:
+            self.last_date = last_date
+            self._raw_last_date = None
+
+
+def equipment_from_json(data: List[Dict[str, Any]]) -> List[Equipment]:
+    """Convert a parsed equipment_data.json array into Equipment objects."""
+    return [Equipment.from_dict(record) for record in data]
+
+
+def equipment_to_json(equipment_list: List[Equipment]) -> List[Dict[str, Any]]:
+    """Convert Equipment objects back into the equipment_data.json array."""
+    return [equipment.to_dict() for equipment in equipment_list]
+
+
+def load_equipment_models(filename: str = "equipment_data.json") -> List[Equipment]:
+    """Load equipment_data.json as Equipment objects (empty list if missing or invalid)."""
+    try:
+        with open(filename, 'r') as f:
+            return equipment_from_json(json.load(f))
+    except FileNotFoundError:
+        print(f"Error: {filename} not found!")
+        return []
+    except json.JSONDecodeError:
+        print(f"Error: Invalid JSON in {filename}!")
+        return []
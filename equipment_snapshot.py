@@ -0,0 +1,84 @@
+"""
+Binary snapshot of equipment_data.json
+A marshal-encoded copy of the equipment list written next to the JSON file and
+tagged with the SHA-256 of the JSON content it was made from. Loading it skips
+JSON parsing; if the JSON file changed since (hash mismatch), the JSON is parsed
+as before and the snapshot is rewritten
+"""
+
+import gc
+import hashlib
+import json
+import marshal
+import os
+from typing import List, Dict, Any, Optional
+
+from file_lock import atomic_write_bytes, atomic_write_json
+
+# Includes the marshal format version: snapshots written by another Python are ignored
+SNAPSHOT_MAGIC = b"EQSNAP\x01" + bytes([marshal.version])
+DIGEST_SIZE = 32
+
+
+def snapshot_path_for(equipment_file: str) -> str:
+    """Path of the binary snapshot that belongs to an equipment data file."""
+    base, _ = os.path.splitext(equipment_file)
+    return f"{base}.snapshot.bin"
+
+
+def write_snapshot(equipment_file: str, data: List[Dict[str, Any]], source: bytes) -> None:
+    """Write the snapshot of data, which was parsed from (or saved as) the JSON content source."""
+    digest = hashlib.sha256(source).digest()
+    atomic_write_bytes(snapshot_path_for(equipment_file), SNAPSHOT_MAGIC + digest + marshal.dumps(data))
+
+
+def read_snapshot(equipment_file: str, source: bytes) -> Optional[List[Dict[str, Any]]]:
+    """Equipment data from the snapshot if it was made from the JSON content source, else None."""
+    try:
+        with open(snapshot_path_for(equipment_file), 'rb') as f:
+            content = f.read()
+    except OSError:
+        return None
+    header_size = len(SNAPSHOT_MAGIC) + DIGEST_SIZE
+    if content[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        return None
+    if content[len(SNAPSHOT_MAGIC):header_size] != hashlib.sha256(source).digest():
+        return None
+    # The data has no reference cycles; collections triggered by the many new
+    # containers would only slow the load down (by about 3x for large fleets)
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return marshal.loads(memoryview(content)[header_size:])
+    except (EOFError, ValueError, TypeError):
+        return None
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def load_equipment_json(equipment_file: str, source: bytes, use_snapshot: bool = True) -> List[Dict[str, Any]]:
+    """
+    Parse the JSON content of equipment_file, from its snapshot when that is current.
+    A missing or stale snapshot is rewritten for the next load.
+    """
+    if not use_snapshot:
+        return json.loads(source)
+    data = read_snapshot(equipment_file, source)
+    if data is None:
+        data = json.loads(source)
+        try:
+            write_snapshot(equipment_file, data, source)
+        except OSError:
+            pass
+    return data
+
+
+def save_equipment_json(equipment_file: str, data: List[Dict[str, Any]], use_snapshot: bool = True) -> None:
+    """Atomically write equipment_file (caller holds its lock), and its snapshot if enabled."""
+    source = atomic_write_json(equipment_file, data)
+    if use_snapshot:
+        try:
+            write_snapshot(equipment_file, data, source)
+        except OSError:
+            pass
@@ -0,0 +1,963 @@
+"""
+Pluggable equipment storage
+The checker, the Slack bot and the CLI read and update equipment through a store
+instead of opening equipment_data.json directly. Available backends:
+
+- json:    equipment_data.json (default, unchanged file format)
+- journal: equipment_data.json as a snapshot plus an append-only completion log,
+           compacted into the snapshot periodically; keeps the full completion history
+- sqlite:  indexed equipment/schedule/task tables, single-row updates in transactions
+- sharded: one JSON file per location (or serial number hash range) plus a manifest,
+           in equipment_data.shards/; an update rewrites only one shard
+
+Select the backend with "storage_backend" in config.json ("sqlite_database" sets the
+database path, "journal_compact_events" the journal length that triggers compaction).
+Import/export between JSON and SQLite, and split/merge between JSON and shards:
+
+    python equipment_store.py import [equipment_data.json] [equipment.db]
+    python equipment_store.py export [equipment.db] [equipment_data.json]
+    python equipment_store.py split [location|serial_hash] [shard_count]
+    python equipment_store.py merge
+"""
+
+import contextlib
+import copy
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Tuple
+
+from due_index import file_sha256, update_due_index
+from equipment_index import cached_equipment_index, get_equipment_index, prime_equipment_index, replace_in_equipment_index
+from equipment_stream import iter_equipment
+from equipment_snapshot import load_equipment_json, save_equipment_json
+from file_lock import FileLock, atomic_write_json
+from maintenance_history import CompletionHistory, completion_entry, history_dir_for
+from parallel_due import SHARD_BY_LOCATION, SHARD_BY_SERIAL_HASH, shard_key
+from task_catalog import compact_tasks, expand_tasks
+
+
+DEFAULT_EQUIPMENT_FILE = "equipment_data.json"
+DEFAULT_SQLITE_DATABASE = "equipment.db"
+DEFAULT_JOURNAL_COMPACT_EVENTS = 500
+
+# (equipment record, frequency, YYYY-MM-DD date, user) of one completed maintenance
+Completion = Tuple[Dict[str, Any], str, str, Optional[str]]
+
+# Equipment fields stored in their own columns, in equipment_data.json order
+EQUIPMENT_FIELDS = ["equipment_name", "manufacturer", "model", "serial_number", "location", "last_maintenance_date"]
+
+
+def _load_config(config_file: str = "config.json") -> Dict[str, Any]:
+    """Read config.json, returning an empty config if it is missing or invalid."""
+    try:
+        with open(config_file, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _matches(equipment: Dict[str, Any], equipment_name: str, serial_number: Optional[str]) -> bool:
+    """Case-insensitive match on equipment name and, if given, serial number."""
+    if equipment.get("equipment_name", "").lower() != equipment_name.lower():
+        return False
+    return serial_number is None or equipment.get("serial_number", "").lower() == serial_number.lower()
+
+
+def _completion_key(equipment: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """Exact (name, serial number) identity used to find a record again in freshly loaded data."""
+    return (equipment.get("equipment_name"), equipment.get("serial_number"))
+
+
+def _apply_date(equipment: Dict[str, Any], frequency: str, date: str) -> None:
+    """
+    Store a frequency-specific date, and the general date too when it is the
+    equipment's only schedule (for backward compatibility).
+    """
+    maintenance_schedule = equipment["maintenance_schedule"]
+    maintenance_schedule[frequency]["last_maintenance_date"] = date
+    schedule_keys = list(maintenance_schedule.keys())
+    if len(schedule_keys) == 1 and schedule_keys[0] == frequency:
+        equipment["last_maintenance_date"] = date
+
+
+# Equipment data reads (file loads, hashes, database scans) made by the current thread
+_reads = threading.local()
+
+
+def _count_read() -> None:
+    _reads.count = getattr(_reads, "count", 0) + 1
+
+
+def equipment_reads() -> int:
+    """Number of equipment data reads made by the current thread (see reset_equipment_reads)."""
+    return getattr(_reads, "count", 0)
+
+
+def reset_equipment_reads() -> None:
+    """Start counting equipment data reads for the current thread from zero (e.g. per request)."""
+    _reads.count = 0
+
+
+class EquipmentStore:
+    """Interface shared by all storage backends."""
+
+    # File the store lives in (the next-due index is kept next to it)
+    path = ""
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        """Return all equipment records in equipment_data.json format."""
+        raise NotImplementedError
+
+    def iter_all(self) -> Iterator[Dict[str, Any]]:
+        """Yield equipment records one at a time."""
+        yield from self.load_all()
+
+    def save_all(self, data: List[Dict[str, Any]]) -> None:
+        """Replace all equipment records."""
+        raise NotImplementedError
+
+    def find(self, equipment_name: str, serial_number: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Find equipment by name and optionally serial number (case-insensitive)."""
+        equipment = get_equipment_index(self).find(equipment_name, serial_number)
+        # A copy, so callers never modify the shared index
+        return copy.deepcopy(equipment) if equipment is not None else None
+
+    def set_last_maintenance_date(self, equipment: Dict[str, Any], frequency: str, date: str, user: Optional[str] = None) -> None:
+        """
+        Record a completion for an equipment record returned by this store (raises ValueError
+        if it cannot be recorded). user is kept by stores that record history.
+        """
+        error = self.record_completions([(equipment, frequency, date, user)])[0]
+        if error:
+            raise ValueError(error)
+        _apply_date(equipment, frequency, date)
+
+    def record_completions(self, completions: List[Completion]) -> List[Optional[str]]:
+        """
+        Record several completions in one pass (a single write where the backend allows).
+        Equipment records must come from this store; they are not modified.
+        Returns an error message (or None) per completion.
+        """
+        raise NotImplementedError
+
+    # True if history() returns recorded completions
+    keeps_history = False
+
+    def history(self, equipment_name: Optional[str] = None, serial_number: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Recorded completion events, oldest first (optionally for one equipment)."""
+        return []
+
+    def version(self) -> Optional[str]:
+        """Opaque token that changes whenever the stored data changes."""
+        raise NotImplementedError
+
+    def stamp(self) -> Any:
+        """
+        Cheap change detector for in-memory caches: changes whenever version() does
+        (and occasionally when it does not).
+        """
+        return self.version()
+
+    def close(self) -> None:
+        """Release any resources held by the store."""
+
+
+class _GroupCommit:
+    """
+    Merges completions submitted by concurrent threads within a short window into
+    one rewrite of the equipment file. The first thread to arrive waits for the
+    window, then commits everything queued so far on behalf of all of them.
+    """
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._pending: List[Dict[str, Any]] = []
+        self._leader_active = False
+
+    def submit(self, store: "JsonEquipmentStore", completion: Completion) -> Optional[str]:
+        """Queue a completion and wait until it is written. Returns an error message or None."""
+        request = {"completion": completion, "done": threading.Event(), "error": None}
+        with self._lock:
+            self._pending.append(request)
+            lead = not self._leader_active
+            self._leader_active = True
+        if lead:
+            time.sleep(self.window_seconds)
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._leader_active = False
+            try:
+                errors = store._commit([r["completion"] for r in batch])
+            except Exception as e:
+                errors = [str(e)] * len(batch)
+            for r, error in zip(batch, errors):
+                r["error"] = error
+                r["done"].set()
+        request["done"].wait()
+        return request["error"]
+
+
+# Group committers shared by all stores of the same file in this process
+_group_commits: Dict[str, _GroupCommit] = {}
+_group_commits_lock = threading.Lock()
+
+
+def _group_commit_for(path: str, window_seconds: float) -> _GroupCommit:
+    with _group_commits_lock:
+        key = os.path.abspath(path)
+        if key not in _group_commits or _group_commits[key].window_seconds != window_seconds:
+            _group_commits[key] = _GroupCommit(window_seconds)
+        return _group_commits[key]
+
+
+class JsonEquipmentStore(EquipmentStore):
+    """
+    equipment_data.json backend. Every update rewrites the whole file, under an
+    advisory lock and via temp file + rename. With group_commit_ms set, updates
+    from concurrent threads within that window share one rewrite.
+    """
+
+    def __init__(self, path: str = DEFAULT_EQUIPMENT_FILE, group_commit_ms: int = 0, snapshot: bool = False):
+        self.path = path
+        self.group_commit_ms = group_commit_ms
+        # Keep a binary snapshot next to the file (see equipment_snapshot)
+        self.snapshot = snapshot
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        _count_read()
+        with open(self.path, 'rb') as f:
+            data = load_equipment_json(self.path, f.read(), self.snapshot)
+        return list(expand_tasks(self.path, data))
+
+    def iter_all(self) -> Iterator[Dict[str, Any]]:
+        _count_read()
+        return expand_tasks(self.path, iter_equipment(self.path))
+
+    def save_all(self, data: List[Dict[str, Any]]) -> None:
+        with FileLock(self.path):
+            save_equipment_json(self.path, compact_tasks(self.path, data), self.snapshot)
+
+    def set_last_maintenance_date(self, equipment: Dict[str, Any], frequency: str, date: str, user: Optional[str] = None) -> None:
+        if self.group_commit_ms <= 0:
+            super().set_last_maintenance_date(equipment, frequency, date, user)
+            return
+        error = _group_commit_for(self.path, self.group_commit_ms / 1000).submit(self, (equipment, frequency, date, user))
+        if error:
+            raise ValueError(error)
+        _apply_date(equipment, frequency, date)
+
+    def record_completions(self, completions: List[Completion]) -> List[Optional[str]]:
+        return self._commit(completions)
+
+    def _commit(self, completions: List[Completion]) -> List[Optional[str]]:
+        """
+        Apply completions to the file's current content and rewrite it once, holding the lock.
+        The content is re-read under the lock so concurrent writers never lose each other's
+        updates. Returns an error message (or None) per completion.
+        """
+        with FileLock(self.path):
+            previous_version = self.version()
+            data = self.load_all()
+            records = {}
+            for equipment in data:
+                records.setdefault(_completion_key(equipment), equipment)
+
+            errors: List[Optional[str]] = []
+            changed = {}
+            history = []
+            for equipment, frequency, date, user in completions:
+                current = records.get(_completion_key(equipment))
+                if current is None or frequency not in current.get("maintenance_schedule", {}):
+                    errors.append(f"Equipment '{equipment.get('equipment_name')}' was changed or removed in {self.path}")
+                    continue
+                history.append(completion_entry(current, frequency, date, user))
+                _apply_date(current, frequency, date)
+                changed[id(current)] = current
+                errors.append(None)
+
+            if changed:
+                save_equipment_json(self.path, compact_tasks(self.path, data), self.snapshot)
+                prime_equipment_index(self, data)
+                _update_index(self, data, list(changed.values()), previous_version)
+                _record_history(self, history)
+            return errors
+
+    def version(self) -> Optional[str]:
+        _count_read()
+        return file_sha256(self.path)
+
+    def stamp(self) -> Any:
+        # Atomic replacement gives every write a new inode
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+# Journal path -> (journal size, events in it), so an append does not re-read the journal to count them
+_journal_counts: Dict[str, Tuple[int, int]] = {}
+
+
+class JournalEquipmentStore(EquipmentStore):
+    """
+    equipment_data.json as a snapshot plus an append-only journal of completion events.
+
+    A completion appends one line to <base>.journal.jsonl instead of rewriting the whole
+    file. Readers replay the journal tail onto the snapshot. Once the journal holds
+    compact_events events they are folded into a new snapshot and moved to
+    <base>.history.jsonl, which keeps every completion ever recorded.
+    """
+
+    keeps_history = True
+
+    def __init__(self, path: str = DEFAULT_EQUIPMENT_FILE, compact_events: int = DEFAULT_JOURNAL_COMPACT_EVENTS,
+                 snapshot: bool = False):
+        self.path = path
+        # Keep a binary copy of the JSON snapshot (see equipment_snapshot)
+        self.snapshot = snapshot
+        base, _ = os.path.splitext(path)
+        self.journal_path = f"{base}.journal.jsonl"
+        self.history_path = f"{base}.history.jsonl"
+        self.compact_events = max(1, compact_events)
+
+    @staticmethod
+    def _read_events(path: str) -> List[Dict[str, Any]]:
+        """Events of a JSON-lines file (a torn last line from a crash is ignored)."""
+        events = []
+        try:
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return events
+
+    @staticmethod
+    def _replay(records: Iterable[Dict[str, Any]], events: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Apply completion events to snapshot records, in journal order."""
+        pending: Dict[Tuple[Optional[str], Optional[str]], List[Dict[str, Any]]] = {}
+        for event in events:
+            pending.setdefault((event.get("equipment_name"), event.get("serial_number")), []).append(event)
+        for equipment in records:
+            # Only the first record with a given identity is updated, like find()
+            for event in pending.pop(_completion_key(equipment), []):
+                if event["frequency"] in equipment.get("maintenance_schedule", {}):
+                    _apply_date(equipment, event["frequency"], event["date"])
+            yield equipment
+
+    def _journal_size(self) -> int:
+        try:
+            return os.stat(self.journal_path).st_size
+        except OSError:
+            return 0
+
+    def _pending_events(self) -> int:
+        """Events in the journal (caller holds the lock): counted once, then tracked by journal size."""
+        size = self._journal_size()
+        counted = _journal_counts.get(self.journal_path)
+        if counted is None or counted[0] != size:
+            counted = (size, len(self._read_events(self.journal_path)))
+            _journal_counts[self.journal_path] = counted
+        return counted[1]
+
+    def _updated_records(self, index, events: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """(indexed record, updated copy) pairs for events just appended, applied like _replay."""
+        updated: Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        for event in events:
+            key = (event["equipment_name"], event["serial_number"])
+            old = next((equipment for equipment in index.get_by_name(key[0]) if _completion_key(equipment) == key), None)
+            if old is None:
+                continue
+            _, new = updated.setdefault(id(old), (old, copy.deepcopy(old)))
+            if event["frequency"] in new.get("maintenance_schedule", {}):
+                _apply_date(new, event["frequency"], event["date"])
+        return list(updated.values())
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        # The journal is read before the snapshot: if a compaction happens in between,
+        # its events are simply replayed onto a snapshot that already contains them
+        _count_read()
+        events = self._read_events(self.journal_path)
+        with open(self.path, 'rb') as f:
+            data = load_equipment_json(self.path, f.read(), self.snapshot)
+        return list(self._replay(expand_tasks(self.path, data), events))
+
+    def iter_all(self) -> Iterator[Dict[str, Any]]:
+        # iter_equipment only opens the snapshot on first use, after the journal was read
+        _count_read()
+        events = self._read_events(self.journal_path)
+        return self._replay(expand_tasks(self.path, iter_equipment(self.path)), events)
+
+    def save_all(self, data: List[Dict[str, Any]]) -> None:
+        """
+        Write a new snapshot and retire the journal into the history file.
+        data must already include the journal's completions (e.g. come from load_all()).
+        """
+        with FileLock(self.path):
+            self._save_all_locked(data)
+
+    def _save_all_locked(self, data: List[Dict[str, Any]]) -> None:
+        events = self._read_events(self.journal_path)
+        save_equipment_json(self.path, compact_tasks(self.path, data), self.snapshot)
+        if events:
+            # A crash before the truncate below replays idempotent events; history() drops duplicates
+            with open(self.history_path, 'a') as f:
+                for event in events:
+                    f.write(json.dumps(event) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        with open(self.journal_path, 'w'):
+            pass
+        _journal_counts[self.journal_path] = (0, 0)
+
+    def compact(self) -> int:
+        """Fold the journal into a new snapshot. Returns the number of events folded."""
+        with FileLock(self.path):
+            pending = self._pending_events()
+            if pending:
+                self._save_all_locked(self.load_all())
+        return pending
+
+    def record_completions(self, completions: List[Completion]) -> List[Optional[str]]:
+        errors: List[Optional[str]] = []
+        events = []
+        history = []
+        # Updated copies of the affected records, for later history entries of the same record
+        changed: Dict[Tuple[Optional[str], Optional[str]], Dict[str, Any]] = {}
+        recorded_at = datetime.now().isoformat(timespec="seconds")
+        for equipment, frequency, date, user in completions:
+            if frequency not in equipment.get("maintenance_schedule", {}):
+                errors.append(f"Equipment '{equipment.get('equipment_name')}' does not have a {frequency} schedule")
+                continue
+            key = _completion_key(equipment)
+            history.append(completion_entry(changed.get(key, equipment), frequency, date, user))
+            events.append({
+                "id": uuid.uuid4().hex,
+                "recorded_at": recorded_at,
+                "equipment_name": key[0],
+                "serial_number": key[1],
+                "frequency": frequency,
+                "date": date,
+                "user": user
+            })
+            _apply_date(changed.setdefault(key, copy.deepcopy(equipment)), frequency, date)
+            errors.append(None)
+        if not events:
+            return errors
+
+        # Only the journal append is done per completion. The in-memory equipment index is
+        # patched if it is current; the next-due index is rebuilt on its next query
+        with FileLock(self.path):
+            pending = self._pending_events()
+            index = cached_equipment_index(self, self.stamp())
+            with open(self.journal_path, 'a') as f:
+                f.write("".join(json.dumps(event) + "\n" for event in events))
+                f.flush()
+                os.fsync(f.fileno())
+            pending += len(events)
+            _journal_counts[self.journal_path] = (self._journal_size(), pending)
+
+            if pending >= self.compact_events:
+                # Compact from the files, which include other writers' events
+                data = self.load_all()
+                self._save_all_locked(data)
+                prime_equipment_index(self, data)
+            elif index is not None:
+                replace_in_equipment_index(self, index, self._updated_records(index, events))
+            _record_history(self, history)
+        return errors
+
+    def history(self, equipment_name: Optional[str] = None, serial_number: Optional[str] = None) -> List[Dict[str, Any]]:
+        seen = set()
+        events = []
+        for event in self._read_events(self.history_path) + self._read_events(self.journal_path):
+            if event.get("id") in seen:
+                continue
+            seen.add(event.get("id"))
+            if equipment_name is not None and (event.get("equipment_name") or "").lower() != equipment_name.lower():
+                continue
+            if serial_number is not None and (event.get("serial_number") or "").lower() != serial_number.lower():
+                continue
+            events.append(event)
+        return events
+
+    def version(self) -> Optional[str]:
+        # Cheap to poll: a completion grows the journal, a compaction rewrites the snapshot
+        try:
+            snapshot = os.stat(self.path)
+        except OSError:
+            return None
+        return f"{snapshot.st_mtime_ns}-{snapshot.st_size}-{self._journal_size()}"
+
+
+class ShardedEquipmentStore(EquipmentStore):
+    """
+    Equipment split into one JSON file per location (or serial number hash range) in
+    <base>.shards/, listed in manifest.json. A completion locks and rewrites only the
+    shard that holds the equipment, so updates from different sites do not contend.
+    Loaders can read shards one at a time (iter_all, load_shard).
+    """
+
+    def __init__(self, path: str = DEFAULT_EQUIPMENT_FILE, snapshot: bool = False):
+        # The unsharded file's path identifies the store (next-due index, history)
+        self.path = path
+        base, _ = os.path.splitext(path)
+        self.directory = f"{base}.shards"
+        self.manifest_path = os.path.join(self.directory, "manifest.json")
+        # Keep binary snapshots of the shard files (see equipment_snapshot)
+        self.snapshot = snapshot
+
+    def _manifest(self) -> Dict[str, Any]:
+        """{"shard_by": ..., "shard_count": ..., "shards": {shard key: file name}}."""
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"{self.manifest_path} not found (create it with: python equipment_store.py split)")
+
+    def shard_paths(self) -> List[str]:
+        """Shard files, in manifest order."""
+        return [os.path.join(self.directory, name) for name in self._manifest()["shards"].values()]
+
+    def shard_stamps(self) -> Dict[str, Any]:
+        """Shard file -> (inode, mtime, size); shard files are replaced atomically on every write."""
+        return {path: _file_stamp(path) for path in self.shard_paths()}
+
+    def load_shard(self, shard_path: str) -> List[Dict[str, Any]]:
+        """Equipment records of one shard file."""
+        _count_read()
+        with open(shard_path, 'rb') as f:
+            data = load_equipment_json(shard_path, f.read(), self.snapshot)
+        return list(expand_tasks(shard_path, data))
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        return [equipment for shard_path in self.shard_paths() for equipment in self.load_shard(shard_path)]
+
+    def iter_all(self) -> Iterator[Dict[str, Any]]:
+        for shard_path in self.shard_paths():
+            _count_read()
+            yield from expand_tasks(shard_path, iter_equipment(shard_path))
+
+    def save_all(self, data: List[Dict[str, Any]], shard_by: Optional[str] = None, shard_count: Optional[int] = None) -> None:
+        """
+        Replace all equipment records, regrouping them into shards. shard_by and shard_count
+        default to the manifest's (a new store is sharded by location).
+        """
+        try:
+            manifest = self._manifest()
+        except FileNotFoundError:
+            manifest = {"shard_by": SHARD_BY_LOCATION, "shard_count": 1, "shards": {}}
+        old_files = set(manifest["shards"].values())
+        if shard_by is not None and (shard_by, shard_count) != (manifest["shard_by"], manifest["shard_count"]):
+            manifest = {"shard_by": shard_by, "shard_count": shard_count or 1, "shards": {}}
+
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for equipment in data:
+            groups.setdefault(shard_key(equipment, manifest["shard_by"], manifest["shard_count"]), []).append(equipment)
+        shards = {}
+        used = set()
+        for key in groups:
+            name = manifest["shards"].get(key) or _shard_file_name(key, used | set(manifest["shards"].values()))
+            shards[key] = name
+            used.add(name)
+        manifest["shards"] = shards
+
+        os.makedirs(self.directory, exist_ok=True)
+        with contextlib.ExitStack() as locks:
+            # Lock order: shards (sorted), then the store directory, as in record_completions
+            for name in sorted(old_files | used):
+                locks.enter_context(FileLock(os.path.join(self.directory, name)))
+            locks.enter_context(FileLock(self.directory))
+            for key, name in shards.items():
+                shard_path = os.path.join(self.directory, name)
+                save_equipment_json(shard_path, compact_tasks(shard_path, groups[key]), self.snapshot)
+            atomic_write_json(self.manifest_path, manifest)
+            for name in old_files - used:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def record_completions(self, completions: List[Completion]) -> List[Optional[str]]:
+        manifest = self._manifest()
+        by_shard: Dict[str, List[int]] = {}
+        for position, (equipment, _, _, _) in enumerate(completions):
+            name = manifest["shards"].get(shard_key(equipment, manifest["shard_by"], manifest["shard_count"]))
+            by_shard.setdefault(name, []).append(position)
+
+        errors: List[Optional[str]] = [None] * len(completions)
+        for name, positions in by_shard.items():
+            if name is None:
+                for position in positions:
+                    errors[position] = f"Equipment '{completions[position][0].get('equipment_name')}' is not in any shard of {self.directory}"
+                continue
+            shard_path = os.path.join(self.directory, name)
+            with FileLock(shard_path):
+                before = _file_stamp(shard_path)
+                data = self.load_shard(shard_path)
+                records = {}
+                for equipment in data:
+                    records.setdefault(_completion_key(equipment), equipment)
+
+                changed = {}
+                history = []
+                for position in positions:
+                    equipment, frequency, date, user = completions[position]
+                    current = records.get(_completion_key(equipment))
+                    if current is None or frequency not in current.get("maintenance_schedule", {}):
+                        errors[position] = f"Equipment '{equipment.get('equipment_name')}' was changed or removed in {shard_path}"
+                        continue
+                    history.append(completion_entry(current, frequency, date, user))
+                    _apply_date(current, frequency, date)
+                    changed[id(current)] = current
+                if not changed:
+                    continue
+                save_equipment_json(shard_path, compact_tasks(shard_path, data), self.snapshot)
+
+                # Next-due index updates are serialized store-wide. The index can be updated in
+                # place if it matched the store as it was before this shard's write
+                with FileLock(self.directory):
+                    _update_index(self, None, list(changed.values()), self._version({shard_path: before}))
+            _record_history(self, history)
+        return errors
+
+    def _version(self, overrides: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Version made of every shard file's stamp (some of them replaced by overrides)."""
+        try:
+            stamps = self.shard_stamps()
+        except (OSError, ValueError):
+            return None
+        stamps.update(overrides or {})
+        return ";".join(f"{os.path.basename(path)}:{stamp}" for path, stamp in stamps.items())
+
+    def version(self) -> Optional[str]:
+        return self._version()
+
+
+def _file_stamp(path: str) -> Any:
+    """(inode, mtime, size) of a file that is only ever replaced atomically, or None if missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def _shard_file_name(key: str, taken: set) -> str:
+    """Unique shard file name for a shard key (a location, or a hash bucket number)."""
+    slug = re.sub(r"[^a-z0-9]+", "-", key.lower()).strip("-") or "unassigned"
+    name = f"shard-{slug}.json"
+    suffix = 2
+    while name in taken:
+        name = f"shard-{slug}-{suffix}.json"
+        suffix += 1
+    return name
+
+
+class SqliteEquipmentStore(EquipmentStore):
+    """SQLite backend with indexed tables for equipment, schedules and tasks."""
+
+    def __init__(self, path: str = DEFAULT_SQLITE_DATABASE):
+        self.path = path
+        with self._connect() as connection:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS equipment (
+                    id INTEGER PRIMARY KEY,
+                    position INTEGER NOT NULL,
+                    equipment_name TEXT,
+                    manufacturer TEXT,
+                    model TEXT,
+                    serial_number TEXT,
+                    location TEXT,
+                    last_maintenance_date TEXT,
+                    extra TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_equipment_position ON equipment (position);
+                CREATE INDEX IF NOT EXISTS idx_equipment_serial ON equipment (serial_number COLLATE NOCASE);
+                CREATE INDEX IF NOT EXISTS idx_equipment_name ON equipment (equipment_name COLLATE NOCASE);
+                CREATE INDEX IF NOT EXISTS idx_equipment_location ON equipment (location);
+
+                CREATE TABLE IF NOT EXISTS schedules (
+                    equipment_id INTEGER NOT NULL REFERENCES equipment (id) ON DELETE CASCADE,
+                    frequency TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    last_maintenance_date TEXT,
+                    extra TEXT,
+                    PRIMARY KEY (equipment_id, frequency)
+                );
+
+                CREATE TABLE IF NOT EXISTS tasks (
+                    equipment_id INTEGER NOT NULL,
+                    frequency TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    task TEXT NOT NULL,
+                    PRIMARY KEY (equipment_id, frequency, position),
+                    FOREIGN KEY (equipment_id, frequency) REFERENCES schedules (equipment_id, frequency) ON DELETE CASCADE
+                );
+
+                CREATE TABLE IF NOT EXISTS store_meta (
+                    name TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+                INSERT OR IGNORE INTO store_meta (name, value) VALUES ('version', '0');
+            """)
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        Connection for one operation, used as a context manager: the transaction is
+        committed (or rolled back on error) and the connection closed on exit. One
+        connection per operation keeps the store safe to use from the Slack bot's
+        request threads.
+        """
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA foreign_keys = ON")
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _bump_version(connection: sqlite3.Connection) -> None:
+        connection.execute("UPDATE store_meta SET value = CAST(value AS INTEGER) + 1 WHERE name = 'version'")
+
+    @staticmethod
+    def _insert(connection: sqlite3.Connection, data: List[Dict[str, Any]]) -> None:
+        """Insert records in file order (caller handles the transaction)."""
+        for position, equipment in enumerate(data):
+            extra = {k: v for k, v in equipment.items() if k not in EQUIPMENT_FIELDS and k != "maintenance_schedule"}
+            cursor = connection.execute(
+                f"INSERT INTO equipment (position, {', '.join(EQUIPMENT_FIELDS)}, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [position] + [equipment.get(field) for field in EQUIPMENT_FIELDS] + [json.dumps(extra) if extra else None]
+            )
+            equipment_id = cursor.lastrowid
+            for schedule_position, (frequency, entry) in enumerate(equipment.get("maintenance_schedule", {}).items()):
+                entry_extra = {k: v for k, v in entry.items() if k not in ("tasks", "last_maintenance_date")}
+                connection.execute(
+                    "INSERT INTO schedules (equipment_id, frequency, position, last_maintenance_date, extra) VALUES (?, ?, ?, ?, ?)",
+                    (equipment_id, frequency, schedule_position, entry.get("last_maintenance_date"),
+                     json.dumps(entry_extra) if entry_extra else None)
+                )
+                connection.executemany(
+                    "INSERT INTO tasks (equipment_id, frequency, position, task) VALUES (?, ?, ?, ?)",
+                    [(equipment_id, frequency, i, task) for i, task in enumerate(entry.get("tasks", []))]
+                )
+
+    @staticmethod
+    def _assemble(connection: sqlite3.Connection, equipment_rows: List[tuple]) -> List[Dict[str, Any]]:
+        """Turn equipment rows (id, fields..., extra) plus their schedules and tasks into records."""
+        if not equipment_rows:
+            return []
+        ids = [row[0] for row in equipment_rows]
+        placeholders = ", ".join("?" * len(ids))
+
+        schedules: Dict[int, Dict[str, Dict[str, Any]]] = {equipment_id: {} for equipment_id in ids}
+        for equipment_id, frequency, last_date, extra in connection.execute(
+            f"SELECT equipment_id, frequency, last_maintenance_date, extra FROM schedules "
+            f"WHERE equipment_id IN ({placeholders}) ORDER BY equipment_id, position", ids
+        ):
+            entry: Dict[str, Any] = {"tasks": []}
+            if last_date is not None:
+                entry["last_maintenance_date"] = last_date
+            if extra:
+                entry.update(json.loads(extra))
+            schedules[equipment_id][frequency] = entry
+
+        for equipment_id, frequency, task in connection.execute(
+            f"SELECT equipment_id, frequency, task FROM tasks "
+            f"WHERE equipment_id IN ({placeholders}) ORDER BY equipment_id, frequency, position", ids
+        ):
+            schedules[equipment_id][frequency]["tasks"].append(task)
+
+        records = []
+        for row in equipment_rows:
+            equipment = {field: value for field, value in zip(EQUIPMENT_FIELDS, row[1:-1]) if value is not None}
+            equipment["maintenance_schedule"] = schedules[row[0]]
+            if row[-1]:
+                equipment.update(json.loads(row[-1]))
+            records.append(equipment)
+        return records
+
+    def _select(self, connection: sqlite3.Connection, where: str = "", params: tuple = (), limit: str = "") -> List[tuple]:
+        return connection.execute(
+            f"SELECT id, {', '.join(EQUIPMENT_FIELDS)}, extra FROM equipment {where} ORDER BY position {limit}", params
+        ).fetchall()
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        _count_read()
+        with self._connect() as connection:
+            return self._assemble(connection, self._select(connection))
+
+    def iter_all(self, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        _count_read()
+        offset = 0
+        while True:
+            with self._connect() as connection:
+                rows = self._select(connection, limit=f"LIMIT {batch_size} OFFSET {offset}")
+                records = self._assemble(connection, rows)
+            if not records:
+                return
+            yield from records
+            offset += batch_size
+
+    def save_all(self, data: List[Dict[str, Any]]) -> None:
+        with self._connect() as connection:
+            connection.execute("DELETE FROM tasks")
+            connection.execute("DELETE FROM schedules")
+            connection.execute("DELETE FROM equipment")
+            self._insert(connection, data)
+            self._bump_version(connection)
+
+    def find(self, equipment_name: str, serial_number: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        # Indexed NOCASE lookup narrows the candidates, the Python check keeps the exact matching rules
+        with self._connect() as connection:
+            if serial_number is None:
+                rows = self._select(connection, "WHERE equipment_name = ? COLLATE NOCASE", (equipment_name,))
+            else:
+                rows = self._select(
+                    connection,
+                    "WHERE equipment_name = ? COLLATE NOCASE AND serial_number = ? COLLATE NOCASE",
+                    (equipment_name, serial_number)
+                )
+            for equipment in self._assemble(connection, rows):
+                if _matches(equipment, equipment_name, serial_number):
+                    return equipment
+        # Non-ASCII names are not folded by NOCASE
+        return super().find(equipment_name, serial_number) if not equipment_name.isascii() else None
+
+    def record_completions(self, completions: List[Completion]) -> List[Optional[str]]:
+        errors: List[Optional[str]] = []
+        changed: Dict[Tuple[Optional[str], Optional[str]], Dict[str, Any]] = {}
+        history = []
+        # The lock keeps concurrent writers from interleaving their next-due index updates
+        with FileLock(self.path):
+            previous_version = self.version()
+            with self._connect() as connection:
+                for equipment, frequency, date, user in completions:
+                    key = _completion_key(equipment)
+                    row = connection.execute(
+                        "SELECT id FROM equipment WHERE equipment_name IS ? AND serial_number IS ? ORDER BY position LIMIT 1", key
+                    ).fetchone()
+                    frequencies = [] if row is None else [
+                        r[0] for r in connection.execute("SELECT frequency FROM schedules WHERE equipment_id = ? ORDER BY position", (row[0],))
+                    ]
+                    if frequency not in frequencies:
+                        errors.append(f"Equipment '{key[0]}' was changed or removed in {self.path}")
+                        continue
+                    connection.execute(
+                        "UPDATE schedules SET last_maintenance_date = ? WHERE equipment_id = ? AND frequency = ?",
+                        (date, row[0], frequency)
+                    )
+                    if frequencies == [frequency]:
+                        connection.execute("UPDATE equipment SET last_maintenance_date = ? WHERE id = ?", (date, row[0]))
+                    history.append(completion_entry(changed.get(key, equipment), frequency, date, user))
+                    _apply_date(changed.setdefault(key, copy.deepcopy(equipment)), frequency, date)
+                    errors.append(None)
+                if changed:
+                    self._bump_version(connection)
+            if changed:
+                _update_index(self, None, list(changed.values()), previous_version)
+                _record_history(self, history)
+        return errors
+
+    def version(self) -> Optional[str]:
+        with self._connect() as connection:
+            return connection.execute("SELECT value FROM store_meta WHERE name = 'version'").fetchone()[0]
+
+
+def _update_index(store: EquipmentStore, data: Optional[List[Dict[str, Any]]], changed: List[Dict[str, Any]], previous_version: Optional[str]) -> None:
+    """Keep the next-due index in step with updated equipment records (never fails the update)."""
+    try:
+        update_due_index(store, data, changed, previous_version)
+    except Exception as e:
+        print(f"Warning: Could not update due index: {e}")
+
+
+def _record_history(store: EquipmentStore, entries: List[Dict[str, Any]]) -> None:
+    """Add completions to the store's columnar history (never fails the update)."""
+    try:
+        CompletionHistory(history_dir_for(store.path)).append(entries)
+    except Exception as e:
+        print(f"Warning: Could not record maintenance history: {e}")
+
+
+def open_store(filename: str = DEFAULT_EQUIPMENT_FILE, config: Optional[Dict[str, Any]] = None) -> EquipmentStore:
+    """
+    Open the configured storage backend.
+    filename is the JSON file used by the json backend.
+    """
+    if config is None:
+        config = _load_config()
+    backend = config.get("storage_backend", "json")
+    if backend == "sqlite":
+        return SqliteEquipmentStore(config.get("sqlite_database", DEFAULT_SQLITE_DATABASE))
+    if backend == "sharded":
+        return ShardedEquipmentStore(filename, config.get("binary_snapshot", False))
+    if backend == "journal":
+        return JournalEquipmentStore(filename, config.get("journal_compact_events", DEFAULT_JOURNAL_COMPACT_EVENTS),
+                                     config.get("binary_snapshot", False))
+    if backend != "json":
+        print(f"Warning: Unknown storage_backend '{backend}', using json")
+    return JsonEquipmentStore(filename, config.get("group_commit_ms", 0), config.get("binary_snapshot", False))
+
+
+def main():
+    """Import/export between equipment_data.json and the SQLite store, split/merge shards."""
+    if len(sys.argv) < 2 or sys.argv[1] not in ("import", "export", "split", "merge"):
+        print("Usage:")
+        print("  python equipment_store.py import [equipment_data.json] [equipment.db]")
+        print("  python equipment_store.py export [equipment.db] [equipment_data.json]")
+        print("  python equipment_store.py split [location|serial_hash] [shard_count]")
+        print("  python equipment_store.py merge")
+        return
+
+    if sys.argv[1] == "import":
+        json_file = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_EQUIPMENT_FILE
+        database = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_SQLITE_DATABASE
+        data = JsonEquipmentStore(json_file).load_all()
+        SqliteEquipmentStore(database).save_all(data)
+        print(f"✓ Imported {len(data)} equipment record(s) from {json_file} into {database}")
+    elif sys.argv[1] == "export":
+        database = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_SQLITE_DATABASE
+        json_file = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_EQUIPMENT_FILE
+        data = SqliteEquipmentStore(database).load_all()
+        JsonEquipmentStore(json_file).save_all(data)
+        print(f"✓ Exported {len(data)} equipment record(s) from {database} to {json_file}")
+    elif sys.argv[1] == "split":
+        shard_by = sys.argv[2] if len(sys.argv) > 2 else SHARD_BY_LOCATION
+        if shard_by not in (SHARD_BY_LOCATION, SHARD_BY_SERIAL_HASH):
+            print(f"Error: Shard by '{SHARD_BY_LOCATION}' or '{SHARD_BY_SERIAL_HASH}', not '{shard_by}'")
+            sys.exit(1)
+        shard_count = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+        store = ShardedEquipmentStore(DEFAULT_EQUIPMENT_FILE)
+        if os.path.exists(store.manifest_path):
+            # The shards may hold newer data than the JSON file
+            print(f"Error: {store.directory} already exists. Merge it first (python equipment_store.py merge), then split again")
+            sys.exit(1)
+        data = JsonEquipmentStore(DEFAULT_EQUIPMENT_FILE).load_all()
+        store.save_all(data, shard_by, shard_count if shard_by == SHARD_BY_SERIAL_HASH else 1)
+        print(f"✓ Split {len(data)} equipment record(s) from {DEFAULT_EQUIPMENT_FILE} into {len(store.shard_paths())} shard(s) in {store.directory}")
+        print('  Set "storage_backend": "sharded" in config.json to use them')
+    else:
+        store = ShardedEquipmentStore(DEFAULT_EQUIPMENT_FILE)
+        data = store.load_all()
+        JsonEquipmentStore(DEFAULT_EQUIPMENT_FILE).save_all(data)
+        print(f"✓ Merged {len(store.shard_paths())} shard(s) from {store.directory} into {DEFAULT_EQUIPMENT_FILE} ({len(data)} record(s))")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Streaming equipment loader
+Parses equipment_data.json incrementally and yields one equipment record at a time,
+so very large fleet files can be processed with flat memory use
+"""
+
+import json
+from itertools import islice
+from typing import Iterable, Iterator, List, Dict, Any
+
+
+READ_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+
+class _Reader:
+    """Buffered text reader that can grow its buffer when a record spans chunks."""
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Read another chunk. Returns False at end of file."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop what has already been consumed so the buffer stays small
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def next_char(self) -> str:
+        """Skip whitespace and return the next character without consuming it ("" at EOF)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ""
+
+
+def iter_equipment(filename: str = "equipment_data.json", chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the records of a top-level JSON array one at a time.
+    Raises json.JSONDecodeError / ValueError if the file is not a JSON array.
+    """
+    decoder = json.JSONDecoder()
+    with open(filename, 'r', encoding='utf-8-sig') as f:
+        reader = _Reader(f, chunk_size)
+        if reader.next_char() != "[":
+            raise ValueError(f"{filename} does not contain a JSON array")
+        reader.pos += 1
+
+        if reader.next_char() == "]":
+            return
+
+        while True:
+            reader.next_char()
+            while True:
+                try:
+                    record, end = decoder.raw_decode(reader.buffer, reader.pos)
+                    break
+                except json.JSONDecodeError:
+                    # Record continues in the next chunk
+                    if not reader.fill():
+                        raise
+            reader.pos = end
+            yield record
+
+            separator = reader.next_char()
+            if separator == ",":
+                reader.pos += 1
+            elif separator == "]":
+                return
+            else:
+                raise ValueError(f"Expected ',' or ']' in {filename} at offset {reader.pos}")
+
+
+def batched(records: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Group a stream of records into lists of at most size records."""
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
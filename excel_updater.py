@@ -5,12 +5,16 @@ Supports both .xls and .xlsx formats
 """
 
 import os
+import sqlite3
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import openpyxl
 from openpyxl.utils import get_column_letter
 from openpyxl.styles import Font, Alignment
 
+from equipment_index import get_equipment_index
+from equipment_store import open_store
+
 # For .xls file support
 try:
     import xlrd
@@ -144,8 +148,11 @@ def update_excel_xlsx(workbook, target_sheet, step_numbers_to_tick, date, user_n
     }
 
 
-def update_excel_xls(rb, workbook, target_sheet, target_sheet_name, step_numbers_to_tick, date, user_name, frequency_key):
-    """Update .xls file using xlrd/xlutils."""
+def update_excel_xls(rb, workbook, target_sheet, target_sheet_name, step_numbers_to_tick, date, user_name, frequency_key, first_free_row=0):
+    """
+    Update .xls file using xlrd/xlutils.
+    first_free_row skips rows already written to the copy in the same batch (xlrd only sees the original).
+    """
     rb_sheet = rb.sheet_by_name(target_sheet_name)
     
     # Find the header row
@@ -215,7 +222,7 @@ def update_excel_xls(rb, workbook, target_sheet, target_sheet_name, step_numbers
             if rb_sheet.cell_value(row, date_col):
                 last_row = row
     
-    entry_row = last_row
+    entry_row = max(last_row, first_free_row)
     
     # Format date for Excel (MM/DD/YYYY)
     try:
@@ -236,7 +243,7 @@ def update_excel_xls(rb, workbook, target_sheet, target_sheet_name, step_numbers
     # Add user credentials to Notes column
     if notes_col is not None:
         notes_text = f"{user_name} - {excel_date}"
-        existing_notes = str(rb_sheet.cell_value(entry_row, notes_col) or "").strip()
+        existing_notes = str(rb_sheet.cell_value(entry_row, notes_col) or "").strip() if entry_row < rb_sheet.nrows else ""
         if existing_notes:
             notes_text = f"{existing_notes}; {notes_text}"
         target_sheet.write(entry_row, notes_col, notes_text)
@@ -247,6 +254,204 @@ def update_excel_xls(rb, workbook, target_sheet, target_sheet_name, step_numbers
     }
 
 
+def _resolve_equipment(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fill in a missing serial number or name from the equipment data (via the equipment
+    index), so the sheet search can match on both.
+    """
+    if entry.get("equipment_name") and entry.get("serial_number"):
+        return entry
+    try:
+        index = get_equipment_index(open_store())
+    except (OSError, ValueError, sqlite3.Error):
+        return entry
+    
+    if entry.get("serial_number"):
+        equipment = index.get_by_serial(entry["serial_number"])
+    else:
+        matches = index.get_by_name(entry.get("equipment_name"))
+        # Only when the name is unambiguous
+        equipment = matches[0] if len(matches) == 1 else None
+    if equipment is None:
+        return entry
+    return dict(
+        entry,
+        equipment_name=entry.get("equipment_name") or equipment.get("equipment_name"),
+        serial_number=entry.get("serial_number") or equipment.get("serial_number") or ""
+    )
+
+
+def _default_step_numbers(frequency_key: str) -> List[int]:
+    """Step columns to tick before the sheet's own step numbers are known."""
+    # Common patterns based on Excel structure:
+    # If Excel has "Everyday" (step 1), then:
+    #   Monthly: steps 2, 3
+    #   Bi-Annual: steps 4, 5, 6  
+    #   Annual: step 7
+    # If Excel doesn't have "Everyday", then:
+    #   Monthly: steps 1, 2
+    #   Bi-Annual: steps 1, 2, 3
+    #   Annual: step 4 (or later)
+    
+    # Try the most common pattern first (with Everyday)
+    if frequency_key == "monthly":
+        return [2, 3]  # Most common: step 1 is everyday
+    elif frequency_key == "bi_annual":
+        return [4, 5, 6]  # Steps 4,5,6 for bi-annual
+    elif frequency_key == "annual":
+        return [7]  # Step 7 for annual
+    return [1, 2]
+
+
+def _match_detected_steps(detected_steps: List[int], frequency_key: str, step_numbers_to_tick: List[int]) -> List[int]:
+    """Pick the step columns for a frequency from the step numbers found in the sheet's header."""
+    if detected_steps and frequency_key == "monthly":
+        # Monthly tasks are usually steps 2,3 (if step 1 is everyday)
+        if 2 in detected_steps and 3 in detected_steps:
+            return [2, 3]
+        elif 1 in detected_steps and 2 in detected_steps:
+            return [1, 2]
+    elif detected_steps and frequency_key == "bi_annual":
+        # Bi-annual are usually steps 4,5,6
+        bi_annual_steps = [s for s in detected_steps if s >= 4 and s <= 6]
+        if len(bi_annual_steps) >= 2:
+            return bi_annual_steps[:3]  # Take up to 3 steps
+        else:
+            return [4, 5, 6]  # Default
+    elif detected_steps and frequency_key == "annual":
+        # Annual is usually the last step (7 or higher)
+        return [max(detected_steps)]
+    return step_numbers_to_tick
+
+
+def _add_xls_entry(rb, workbook, entry: Dict[str, Any], next_free_rows: Dict[str, int]) -> Dict[str, Any]:
+    """Write one maintenance entry into an opened .xls workbook copy (not saved)."""
+    equipment_name = entry["equipment_name"]
+    serial_number = entry["serial_number"]
+    frequency_key = entry["frequency"].lower().replace("-", "_")
+    step_numbers_to_tick = _default_step_numbers(frequency_key)
+    
+    # Find target sheet
+    target_sheet_name = None
+    for sheet_name in rb.sheet_names():
+        sheet = rb.sheet_by_name(sheet_name)
+        for row in range(min(20, sheet.nrows)):
+            for col in range(min(10, sheet.ncols)):
+                cell_value = str(sheet.cell_value(row, col) or "").strip()
+                if serial_number and serial_number.lower() in cell_value.lower():
+                    target_sheet_name = sheet_name
+                    break
+                if equipment_name and equipment_name.lower() in cell_value.lower():
+                    target_sheet_name = sheet_name
+                    break
+            if target_sheet_name:
+                break
+        if target_sheet_name:
+            break
+    
+    if not target_sheet_name:
+        return {
+            "success": False,
+            "message": f"Could not find sheet for equipment: {equipment_name} (S/N: {serial_number})"
+        }
+    
+    target_sheet = workbook.get_sheet(target_sheet_name)
+    
+    # Before updating, try to detect actual step structure from Excel
+    # Look for the header row and see what step numbers exist
+    rb_sheet = rb.sheet_by_name(target_sheet_name)
+    detected_steps = []
+    
+    for row in range(min(30, rb_sheet.nrows)):
+        row_steps = []
+        for col in range(rb_sheet.ncols):
+            cell_value = str(rb_sheet.cell_value(row, col) or "").strip()
+            # Check if this looks like a step number (1-10)
+            if cell_value.isdigit() and 1 <= int(cell_value) <= 10:
+                row_steps.append(int(cell_value))
+            elif cell_value in ["1", "2", "3", "4", "5", "6", "7", "8", "9", "10"]:
+                row_steps.append(int(cell_value))
+        # If we found multiple step numbers in a row, this is likely the header
+        if len(row_steps) >= 2:
+            detected_steps = sorted(row_steps)
+            break
+    
+    step_numbers_to_tick = _match_detected_steps(detected_steps, frequency_key, step_numbers_to_tick)
+    
+    result = update_excel_xls(
+        rb, workbook, target_sheet, target_sheet_name, step_numbers_to_tick,
+        entry["date"], entry["user_name"], frequency_key, next_free_rows.get(target_sheet_name, 0)
+    )
+    if not result['success']:
+        return result
+    next_free_rows[target_sheet_name] = result['entry_row'] + 1
+    return {
+        "success": True,
+        "message": f"Updated Excel file: {target_sheet_name}, Row {result['entry_row'] + 1}"
+    }
+
+
+def _add_xlsx_entry(workbook, entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Write one maintenance entry into an opened .xlsx workbook (not saved)."""
+    equipment_name = entry["equipment_name"]
+    serial_number = entry["serial_number"]
+    frequency_key = entry["frequency"].lower().replace("-", "_")
+    step_numbers_to_tick = _default_step_numbers(frequency_key)
+    
+    # Find target sheet
+    target_sheet = None
+    for sheet_name in workbook.sheetnames:
+        sheet = workbook[sheet_name]
+        for row in range(1, min(20, sheet.max_row + 1)):
+            for col in range(1, min(10, sheet.max_column + 1)):
+                cell_value = str(sheet.cell(row, col).value or "").strip()
+                if serial_number and serial_number.lower() in cell_value.lower():
+                    target_sheet = sheet
+                    break
+                if equipment_name and equipment_name.lower() in cell_value.lower():
+                    target_sheet = sheet
+                    break
+            if target_sheet:
+                break
+        if target_sheet:
+            break
+    
+    if not target_sheet:
+        return {
+            "success": False,
+            "message": f"Could not find sheet for equipment: {equipment_name} (S/N: {serial_number})"
+        }
+    
+    # Before updating, try to detect actual step structure from Excel
+    # Look for the header row and see what step numbers exist
+    detected_steps = []
+    
+    for row in range(1, min(30, target_sheet.max_row + 1)):
+        row_steps = []
+        for col in range(1, target_sheet.max_column + 1):
+            cell_value = str(target_sheet.cell(row, col).value or "").strip()
+            # Check if this looks like a step number (1-10)
+            try:
+                if cell_value.isdigit() and 1 <= int(cell_value) <= 10:
+                    row_steps.append(int(cell_value))
+            except:
+                pass
+        # If we found multiple step numbers in a row, this is likely the header
+        if len(row_steps) >= 2:
+            detected_steps = sorted(row_steps)
+            break
+    
+    step_numbers_to_tick = _match_detected_steps(detected_steps, frequency_key, step_numbers_to_tick)
+    
+    result = update_excel_xlsx(workbook, target_sheet, step_numbers_to_tick, entry["date"], entry["user_name"], frequency_key)
+    if not result['success']:
+        return result
+    return {
+        "success": True,
+        "message": f"Updated Excel file: {target_sheet.title}, Row {result['entry_row']}"
+    }
+
+
 def update_excel_maintenance(
     equipment_name: str,
     serial_number: str,
@@ -268,7 +473,36 @@ def update_excel_maintenance(
     Returns:
         Dict with success status and message
     """
+    return update_excel_maintenance_batch([{
+        "equipment_name": equipment_name,
+        "serial_number": serial_number,
+        "frequency": frequency,
+        "date": date,
+        "user_name": user_name
+    }], excel_path)[0]
+
+
+def update_excel_maintenance_batch(entries: List[Dict[str, Any]], excel_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Add several maintenance entries to the Excel file, opening and saving the workbook once.
+    
+    Args:
+        entries: Dicts with the update_excel_maintenance arguments
+                 (equipment_name, serial_number, frequency, date, user_name)
+        excel_path: Excel file path (defaults to excel_file_path in config.json)
+        
+    Returns:
+        One dict with success status and message per entry
+    """
+    def for_all(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [dict(result) for _ in entries]
+    
+    if not entries:
+        return []
+    
     try:
+        entries = [_resolve_equipment(entry) for entry in entries]
+        
         # Get Excel path from config if not provided
         if excel_path is None:
             excel_path = load_excel_config()
@@ -278,242 +512,64 @@ def update_excel_maintenance(
         
         # Try to open the file
         if not os.path.exists(excel_path) and not os.path.exists(xlsx_path):
-            return {
+            return for_all({
                 "success": False,
                 "message": f"Excel file not found at: {excel_path}. Please check network connection and file path."
-            }
+            })
         
         # Use xlsx if available, otherwise xls
         file_path = xlsx_path if os.path.exists(xlsx_path) else excel_path
         is_xls_format = file_path.lower().endswith('.xls') and not file_path.lower().endswith('.xlsx')
         
-        # Get step numbers to tick based on equipment maintenance schedule
-        # We'll determine this by reading the Excel file structure first
-        step_numbers_to_tick = []
-        frequency_key = frequency.lower().replace("-", "_")
-        
-        # First, we need to load the Excel file to see its structure
-        # But we need step numbers before we can search, so we'll use a two-pass approach
-        # For now, calculate based on frequency and try common patterns
-        
-        # Common patterns based on Excel structure:
-        # If Excel has "Everyday" (step 1), then:
-        #   Monthly: steps 2, 3
-        #   Bi-Annual: steps 4, 5, 6  
-        #   Annual: step 7
-        # If Excel doesn't have "Everyday", then:
-        #   Monthly: steps 1, 2
-        #   Bi-Annual: steps 1, 2, 3
-        #   Annual: step 4 (or later)
-        
-        # Try the most common pattern first (with Everyday)
-        if frequency_key == "monthly":
-            step_numbers_to_tick = [2, 3]  # Most common: step 1 is everyday
-        elif frequency_key == "bi_annual":
-            step_numbers_to_tick = [4, 5, 6]  # Steps 4,5,6 for bi-annual
-        elif frequency_key == "annual":
-            step_numbers_to_tick = [7]  # Step 7 for annual
-        else:
-            step_numbers_to_tick = [1, 2]
-        
-        if not step_numbers_to_tick:
-            return {
-                "success": False,
-                "message": f"Could not determine which step columns to tick for frequency: {frequency}"
-            }
-        
-        # Load workbook and find sheet
+        # Load workbook once, write every entry, save once
         if is_xls_format:
             if not XLS_SUPPORT:
-                return {
+                return for_all({
                     "success": False,
                     "message": "xlrd and xlutils are required for .xls files. Install with: pip install xlrd==1.2.0 xlutils"
-                }
+                })
             
             try:
                 rb = xlrd.open_workbook(file_path, formatting_info=True)
                 workbook = xlutils_copy(rb)
-                
-                # Find target sheet
-                target_sheet_name = None
-                for sheet_name in rb.sheet_names():
-                    sheet = rb.sheet_by_name(sheet_name)
-                    for row in range(min(20, sheet.nrows)):
-                        for col in range(min(10, sheet.ncols)):
-                            cell_value = str(sheet.cell_value(row, col) or "").strip()
-                            if serial_number and serial_number.lower() in cell_value.lower():
-                                target_sheet_name = sheet_name
-                                break
-                            if equipment_name and equipment_name.lower() in cell_value.lower():
-                                target_sheet_name = sheet_name
-                                break
-                        if target_sheet_name:
-                            break
-                    if target_sheet_name:
-                        break
-                
-                if not target_sheet_name:
-                    return {
-                        "success": False,
-                        "message": f"Could not find sheet for equipment: {equipment_name} (S/N: {serial_number})"
-                    }
-                
-                target_sheet = workbook.get_sheet(target_sheet_name)
-                
-                # Before updating, try to detect actual step structure from Excel
-                # Look for the header row and see what step numbers exist
-                rb_sheet = rb.sheet_by_name(target_sheet_name)
-                detected_steps = []
-                header_row_detected = None
-                
-                for row in range(min(30, rb_sheet.nrows)):
-                    row_steps = []
-                    for col in range(rb_sheet.ncols):
-                        cell_value = str(rb_sheet.cell_value(row, col) or "").strip()
-                        # Check if this looks like a step number (1-10)
-                        if cell_value.isdigit() and 1 <= int(cell_value) <= 10:
-                            row_steps.append(int(cell_value))
-                        elif cell_value in ["1", "2", "3", "4", "5", "6", "7", "8", "9", "10"]:
-                            row_steps.append(int(cell_value))
-                    # If we found multiple step numbers in a row, this is likely the header
-                    if len(row_steps) >= 2:
-                        detected_steps = sorted(row_steps)
-                        header_row_detected = row
-                        break
-                
-                # If we detected steps, try to match frequency to step numbers
-                if detected_steps and frequency_key == "monthly":
-                    # Monthly tasks are usually steps 2,3 (if step 1 is everyday)
-                    if 2 in detected_steps and 3 in detected_steps:
-                        step_numbers_to_tick = [2, 3]
-                    elif 1 in detected_steps and 2 in detected_steps:
-                        step_numbers_to_tick = [1, 2]
-                elif detected_steps and frequency_key == "bi_annual":
-                    # Bi-annual are usually steps 4,5,6
-                    bi_annual_steps = [s for s in detected_steps if s >= 4 and s <= 6]
-                    if len(bi_annual_steps) >= 2:
-                        step_numbers_to_tick = bi_annual_steps[:3]  # Take up to 3 steps
-                    else:
-                        step_numbers_to_tick = [4, 5, 6]  # Default
-                elif detected_steps and frequency_key == "annual":
-                    # Annual is usually the last step (7 or higher)
-                    annual_step = max(detected_steps) if detected_steps else 7
-                    step_numbers_to_tick = [annual_step]
-                
-                result = update_excel_xls(rb, workbook, target_sheet, target_sheet_name, step_numbers_to_tick, date, user_name, frequency_key)
-                
-                if result['success']:
+                next_free_rows: Dict[str, int] = {}
+                results = [_add_xls_entry(rb, workbook, entry, next_free_rows) for entry in entries]
+                if any(result['success'] for result in results):
                     workbook.save(file_path)
-                    return {
-                        "success": True,
-                        "message": f"Updated Excel file: {target_sheet_name}, Row {result['entry_row'] + 1}"
-                    }
-                else:
-                    return result
+                return results
                     
             except PermissionError:
-                return {
+                return for_all({
                     "success": False,
                     "message": "Permission denied. File may be open in Excel or locked by another user."
-                }
+                })
             except Exception as e:
-                return {
+                return for_all({
                     "success": False,
                     "message": f"Error updating .xls file: {str(e)}"
-                }
+                })
         else:
             # Handle .xlsx files
             try:
                 workbook = openpyxl.load_workbook(file_path)
-                
-                # Find target sheet
-                target_sheet = None
-                for sheet_name in workbook.sheetnames:
-                    sheet = workbook[sheet_name]
-                    for row in range(1, min(20, sheet.max_row + 1)):
-                        for col in range(1, min(10, sheet.max_column + 1)):
-                            cell_value = str(sheet.cell(row, col).value or "").strip()
-                            if serial_number and serial_number.lower() in cell_value.lower():
-                                target_sheet = sheet
-                                break
-                            if equipment_name and equipment_name.lower() in cell_value.lower():
-                                target_sheet = sheet
-                                break
-                        if target_sheet:
-                            break
-                    if target_sheet:
-                        break
-                
-                if not target_sheet:
-                    return {
-                        "success": False,
-                        "message": f"Could not find sheet for equipment: {equipment_name} (S/N: {serial_number})"
-                    }
-                
-                # Before updating, try to detect actual step structure from Excel
-                # Look for the header row and see what step numbers exist
-                detected_steps = []
-                header_row_detected = None
-                
-                for row in range(1, min(30, target_sheet.max_row + 1)):
-                    row_steps = []
-                    for col in range(1, target_sheet.max_column + 1):
-                        cell_value = str(target_sheet.cell(row, col).value or "").strip()
-                        # Check if this looks like a step number (1-10)
-                        try:
-                            if cell_value.isdigit() and 1 <= int(cell_value) <= 10:
-                                row_steps.append(int(cell_value))
-                        except:
-                            pass
-                    # If we found multiple step numbers in a row, this is likely the header
-                    if len(row_steps) >= 2:
-                        detected_steps = sorted(row_steps)
-                        header_row_detected = row
-                        break
-                
-                # If we detected steps, try to match frequency to step numbers
-                if detected_steps and frequency_key == "monthly":
-                    # Monthly tasks are usually steps 2,3 (if step 1 is everyday)
-                    if 2 in detected_steps and 3 in detected_steps:
-                        step_numbers_to_tick = [2, 3]
-                    elif 1 in detected_steps and 2 in detected_steps:
-                        step_numbers_to_tick = [1, 2]
-                elif detected_steps and frequency_key == "bi_annual":
-                    # Bi-annual are usually steps 4,5,6
-                    bi_annual_steps = [s for s in detected_steps if s >= 4 and s <= 6]
-                    if len(bi_annual_steps) >= 2:
-                        step_numbers_to_tick = bi_annual_steps[:3]  # Take up to 3 steps
-                    else:
-                        step_numbers_to_tick = [4, 5, 6]  # Default
-                elif detected_steps and frequency_key == "annual":
-                    # Annual is usually the last step (7 or higher)
-                    annual_step = max(detected_steps) if detected_steps else 7
-                    step_numbers_to_tick = [annual_step]
-                
-                result = update_excel_xlsx(workbook, target_sheet, step_numbers_to_tick, date, user_name, frequency_key)
-                
-                if result['success']:
+                results = [_add_xlsx_entry(workbook, entry) for entry in entries]
+                if any(result['success'] for result in results):
                     workbook.save(file_path)
-                    return {
-                        "success": True,
-                        "message": f"Updated Excel file: {target_sheet.title}, Row {result['entry_row']}"
-                    }
-                else:
-                    return result
+                return results
                     
             except PermissionError:
-                return {
+                return for_all({
                     "success": False,
                     "message": "Permission denied. File may be open in Excel or locked by another user."
-                }
+                })
             except Exception as e:
-                return {
+                return for_all({
                     "success": False,
                     "message": f"Error updating Excel file: {str(e)}"
-                }
+                })
     
     except Exception as e:
-        return {
+        return for_all({
             "success": False,
             "message": f"Error updating Excel: {str(e)}"
-        }
+        })
@@ -0,0 +1,164 @@
+"""
+Excel write-behind queue for the Slack bot
+Slash commands must be answered within 3 seconds, but opening, searching and saving
+the maintenance workbook on the network share can take longer. Entries are queued
+and written by a background worker (several queued entries share one open/save of
+the workbook); each result is then posted to the command's response_url.
+Bot processes serving the same app take a lock file around each write, so only
+one of them has the workbook open at a time.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import List, Dict, Any, Optional
+
+import requests
+
+from excel_updater import update_excel_maintenance_batch
+from file_lock import FileLock
+
+
+# Most entries written with one open/save of the workbook
+DEFAULT_MAX_BATCH = 50
+# Write latencies kept for the status endpoint
+LATENCY_SAMPLES = 200
+# Lock (excel_write.lock in the working directory) held by the process writing the workbook
+EXCEL_WRITE_LOCK = "excel_write"
+EXCEL_WRITE_LOCK_TIMEOUT = 300.0
+
+
+class _Job:
+    """One queued Excel entry and where to report its result."""
+
+    __slots__ = ("entry", "response_url", "queued_at")
+
+    def __init__(self, entry: Dict[str, Any], response_url: Optional[str]):
+        self.entry = entry
+        self.response_url = response_url
+        self.queued_at = time.monotonic()
+
+
+class ExcelWriteBehind:
+    """Background worker that applies queued Excel log entries and reports the results to Slack."""
+
+    def __init__(self, excel_path: Optional[str] = None, max_batch: int = DEFAULT_MAX_BATCH, post_timeout: float = 10.0):
+        self.excel_path = excel_path
+        self.max_batch = max(1, max_batch)
+        self.post_timeout = post_timeout
+        self._queue: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._in_flight = 0
+        self._written = 0
+        self._failed = 0
+        self._batches = 0
+        self._latencies: "deque[float]" = deque(maxlen=LATENCY_SAMPLES)
+        self._last_error: Optional[str] = None
+
+    def submit(self, entry: Dict[str, Any], response_url: Optional[str] = None) -> int:
+        """
+        Queue an entry (update_excel_maintenance arguments) and return how many entries
+        are ahead of it. The result is posted to response_url when written.
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="excel-write-behind", daemon=True)
+                self._thread.start()
+            ahead = self._queue.qsize() + self._in_flight
+        self._queue.put(_Job(entry, response_url))
+        return ahead
+
+    def _next_batch(self) -> List[Optional[_Job]]:
+        """Block for one job, then take whatever else is already queued (up to max_batch)."""
+        batch = [self._queue.get()]
+        while len(batch) < self.max_batch and batch[-1] is not None:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            # None asks the worker to stop (see close), after the jobs queued before it
+            stop = batch[-1] is None
+            jobs = [job for job in batch if job is not None]
+            if jobs:
+                self._write(jobs)
+            if stop:
+                return
+
+    def _write(self, jobs: List[_Job]) -> None:
+        with self._lock:
+            self._in_flight = len(jobs)
+        try:
+            with FileLock(EXCEL_WRITE_LOCK, timeout=EXCEL_WRITE_LOCK_TIMEOUT):
+                results = update_excel_maintenance_batch([job.entry for job in jobs], self.excel_path)
+        except Exception as e:
+            results = [{"success": False, "message": f"Error updating Excel file: {e}"} for _ in jobs]
+
+        finished = time.monotonic()
+        with self._lock:
+            self._in_flight = 0
+            self._batches += 1
+            for job, result in zip(jobs, results):
+                self._latencies.append(finished - job.queued_at)
+                if result.get("success"):
+                    self._written += 1
+                else:
+                    self._failed += 1
+                    self._last_error = result.get("message")
+
+        for job, result in zip(jobs, results):
+            self._report(job, result)
+
+    def _report(self, job: _Job, result: Dict[str, Any]) -> None:
+        """Post the outcome of one entry to its Slack response_url (or print it if there is none)."""
+        entry = job.entry
+        outcome = "Updated successfully" if result.get("success") else result.get("message", "Failed")
+        text = f"*Excel:* {outcome}\n{entry.get('equipment_name')} (S/N: {entry.get('serial_number') or 'N/A'}) - {entry.get('frequency')} {entry.get('date')}"
+        if not job.response_url:
+            print(text.replace("*", ""))
+            return
+        try:
+            response = requests.post(
+                job.response_url,
+                json={"response_type": "ephemeral", "replace_original": False, "text": text},
+                timeout=self.post_timeout
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            print(f"Error posting Excel result to Slack: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        """Queue depth, write latency (seconds from queueing to written) and failure counts."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                "queue_depth": self._queue.qsize(),
+                "in_flight": self._in_flight,
+                "written": self._written,
+                "failed": self._failed,
+                "batches": self._batches,
+                "latency_seconds": {
+                    "last": round(self._latencies[-1], 3) if latencies else None,
+                    "average": round(sum(latencies) / len(latencies), 3) if latencies else None,
+                    "p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3) if latencies else None,
+                    "max": round(latencies[-1], 3) if latencies else None,
+                },
+                "last_error": self._last_error,
+                "worker_running": self._thread is not None and self._thread.is_alive(),
+            }
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Write everything already queued, then stop the worker. Returns False if it did not finish in time."""
+        with self._lock:
+            thread = self._thread
+        if thread is None or not thread.is_alive():
+            return True
+        self._queue.put(None)
+        thread.join(timeout)
+        return not thread.is_alive()
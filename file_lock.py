@@ -0,0 +1,101 @@
+"""
+Advisory file locking and atomic file replacement
+Writers of equipment_data.json (CLI, Slack bot, checker) serialize their
+read-modify-write cycles with an advisory lock on a sibling .lock file, and
+replace files via a temp file + rename so readers never see a partial file
+"""
+
+import json
+import os
+import tempfile
+import time
+from typing import Any
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    Exclusive advisory lock on <path>.lock, usable as a context manager.
+    Works across threads and processes (fcntl on POSIX, msvcrt on Windows).
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.lock_path = f"{path}.lock"
+        self.timeout = timeout
+        self._file = None
+
+    def acquire(self) -> None:
+        """Block until the lock is held (raises TimeoutError after timeout seconds)."""
+        lock_file = open(self.lock_path, 'a+')
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    lock_file.close()
+                    raise TimeoutError(f"Could not lock {self.lock_path} within {self.timeout} seconds")
+                time.sleep(0.005)
+        self._file = lock_file
+
+    def release(self) -> None:
+        """Release the lock."""
+        if self._file is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+def atomic_write_bytes(path: str, content: bytes) -> None:
+    """
+    Write content to a temp file in the same directory and rename it over path,
+    so readers see either the old or the new content, never a truncated file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            # mkstemp creates the file 0600; keep the permissions of the file being replaced
+            os.chmod(temp_path, os.stat(path).st_mode & 0o777)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(path: str, data: Any, indent: int = 2) -> bytes:
+    """Atomically replace path with data as JSON (see atomic_write_bytes). Returns the bytes written."""
+    content = json.dumps(data, indent=indent).encode()
+    atomic_write_bytes(path, content)
+    return content
@@ -4,13 +4,42 @@ Checks for due maintenance and sends Slack notifications
 Runs continuously and checks periodically based on configuration
 """
 
+import hashlib
 import json
 import os
+import sqlite3
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Tuple
-import requests
-from dateutil.relativedelta import relativedelta
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Set, Tuple
+from due_engine import DueTable, FREQUENCY_LABELS, record_key
+from due_index import DueIndex
+from due_scheduler import DueScheduler
+from slack_delivery import SlackDelivery
+from notification_ledger import NotificationLedger
+from render_cache import LRUCache
+from equipment_snapshot import load_equipment_json
+from equipment_store import EquipmentStore, JsonEquipmentStore, ShardedEquipmentStore, open_store
+from equipment_stream import batched
+from task_catalog import expand_tasks
+from parallel_due import SHARD_BY_LOCATION, find_due_parallel
+
+
+# Streaming mode: records evaluated per DueTable batch, and due items per Slack message
+# (4 blocks per item plus the header and divider must stay within Slack's 50-block limit)
+STREAM_BATCH_SIZE = 1000
+STREAM_ITEMS_PER_MESSAGE = 12
+
+
+def _diff_equipment(previous: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> Set[str]:
+    """Return the record keys (serial numbers) that were added, removed or modified."""
+    previous_by_key = {record_key(eq): eq for eq in previous}
+    current_by_key = {record_key(eq): eq for eq in current}
+    changed = set(previous_by_key.keys() ^ current_by_key.keys())
+    for key, equipment in current_by_key.items():
+        if key in previous_by_key and previous_by_key[key] != equipment:
+            changed.add(key)
+    return changed
 
 
 class MaintenanceChecker:
@@ -18,24 +47,147 @@ class MaintenanceChecker:
         """Initialize the maintenance checker with equipment data and configuration."""
         self.equipment_file = equipment_file
         self.config_file = config_file
-        self.equipment_list = self._load_equipment_data()
-        self.config = self._load_config()
+        # path -> (mtime, size, sha256) of the last version that was parsed
+        self._file_states: Dict[str, Optional[Tuple[float, int, str]]] = {}
+        self._due_table: Optional[DueTable] = None
+        self._slack_delivery: Optional[SlackDelivery] = None
+        self._ledger: Optional[NotificationLedger] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._process_pool_workers = 0
+        self._store: Optional[EquipmentStore] = None
+        self._store_setting: Optional[Tuple[str, Optional[str], bool]] = None
+        # Store version of the last load (non-JSON backends)
+        self._store_version: Optional[str] = None
+        # Shard file -> (stamp, records) of the last load (sharded backend)
+        self._shards: Dict[str, Tuple[Any, List[Dict[str, Any]]]] = {}
+        self.changed_records: Set[str] = set()
+        self.last_reload_seconds = 0.0
+        self.config = self._load_config(self._read_if_changed(self.config_file))
+        self.equipment_list: List[Dict[str, Any]] = []
+        # Loaded on first use, so streaming checks never hold the whole fleet in memory
+        self._equipment_loaded = False
+        self._fragment_cache = LRUCache(self.config.get("fragment_cache_size", 1024))
+    
+    def _read_if_changed(self, path: str) -> Optional[bytes]:
+        """
+        Read a file only if it changed since it was last parsed.
+        The (mtime, size) pair is checked first; if it differs, the content hash decides.
+        Returns the new content, or None if the file is unchanged or missing.
+        """
+        previous = self._file_states.get(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._file_states[path] = None
+            return None
+        
+        if previous and previous[:2] == (stat.st_mtime, stat.st_size):
+            return None
+        
+        with open(path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+        self._file_states[path] = (stat.st_mtime, stat.st_size, digest)
         
-    def _load_equipment_data(self) -> List[Dict[str, Any]]:
-        """Load equipment data from JSON file."""
+        if previous and previous[2] == digest:
+            # Touched but not modified
+            return None
+        return content
+    
+    def _get_store(self) -> EquipmentStore:
+        """Equipment store for the configured storage_backend (reopened if the setting changes)."""
+        setting = (self.config.get("storage_backend", "json"), self.config.get("sqlite_database"),
+                   self.config.get("binary_snapshot", False))
+        if self._store is None or setting != self._store_setting:
+            self._store = open_store(self.equipment_file, self.config)
+            self._store_setting = setting
+            self._store_version = None
+            self._shards = {}
+        return self._store
+    
+    def _load_equipment_data(self, content: Optional[bytes] = None) -> List[Dict[str, Any]]:
+        """Load equipment data from the store (or from already read JSON file content)."""
+        store = self._get_store()
         try:
-            with open(self.equipment_file, 'r') as f:
-                return json.load(f)
+            if content is not None:
+                return list(expand_tasks(store.path, load_equipment_json(store.path, content, store.snapshot)))
+            return store.load_all()
         except FileNotFoundError:
-            print(f"Error: {self.equipment_file} not found!")
+            print(f"Error: {store.path} not found!")
             return []
         except json.JSONDecodeError:
-            print(f"Error: Invalid JSON in {self.equipment_file}!")
+            print(f"Error: Invalid JSON in {store.path}!")
+            return []
+        except sqlite3.Error as e:
+            print(f"Error: Could not read {store.path}: {e}")
             return []
     
-    def _load_config(self) -> Dict[str, Any]:
-        """Load configuration from JSON file."""
+    def _reload_equipment(self) -> bool:
+        """
+        Reload equipment data if it changed since the last load. Returns True if reloaded.
+        The JSON file is checked by mtime, size and content hash; other stores by version.
+        """
+        store = self._get_store()
+        if isinstance(store, JsonEquipmentStore):
+            content = self._read_if_changed(store.path)
+            if content is None and self._file_states.get(store.path) is not None:
+                return False
+            # Changed, or missing (the loader reports the error)
+            self.equipment_list = self._load_equipment_data(content)
+            return True
+        if isinstance(store, ShardedEquipmentStore):
+            return self._reload_shards(store)
+        
         try:
+            version = store.version()
+        except sqlite3.Error:
+            version = None
+        if version is not None and version == self._store_version:
+            return False
+        self._store_version = version
+        self.equipment_list = self._load_equipment_data()
+        return True
+    
+    def _ensure_equipment_loaded(self) -> None:
+        """Load equipment_list if it has not been loaded yet."""
+        if not self._equipment_loaded:
+            self._reload_equipment()
+            self._equipment_loaded = True
+    
+    def _reload_shards(self, store: ShardedEquipmentStore) -> bool:
+        """Re-read only the shard files that changed since the last load. Returns True if any did."""
+        try:
+            stamps = store.shard_stamps()
+        except (OSError, ValueError) as e:
+            print(f"Error: Could not read shard manifest: {e}")
+            stamps = {}
+        
+        shards = {}
+        for path, stamp in stamps.items():
+            cached = self._shards.get(path)
+            if cached is not None and cached[0] == stamp:
+                shards[path] = cached
+                continue
+            try:
+                shards[path] = (stamp, store.load_shard(path))
+            except FileNotFoundError:
+                print(f"Error: {path} not found!")
+                shards[path] = (stamp, [])
+            except json.JSONDecodeError:
+                print(f"Error: Invalid JSON in {path}!")
+                shards[path] = (stamp, [])
+        
+        if shards.keys() == self._shards.keys() and all(shards[path] is self._shards[path] for path in shards):
+            return False
+        self._shards = shards
+        self.equipment_list = [equipment for _, records in shards.values() for equipment in records]
+        return True
+    
+    def _load_config(self, content: Optional[bytes] = None) -> Dict[str, Any]:
+        """Load configuration from JSON file (or from already read file content)."""
+        try:
+            if content is not None:
+                return json.loads(content)
             with open(self.config_file, 'r') as f:
                 return json.load(f)
         except FileNotFoundError:
@@ -53,93 +205,106 @@ class MaintenanceChecker:
         """Parse date string in YYYY-MM-DD format."""
         return datetime.strptime(date_str, "%Y-%m-%d")
     
-    def _calculate_next_due_date(self, last_date: datetime, frequency: str) -> datetime:
-        """Calculate the next due date based on frequency."""
-        if frequency == "monthly":
-            return last_date + relativedelta(months=1)
-        elif frequency == "bi_annual":
-            return last_date + relativedelta(months=6)
-        elif frequency == "annual":
-            return last_date + relativedelta(years=1)
-        else:
-            raise ValueError(f"Unknown frequency: {frequency}")
+    def _get_due_maintenance(self) -> List[Dict[str, Any]]:
+        """Get list of equipment with due maintenance (due or due within alert window)."""
+        alert_days_before = self.config.get("alert_days_before", 14)  # Default to 14 days (2 weeks)
+        
+        today = datetime.now().date()
+        
+        # Large multi-site fleets can be split into shards evaluated in a process pool
+        workers = self.config.get("due_check_workers", 1)
+        if workers > 1 and len(self.equipment_list) >= self.config.get("parallel_min_fleet_size", 20000):
+            return find_due_parallel(
+                self.equipment_list,
+                today,
+                alert_days_before,
+                self._get_process_pool(workers),
+                shard_by=self.config.get("shard_by", SHARD_BY_LOCATION),
+                shard_count=workers * 2
+            )
+        
+        # Evaluate every (equipment, frequency) pair at once instead of one strptime/relativedelta per item
+        due_table = self._build_due_table()
+        return due_table.due_items(today, alert_days_before)
+    
+    def _get_process_pool(self, workers: int) -> ProcessPoolExecutor:
+        """Return the worker pool for sharded due checks, recreating it if the worker count changed."""
+        if self._process_pool is None or self._process_pool_workers != workers:
+            if self._process_pool is not None:
+                self._process_pool.shutdown()
+            self._process_pool = ProcessPoolExecutor(max_workers=workers)
+            self._process_pool_workers = workers
+        return self._process_pool
     
-    def _is_due_or_due_soon(self, last_date_str: str, frequency: str, alert_days_before: int = 14) -> Tuple[bool, datetime]:
+    def _build_due_table(self) -> DueTable:
+        """Build the due table, reusing next due dates of entries that did not change."""
+        self._due_table = DueTable(self.equipment_list, self._due_table)
+        return self._due_table
+    
+    def _render_item_fragment(self, item: Dict[str, Any]) -> Tuple[Dict[str, Any], str, Dict[str, Any]]:
         """
-        Check if maintenance is due or due soon (within alert_days_before days).
-        Returns (is_due_or_due_soon, next_due_date).
+        Render the parts of an item's blocks that only change when its record changes:
+        (equipment header block, status text without the due line, tasks block).
+        Fragments are memoized by (serial number, frequency, last maintenance date).
         """
+        equipment = item["equipment"]
+        frequency = item["frequency"]
+        last_maintenance_date = item.get("last_maintenance_date", "N/A")
+        cache_key = (record_key(equipment), frequency, last_maintenance_date)
+        fragment = self._fragment_cache.get(cache_key)
+        if fragment is not None:
+            return fragment
+        
+        tasks = item["tasks"]
+        next_due_date = item.get("next_due_date")
+        
+        # Format the dates for display
         try:
-            last_date = self._parse_date(last_date_str)
-            next_due_date = self._calculate_next_due_date(last_date, frequency)
-            today = datetime.now().date()
-            next_due_date_only = next_due_date.date()
-            
-            # Calculate days until due date
-            days_until_due = (next_due_date_only - today).days
-            
-            # Check if maintenance is due (past due) or due within alert_days_before days
-            is_due_or_due_soon = days_until_due <= alert_days_before
-            
-            return (is_due_or_due_soon, next_due_date)
-        except Exception as e:
-            print(f"Error checking due date: {e}")
-            return (False, datetime.now())
-    
-    def _get_due_maintenance(self) -> List[Dict[str, Any]]:
-        """Get list of equipment with due maintenance (due or due within alert window)."""
-        due_items = []
-        alert_days_before = self.config.get("alert_days_before", 14)  # Default to 14 days (2 weeks)
+            date_obj = self._parse_date(last_maintenance_date)
+            formatted_last_date = date_obj.strftime("%B %d, %Y")  # e.g., "November 12, 2025"
+        except:
+            formatted_last_date = last_maintenance_date
         
-        for equipment in self.equipment_list:
-            maintenance_schedule = equipment.get("maintenance_schedule", {})
-            
-            # Check bi-annual maintenance
-            if "bi_annual" in maintenance_schedule:
-                # Try to get frequency-specific last maintenance date, fall back to general one
-                last_maintenance = maintenance_schedule["bi_annual"].get("last_maintenance_date") or equipment.get("last_maintenance_date")
-                if last_maintenance:
-                    is_due, next_due_date = self._is_due_or_due_soon(last_maintenance, "bi_annual", alert_days_before)
-                    if is_due:
-                        due_items.append({
-                            "equipment": equipment,
-                            "frequency": "Bi-Annual",
-                            "tasks": maintenance_schedule["bi_annual"]["tasks"],
-                            "last_maintenance_date": last_maintenance,
-                            "next_due_date": next_due_date
-                        })
-            
-            # Check annual maintenance
-            if "annual" in maintenance_schedule:
-                # Try to get frequency-specific last maintenance date, fall back to general one
-                last_maintenance = maintenance_schedule["annual"].get("last_maintenance_date") or equipment.get("last_maintenance_date")
-                if last_maintenance:
-                    is_due, next_due_date = self._is_due_or_due_soon(last_maintenance, "annual", alert_days_before)
-                    if is_due:
-                        due_items.append({
-                            "equipment": equipment,
-                            "frequency": "Annual",
-                            "tasks": maintenance_schedule["annual"]["tasks"],
-                            "last_maintenance_date": last_maintenance,
-                            "next_due_date": next_due_date
-                        })
-            
-            # Check monthly maintenance
-            if "monthly" in maintenance_schedule:
-                # Try to get frequency-specific last maintenance date, fall back to general one
-                last_maintenance = maintenance_schedule["monthly"].get("last_maintenance_date") or equipment.get("last_maintenance_date")
-                if last_maintenance:
-                    is_due, next_due_date = self._is_due_or_due_soon(last_maintenance, "monthly", alert_days_before)
-                    if is_due:
-                        due_items.append({
-                            "equipment": equipment,
-                            "frequency": "Monthly",
-                            "tasks": maintenance_schedule["monthly"]["tasks"],
-                            "last_maintenance_date": last_maintenance,
-                            "next_due_date": next_due_date
-                        })
-        
-        return due_items
+        # Format next due date (expiration date)
+        if next_due_date:
+            formatted_due_date = next_due_date.strftime("%B %d, %Y")  # e.g., "December 12, 2025"
+        else:
+            formatted_due_date = "N/A"
+        
+        # Equipment header
+        equipment_text = f"*{equipment['equipment_name']}*"
+        if equipment.get('serial_number'):
+            equipment_text += f" (S/N: {equipment['serial_number']})"
+        if equipment.get('location'):
+            equipment_text += f" - {equipment['location']}"
+        
+        equipment_block = {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": equipment_text
+            }
+        }
+        
+        # Frequency, Last Maintenance Date, and Expiration Date
+        status_text = f"*Frequency:* {frequency}\n*Last Maintenance:* {formatted_last_date}\n*Expires On:* {formatted_due_date}"
+        
+        # Tasks
+        tasks_text = "*Maintenance Steps:*\n"
+        for i, task in enumerate(tasks, 1):
+            tasks_text += f"{i}. {task}\n"
+        
+        tasks_block = {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": tasks_text
+            }
+        }
+        
+        fragment = (equipment_block, status_text, tasks_block)
+        self._fragment_cache.put(cache_key, fragment)
+        return fragment
     
     def _format_slack_message(self, due_items: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Format the maintenance due items into a Slack message."""
@@ -159,25 +324,14 @@ class MaintenanceChecker:
             }
         ]
         
+        today = datetime.now().date()
         for item in due_items:
-            equipment = item["equipment"]
-            frequency = item["frequency"]
-            tasks = item["tasks"]
-            last_maintenance_date = item.get("last_maintenance_date", "N/A")
-            next_due_date = item.get("next_due_date")
+            equipment_block, status_text, tasks_block = self._render_item_fragment(item)
             
-            # Format the dates for display
-            try:
-                date_obj = self._parse_date(last_maintenance_date)
-                formatted_last_date = date_obj.strftime("%B %d, %Y")  # e.g., "November 12, 2025"
-            except:
-                formatted_last_date = last_maintenance_date
-            
-            # Format next due date (expiration date)
+            # Only the due status changes from day to day
+            next_due_date = item.get("next_due_date")
             if next_due_date:
-                formatted_due_date = next_due_date.strftime("%B %d, %Y")  # e.g., "December 12, 2025"
                 # Calculate days until due
-                today = datetime.now().date()
                 days_until_due = (next_due_date.date() - today).days
                 if days_until_due < 0:
                     due_status = f"*OVERDUE by {abs(days_until_due)} day(s)*"
@@ -185,30 +339,9 @@ class MaintenanceChecker:
                     due_status = "*DUE TODAY*"
                 else:
                     due_status = f"*Due in {days_until_due} day(s)*"
-            else:
-                formatted_due_date = "N/A"
-                due_status = ""
-            
-            # Equipment header
-            equipment_text = f"*{equipment['equipment_name']}*"
-            if equipment.get('serial_number'):
-                equipment_text += f" (S/N: {equipment['serial_number']})"
-            if equipment.get('location'):
-                equipment_text += f" - {equipment['location']}"
-            
-            blocks.append({
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": equipment_text
-                }
-            })
-            
-            # Frequency, Last Maintenance Date, and Expiration Date
-            status_text = f"*Frequency:* {frequency}\n*Last Maintenance:* {formatted_last_date}\n*Expires On:* {formatted_due_date}"
-            if due_status:
                 status_text += f"\n{due_status}"
             
+            blocks.append(equipment_block)
             blocks.append({
                 "type": "section",
                 "text": {
@@ -216,20 +349,7 @@ class MaintenanceChecker:
                     "text": status_text
                 }
             })
-            
-            # Tasks
-            tasks_text = "*Maintenance Steps:*\n"
-            for i, task in enumerate(tasks, 1):
-                tasks_text += f"{i}. {task}\n"
-            
-            blocks.append({
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": tasks_text
-                }
-            })
-            
+            blocks.append(tasks_block)
             blocks.append({
                 "type": "divider"
             })
@@ -238,60 +358,197 @@ class MaintenanceChecker:
             "blocks": blocks
         }
     
+    def _get_slack_delivery(self, webhook_url: str) -> SlackDelivery:
+        """Return the pooled Slack delivery for the webhook, recreating it if the config changed."""
+        if self._slack_delivery is None or self._slack_delivery.webhook_url != webhook_url:
+            if self._slack_delivery is not None:
+                self._slack_delivery.close()
+            self._slack_delivery = SlackDelivery(
+                webhook_url,
+                max_concurrent_sends=self.config.get("slack_max_concurrent_sends", 2),
+                max_retries=self.config.get("slack_max_retries", 5)
+            )
+        return self._slack_delivery
+    
     def _send_slack_notification(self, message: Dict[str, Any]) -> bool:
-        """Send notification to Slack via webhook."""
+        """Send notification to Slack via webhook (split into several messages if needed)."""
         webhook_url = self.config.get("slack_webhook_url")
         
         if not webhook_url:
             print("Warning: Slack webhook URL not configured. Skipping notification.")
             return False
         
-        try:
-            response = requests.post(webhook_url, json=message, timeout=10)
-            response.raise_for_status()
+        if self._get_slack_delivery(webhook_url).send(message):
             print("✓ Slack notification sent successfully!")
             return True
-        except requests.exceptions.HTTPError as e:
-            status_code = e.response.status_code if hasattr(e, 'response') and e.response else "Unknown"
-            if status_code == 403:
-                print(f"✗ Slack webhook error (403 Forbidden):")
-                print(f"  The webhook URL may be invalid, expired, or revoked.")
-                print(f"  Please check your Slack webhook settings and update config.json")
-            else:
-                print(f"✗ Slack webhook error ({status_code}): {e}")
-            return False
-        except requests.exceptions.RequestException as e:
-            print(f"✗ Error sending Slack notification: {e}")
-            return False
+        return False
     
     def _reload_data(self) -> None:
-        """Reload equipment data and config to pick up any changes."""
-        self.equipment_list = self._load_equipment_data()
-        self.config = self._load_config()
+        """
+        Reload equipment data and config to pick up any changes.
+        Files whose mtime, size and content hash are unchanged are not parsed again.
+        Records that were added, removed or modified are stored in changed_records.
+        """
+        start = time.perf_counter()
+        self.changed_records = set()
+        
+        self._reload_config()
+        
+        previous = self.equipment_list
+        if self._reload_equipment() and self._equipment_loaded:
+            self.changed_records = _diff_equipment(previous, self.equipment_list)
+        self._equipment_loaded = True
+        
+        self._fragment_cache.max_size = max(1, self.config.get("fragment_cache_size", 1024))
+        if self.changed_records:
+            # Names, locations or tasks of these records may have changed
+            changed = self.changed_records
+            self._fragment_cache.discard_matching(lambda key: key[0] in changed)
+        
+        self.last_reload_seconds = time.perf_counter() - start
+    
+    def _reload_config(self) -> None:
+        """Reload the config if it changed (or is missing, so the loader reports it)."""
+        content = self._read_if_changed(self.config_file)
+        if content is not None or self._file_states.get(self.config_file) is None:
+            self.config = self._load_config(content)
     
     def check_and_notify(self) -> None:
         """Main method to check for due maintenance and send notifications."""
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         print(f"[{timestamp}] Checking maintenance due dates...")
         
+        if self.config.get("streaming_load", False):
+            self._check_and_notify_streaming(timestamp)
+            return
+        
         # Reload data to get latest updates
         self._reload_data()
+        print(f"[{timestamp}] Reloaded data in {self.last_reload_seconds * 1000:.1f} ms ({len(self.changed_records)} record(s) changed)")
         
         due_items = self._get_due_maintenance()
         
+        ledger = self._get_ledger()
+        digest = False
+        if ledger is not None:
+            # Forget items that are no longer due
+            ledger.prune(due_items)
+            digest = bool(due_items) and ledger.digest_due(self.config.get("digest_interval_hours", 0))
+        
         if not due_items:
             print(f"[{timestamp}] No maintenance due at this time.")
             return
         
         print(f"[{timestamp}] Found {len(due_items)} equipment item(s) with due maintenance.")
+        if self._notify(due_items, timestamp, digest) and digest:
+            ledger.record_digest()
+        
+        cache_stats = self._fragment_cache.stats()
+        print(f"[{timestamp}] Message fragment cache: {cache_stats['hits']} hit(s), {cache_stats['misses']} miss(es), hit rate {cache_stats['hit_rate']:.0%}")
+    
+    def _iter_due_items(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Evaluate a stream of equipment records batch by batch and yield the due items."""
+        alert_days_before = self.config.get("alert_days_before", 14)
+        for batch in batched(records, STREAM_BATCH_SIZE):
+            yield from DueTable(batch).due_items(datetime.now().date(), alert_days_before)
+    
+    def _check_and_notify_streaming(self, timestamp: str) -> None:
+        """
+        Streaming variant of check_and_notify for very large fleets.
+        
+        Records are read from the store incrementally and flow through a generator
+        pipeline (load -> due evaluation -> rendering/console output), so memory use stays
+        flat and output starts right away. Due items are sent in Slack-sized messages
+        as soon as enough of them have been found.
+        """
+        self._reload_config()
+        ledger = self._get_ledger()
+        digest = ledger is not None and ledger.digest_due(self.config.get("digest_interval_hours", 0))
+        
+        due_count = 0
+        all_sent = True
+        # Only the due items are kept, for pruning the ledger at the end
+        seen_due_items = []
+        pending = []
+        store = self._get_store()
+        try:
+            for item in self._iter_due_items(store.iter_all()):
+                if not due_count:
+                    print(f"\n[{timestamp}] === Maintenance Due ===")
+                due_count += 1
+                pending.append(item)
+                if ledger is not None:
+                    seen_due_items.append(item)
+                if len(pending) == STREAM_ITEMS_PER_MESSAGE:
+                    all_sent &= self._notify(pending, timestamp, digest, console_header=False)
+                    pending = []
+            if pending:
+                all_sent &= self._notify(pending, timestamp, digest, console_header=False)
+        except FileNotFoundError:
+            print(f"Error: {store.path} not found!")
+            return
+        except ValueError as e:
+            print(f"Error: Invalid JSON in {store.path}! ({e})")
+            return
+        except sqlite3.Error as e:
+            print(f"Error: Could not read {store.path}: {e}")
+            return
+        
+        if ledger is not None:
+            ledger.prune(seen_due_items)
+            if digest and due_count and all_sent:
+                ledger.record_digest()
+        
+        if due_count:
+            print(f"\n[{timestamp}] Found {due_count} equipment item(s) with due maintenance.")
+        else:
+            print(f"[{timestamp}] No maintenance due at this time.")
+    
+    def _get_ledger(self) -> Optional[NotificationLedger]:
+        """Return the notification ledger, or None if it is disabled in the config."""
+        path = self.config.get("notification_ledger_file", "notification_ledger.db")
+        if not path:
+            return None
+        if self._ledger is None or self._ledger.path != path:
+            if self._ledger is not None:
+                self._ledger.close()
+            self._ledger = NotificationLedger(path)
+        return self._ledger
+    
+    def _notify(self, due_items: List[Dict[str, Any]], timestamp: str, digest: bool = False,
+                console_header: bool = True) -> bool:
+        """
+        Send due items to Slack and print them to the console (under a header unless
+        console_header is False, e.g. for the second and later chunks of a streaming check).
+        
+        Items already sent at the same stage are skipped (see NotificationLedger), unless
+        digest is set, in which case everything is sent again.
+        Returns False if a Slack message could not be sent.
+        """
+        ledger = self._get_ledger()
+        today = datetime.now().date()
+        alert_days_before = self.config.get("alert_days_before", 14)
+        if ledger is not None:
+            if digest:
+                print(f"[{timestamp}] Sending periodic digest of {len(due_items)} due item(s).")
+            else:
+                new_items = ledger.filter_new(due_items, today, alert_days_before)
+                if len(new_items) < len(due_items):
+                    print(f"[{timestamp}] {len(due_items) - len(new_items)} item(s) already notified, skipping.")
+                due_items = new_items
+            if not due_items:
+                print(f"[{timestamp}] No new or escalated maintenance to notify.")
+                return True
         
         # Format and send Slack message
         slack_message = self._format_slack_message(due_items)
-        if slack_message:
-            self._send_slack_notification(slack_message)
+        sent = bool(slack_message) and self._send_slack_notification(slack_message)
+        if sent and ledger is not None:
+            ledger.record_sent(due_items, today, alert_days_before)
         
         # Also print to console
-        print(f"\n[{timestamp}] === Maintenance Due ===")
+        if console_header:
+            print(f"\n[{timestamp}] === Maintenance Due ===")
         for item in due_items:
             equipment = item["equipment"]
             print(f"\nEquipment: {equipment['equipment_name']}")
@@ -300,6 +557,8 @@ class MaintenanceChecker:
             print("Tasks:")
             for i, task in enumerate(item['tasks'], 1):
                 print(f"  {i}. {task}")
+        
+        return sent
     
     def run_continuous(self, check_interval_hours: int = 24) -> None:
         """
@@ -340,6 +599,130 @@ class MaintenanceChecker:
             time.sleep(60)
             self.run_continuous(check_interval_hours)
 
+    def _equipment_file_signature(self) -> Optional[Tuple[Any, ...]]:
+        """
+        (mtime, size) of the equipment file, or None if it does not exist.
+        For other storage backends the store version is used instead.
+        """
+        store = self._get_store()
+        if not isinstance(store, JsonEquipmentStore):
+            try:
+                return (store.version(),)
+            except sqlite3.Error:
+                return None
+        try:
+            stat = os.stat(store.path)
+            return (stat.st_mtime, stat.st_size)
+        except OSError:
+            return None
+    
+    def run_scheduled(self) -> None:
+        """
+        Run the maintenance checker in event-driven mode.
+        
+        Instead of a fixed interval, sleeps until the next due-status transition
+        (an item entering the alert window, becoming due today or becoming overdue)
+        and only evaluates the items that changed. The equipment file is polled every
+        scheduler_poll_seconds so completions recorded by update_maintenance_date
+        (CLI or Slack bot) re-key the affected entries.
+        """
+        poll_seconds = self.config.get("scheduler_poll_seconds", 60)
+        
+        print("=" * 60)
+        print("Equipment Maintenance Notification System")
+        print("Running in scheduled (event-driven) mode...")
+        print(f"File change poll: Every {poll_seconds} second(s)")
+        print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print("=" * 60)
+        print("\nPress Ctrl+C to stop\n")
+        
+        try:
+            # Full check once at startup, after that only transitions are evaluated
+            self.check_and_notify()
+            # The startup check may have streamed; the scheduler needs the records in memory
+            self._ensure_equipment_loaded()
+            alert_days_before = self.config.get("alert_days_before", 14)
+            due_table = self._build_due_table()
+            scheduler = DueScheduler(alert_days_before)
+            scheduler.sync(due_table, datetime.now().date())
+            signature = self._equipment_file_signature()
+            
+            while True:
+                wake_at = scheduler.next_wakeup()
+                if wake_at:
+                    print(f"\nNext transition scheduled for: {wake_at.strftime('%Y-%m-%d %H:%M:%S')} ({len(scheduler)} item(s) tracked)")
+                else:
+                    print("\nNo upcoming transitions. Waiting for equipment data changes...")
+                print("-" * 60)
+                
+                # Sleep until the next transition, waking up early if the equipment file changes
+                file_changed = False
+                while True:
+                    now = datetime.now()
+                    if wake_at and now >= wake_at:
+                        break
+                    remaining = (wake_at - now).total_seconds() if wake_at else poll_seconds
+                    time.sleep(max(0, min(remaining, poll_seconds)))
+                    new_signature = self._equipment_file_signature()
+                    if new_signature != signature:
+                        signature = new_signature
+                        file_changed = True
+                        break
+                
+                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                today = datetime.now().date()
+                changed_keys = set()
+                
+                if file_changed:
+                    self._reload_data()
+                    due_table = self._build_due_table()
+                    new_alert_days = self.config.get("alert_days_before", 14)
+                    if new_alert_days != alert_days_before:
+                        # Alert window changed, every transition moves
+                        alert_days_before = new_alert_days
+                        scheduler = DueScheduler(alert_days_before)
+                    changed_keys |= scheduler.sync(due_table, today)
+                    print(f"[{timestamp}] Equipment data changed: {len(changed_keys)} item(s) re-keyed.")
+                
+                changed_keys |= scheduler.pop_transitions(today)
+                if not changed_keys:
+                    continue
+                
+                rows = [row for row in range(len(due_table)) if due_table.key(row) in changed_keys]
+                due_items = due_table.due_items(today, alert_days_before, rows)
+                if due_items:
+                    print(f"[{timestamp}] {len(due_items)} item(s) changed due status.")
+                    self._notify(due_items, timestamp)
+                
+        except KeyboardInterrupt:
+            print("\n\nStopping maintenance checker...")
+            print(f"Stopped at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        except Exception as e:
+            print(f"\nError in scheduled mode: {e}")
+            print("Restarting in 60 seconds...")
+            time.sleep(60)
+            self.run_scheduled()
+
+    def print_due_from_index(self, days: Optional[int] = None) -> None:
+        """
+        Print what is due using the persistent next-due index (no full recomputation).
+        With days=None only overdue items are shown.
+        """
+        # Only hand over records that are already in memory; otherwise the index loads what it needs
+        index = DueIndex.load_or_build(self._get_store(), self.equipment_list if self._equipment_loaded else None)
+        today = datetime.now().date()
+        if days is None:
+            entries = index.overdue(today)
+            print(f"=== Overdue Maintenance ({len(entries)}) ===")
+        else:
+            entries = index.due_within(days, today)
+            print(f"=== Maintenance Due Within {days} Day(s) ({len(entries)}) ===")
+        
+        for entry in entries:
+            days_until_due = (datetime.strptime(entry["next_due_date"], "%Y-%m-%d").date() - today).days
+            print(f"\n{entry['equipment_name']} (S/N: {entry['serial_number'] or 'N/A'}) - {entry['location'] or 'N/A'}")
+            print(f"  {FREQUENCY_LABELS[entry['frequency']]}: due {entry['next_due_date']} ({days_until_due} day(s))")
+
 
 def main():
     """Main entry point."""
@@ -347,11 +730,27 @@ def main():
     
     checker = MaintenanceChecker()
     
+    if "--stream" in sys.argv:
+        # Parse the equipment file incrementally instead of loading it all first
+        checker.config["streaming_load"] = True
+        sys.argv.remove("--stream")
+    
     # Check if running in continuous mode
     if len(sys.argv) > 1 and sys.argv[1] == "--continuous":
         # Get check interval from config or use default
         check_interval = checker.config.get("check_interval_hours", 24)
         checker.run_continuous(check_interval)
+    elif len(sys.argv) > 1 and sys.argv[1] == "--scheduled":
+        # Wake up only when an item's due status changes
+        checker.run_scheduled()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--overdue":
+        checker.print_due_from_index()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--due-in":
+        # e.g. --due-in 14
+        if len(sys.argv) < 3 or not sys.argv[2].isdigit():
+            print("Usage: python maintenance_checker.py --due-in <days>   (days: a whole number, e.g. 14)")
+            sys.exit(1)
+        checker.print_due_from_index(int(sys.argv[2]))
     else:
         # Run once
         checker.check_and_notify()
@@ -0,0 +1,272 @@
+"""
+Columnar maintenance history
+Every recorded completion is kept (not just the latest date per frequency) as
+NumPy column chunks in <base>.completions/, so aggregate questions such as the
+on-time rate per location are answered with a few array operations over years
+of history instead of a loop over records.
+
+New completions are appended to pending.jsonl; every chunk_rows completions are
+packed into an immutable chunk-NNNNNN.npz holding one array per column.
+"""
+
+import glob
+import io
+import json
+import os
+import threading
+from datetime import date
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+
+from due_engine import FREQUENCY_MONTHS, add_months, parse_dates, record_key
+from equipment_model import schedule_last_date
+from file_lock import FileLock, atomic_write_bytes
+
+DEFAULT_CHUNK_ROWS = 4096
+
+# Columns of every chunk, with their array types; dates are days (NaT when unknown)
+COLUMNS = {
+    "completed": "datetime64[D]",
+    "previous": "datetime64[D]",
+    "asset": str,
+    "equipment_name": str,
+    "location": str,
+    "frequency": str,
+    "technician": str,
+}
+
+
+def history_dir_for(store_path: str) -> str:
+    """Directory of the completion history that belongs to an equipment file or database."""
+    base, _ = os.path.splitext(store_path)
+    return f"{base}.completions"
+
+
+def completion_entry(equipment: Dict[str, Any], frequency: str, completed: str, user: Optional[str]) -> Dict[str, Any]:
+    """
+    History row for a completion, taken from the equipment record before the new
+    date is applied (its current date for the frequency is what the completion was due after).
+    """
+    return {
+        "completed": completed,
+        "previous": schedule_last_date(equipment, frequency),
+        "asset": record_key(equipment),
+        "equipment_name": equipment.get("equipment_name", "Unknown"),
+        "location": equipment.get("location") or "N/A",
+        "frequency": frequency,
+        "technician": (user or "").strip().upper() or "N/A",
+    }
+
+
+def _columns_from_entries(entries: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Column arrays for history rows."""
+    columns = {}
+    for name, kind in COLUMNS.items():
+        values = [entry.get(name) for entry in entries]
+        if kind == str:
+            columns[name] = np.array([str(value or "") for value in values], dtype=str)
+        else:
+            # Missing dates (e.g. no earlier completion) stay NaT
+            dates = np.full(len(values), np.datetime64("NaT"), dtype=kind)
+            known = [i for i, value in enumerate(values) if value]
+            if known:
+                dates[known] = parse_dates([values[i] for i in known])
+            columns[name] = dates
+    return columns
+
+
+# (chunk file path, mtime) -> columns; chunks never change once written
+_chunk_cache: Dict[Tuple[str, int], Dict[str, np.ndarray]] = {}
+_chunk_cache_lock = threading.Lock()
+
+
+class CompletionHistory:
+    """Append-only completion history stored as NumPy column chunks."""
+
+    def __init__(self, directory: str, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        self.directory = directory
+        self.pending_path = os.path.join(directory, "pending.jsonl")
+        self.chunk_rows = max(1, chunk_rows)
+
+    def _chunk_paths(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.directory, "chunk-*.npz")))
+
+    def _read_pending(self) -> List[Dict[str, Any]]:
+        entries = []
+        try:
+            with open(self.pending_path, 'r') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # Torn last line from a crash
+                        continue
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def append(self, entries: List[Dict[str, Any]]) -> None:
+        """Record completions (see completion_entry), packing a new chunk when enough are pending."""
+        if not entries:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with FileLock(self.directory):
+            with open(self.pending_path, 'a') as f:
+                f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+                f.flush()
+                os.fsync(f.fileno())
+
+            pending = self._read_pending()
+            if len(pending) >= self.chunk_rows:
+                buffer = io.BytesIO()
+                np.savez(buffer, **_columns_from_entries(pending))
+                atomic_write_bytes(os.path.join(self.directory, f"chunk-{len(self._chunk_paths()) + 1:06d}.npz"), buffer.getvalue())
+                # A crash before this truncate would pack these rows twice; it only happens between two fsyncs
+                with open(self.pending_path, 'w'):
+                    pass
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """All recorded completions as column arrays (chunks are cached in memory)."""
+        if not os.path.isdir(self.directory):
+            return _columns_from_entries([])
+        with FileLock(self.directory):
+            chunk_paths = self._chunk_paths()
+            pending = self._read_pending()
+
+        parts = []
+        for path in chunk_paths:
+            cache_key = (path, os.stat(path).st_mtime_ns)
+            with _chunk_cache_lock:
+                chunk = _chunk_cache.get(cache_key)
+            if chunk is None:
+                with np.load(path, allow_pickle=False) as npz:
+                    chunk = {name: npz[name] for name in COLUMNS}
+                with _chunk_cache_lock:
+                    _chunk_cache[cache_key] = chunk
+            parts.append(chunk)
+        parts.append(_columns_from_entries(pending))
+        return {name: np.concatenate([part[name] for part in parts]) for name in COLUMNS}
+
+
+class HistoryStats:
+    """Aggregate queries over completion history columns."""
+
+    def __init__(self, columns: Dict[str, np.ndarray], since: Optional[date] = None, until: Optional[date] = None):
+        keep = ~np.isnat(columns["completed"])
+        if since is not None:
+            keep &= columns["completed"] >= np.datetime64(since, "D")
+        if until is not None:
+            keep &= columns["completed"] <= np.datetime64(until, "D")
+        self.columns = {name: values[keep] for name, values in columns.items()}
+
+        completed = self.columns["completed"]
+        previous = self.columns["previous"]
+        frequencies, frequency_codes = np.unique(self.columns["frequency"], return_inverse=True)
+        months = np.array([FREQUENCY_MONTHS.get(f, 0) for f in frequencies], dtype=np.int64)[frequency_codes]
+        # Completions without an earlier date (or with an unknown frequency) have no due date
+        self.has_due = ~np.isnat(previous) & (months > 0)
+        due = np.full(len(completed), np.datetime64("NaT"), dtype="datetime64[D]")
+        due[self.has_due] = add_months(previous[self.has_due], months[self.has_due])
+        # Due dates past 9999-12-31 are NaT
+        self.has_due &= ~np.isnat(due)
+        self.days_late = np.zeros(len(completed), dtype=np.int64)
+        self.days_late[self.has_due] = (completed[self.has_due] - due[self.has_due]).astype(np.int64)
+        self.on_time = self.has_due & (self.days_late <= 0)
+        self.late = self.has_due & (self.days_late > 0)
+
+    def __len__(self) -> int:
+        return len(self.columns["completed"])
+
+    def _grouped(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Distinct keys and, for each row, the position of its key."""
+        return np.unique(keys, return_inverse=True)
+
+    def _summary(self, groups: np.ndarray, inverse: np.ndarray) -> List[Dict[str, Any]]:
+        """Completion count, on-time rate and average days overdue per group."""
+        count = len(groups)
+        completions = np.bincount(inverse, minlength=count)
+        with_due = np.bincount(inverse, weights=self.has_due, minlength=count)
+        on_time = np.bincount(inverse, weights=self.on_time, minlength=count)
+        late = np.bincount(inverse, weights=self.late, minlength=count)
+        days_overdue = np.bincount(inverse, weights=np.where(self.late, self.days_late, 0), minlength=count)
+        return [
+            {
+                "key": str(groups[i]),
+                "completions": int(completions[i]),
+                "on_time_rate": float(on_time[i] / with_due[i]) if with_due[i] else None,
+                "late": int(late[i]),
+                "average_days_overdue": float(days_overdue[i] / late[i]) if late[i] else 0.0,
+            }
+            for i in range(count)
+        ]
+
+    def overall(self) -> Dict[str, Any]:
+        """Totals over all completions."""
+        with_due = int(self.has_due.sum())
+        late = int(self.late.sum())
+        return {
+            "completions": len(self),
+            "on_time_rate": float(self.on_time.sum() / with_due) if with_due else None,
+            "late": late,
+            "average_days_overdue": float(self.days_late[self.late].mean()) if late else 0.0,
+        }
+
+    def by_location(self) -> List[Dict[str, Any]]:
+        """On-time rate and average days overdue per location, worst first."""
+        rows = self._summary(*self._grouped(self.columns["location"]))
+        return sorted(rows, key=lambda row: (row["on_time_rate"] is None, row["on_time_rate"] or 0.0, row["key"]))
+
+    def by_technician(self) -> List[Dict[str, Any]]:
+        """Completions per technician, most first."""
+        rows = self._summary(*self._grouped(self.columns["technician"]))
+        return sorted(rows, key=lambda row: (-row["completions"], row["key"]))
+
+    def asset_lateness(self, asset: Optional[str] = None, period: str = "Y", limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Average days late per asset and period ("Y" or "M"), for the given asset or the
+        limit assets with the highest overall lateness. Periods are in date order.
+        """
+        rows = self.has_due.copy()
+        if asset is not None:
+            rows &= self.columns["asset"] == asset
+        assets, asset_codes = self._grouped(self.columns["asset"][rows])
+        if not len(assets):
+            return []
+        days_late = self.days_late[rows]
+        names = self.columns["equipment_name"][rows]
+
+        totals = np.bincount(asset_codes, weights=days_late, minlength=len(assets))
+        counts = np.bincount(asset_codes, minlength=len(assets))
+        order = np.argsort(-(totals / counts), kind="stable")[:limit]
+
+        periods = self.columns["completed"][rows].astype(f"datetime64[{period}]")
+        period_values, period_codes = self._grouped(periods)
+        cell = asset_codes * len(period_values) + period_codes
+        cell_totals = np.bincount(cell, weights=days_late, minlength=len(assets) * len(period_values))
+        cell_counts = np.bincount(cell, minlength=len(assets) * len(period_values))
+
+        result = []
+        for code in order:
+            first_row = int(np.argmax(asset_codes == code))
+            cells = slice(code * len(period_values), (code + 1) * len(period_values))
+            result.append({
+                "asset": str(assets[code]),
+                "equipment_name": str(names[first_row]),
+                "completions": int(counts[code]),
+                "average_days_late": float(totals[code] / counts[code]),
+                "periods": [
+                    {"period": str(value), "completions": int(n), "average_days_late": float(total / n)}
+                    for value, total, n in zip(period_values, cell_totals[cells], cell_counts[cells]) if n
+                ],
+            })
+        return result
+
+
+def format_rate(rate: Optional[float]) -> str:
+    """An on-time rate as a whole percentage ("n/a" when there is nothing to rate)."""
+    return "n/a" if rate is None else f"{rate * 100:.0f}%"
+
+
+def load_stats(store_path: str, since: Optional[date] = None, until: Optional[date] = None) -> HistoryStats:
+    """History statistics for an equipment store's path."""
+    return HistoryStats(CompletionHistory(history_dir_for(store_path)).columns(), since, until)
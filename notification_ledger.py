@@ -0,0 +1,119 @@
+"""
+Notification ledger
+Small SQLite database recording which due items were already sent to Slack, keyed by
+(serial number, frequency, next due date), so each check only sends new items and
+escalations (due soon -> due today -> overdue) instead of the whole alert window
+"""
+
+import sqlite3
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+
+from due_engine import STAGE_ORDER, due_stage, record_key
+
+
+def _item_key(item: Dict[str, Any]) -> Tuple[str, str, str]:
+    """Ledger key of a due item: (serial number, frequency, next due date)."""
+    return (record_key(item["equipment"]), item["frequency"], item["next_due_date"].strftime("%Y-%m-%d"))
+
+
+class NotificationLedger:
+    """Records what was sent and when, and filters due items down to what is new."""
+
+    def __init__(self, path: str = "notification_ledger.db"):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS notifications (
+                serial_number TEXT NOT NULL,
+                frequency TEXT NOT NULL,
+                next_due_date TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                first_sent_at TEXT NOT NULL,
+                last_sent_at TEXT NOT NULL,
+                PRIMARY KEY (serial_number, frequency, next_due_date)
+            );
+            CREATE TABLE IF NOT EXISTS ledger_meta (
+                name TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+        self.connection.commit()
+
+    def _stage(self, item: Dict[str, Any], today: date, alert_days_before: int) -> str:
+        """Due stage of an item today."""
+        return due_stage((item["next_due_date"].date() - today).days, alert_days_before)
+
+    def filter_new(self, due_items: List[Dict[str, Any]], today: date, alert_days_before: int) -> List[Dict[str, Any]]:
+        """Return the items never sent before or whose stage escalated since they were last sent."""
+        sent_stages = {
+            (serial_number, frequency, next_due_date): stage
+            for serial_number, frequency, next_due_date, stage in self.connection.execute(
+                "SELECT serial_number, frequency, next_due_date, stage FROM notifications"
+            )
+        }
+        new_items = []
+        for item in due_items:
+            sent_stage = sent_stages.get(_item_key(item))
+            stage = self._stage(item, today, alert_days_before)
+            if sent_stage is None or STAGE_ORDER.index(stage) > STAGE_ORDER.index(sent_stage):
+                new_items.append(item)
+        return new_items
+
+    def record_sent(self, due_items: List[Dict[str, Any]], today: date, alert_days_before: int) -> None:
+        """Record that the items were sent, at their current stage."""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = [_item_key(item) + (self._stage(item, today, alert_days_before), now, now) for item in due_items]
+        with self.connection:
+            self.connection.executemany(
+                """
+                INSERT INTO notifications (serial_number, frequency, next_due_date, stage, first_sent_at, last_sent_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (serial_number, frequency, next_due_date)
+                DO UPDATE SET stage = excluded.stage, last_sent_at = excluded.last_sent_at
+                """,
+                rows
+            )
+
+    def prune(self, due_items: List[Dict[str, Any]]) -> int:
+        """
+        Forget items that are no longer due (e.g. the maintenance was completed and the
+        next due date moved). Returns the number of rows removed.
+        """
+        keep = {_item_key(item) for item in due_items}
+        stale = [
+            key for key in self.connection.execute("SELECT serial_number, frequency, next_due_date FROM notifications")
+            if key not in keep
+        ]
+        with self.connection:
+            self.connection.executemany(
+                "DELETE FROM notifications WHERE serial_number = ? AND frequency = ? AND next_due_date = ?",
+                stale
+            )
+        return len(stale)
+
+    def last_digest_at(self) -> Optional[datetime]:
+        """When the last full digest was sent, if ever."""
+        row = self.connection.execute("SELECT value FROM ledger_meta WHERE name = 'last_digest_at'").fetchone()
+        return datetime.strptime(row[0], "%Y-%m-%d %H:%M:%S") if row else None
+
+    def digest_due(self, interval_hours: float, now: Optional[datetime] = None) -> bool:
+        """True if a full digest should be sent (interval_hours <= 0 disables digests)."""
+        if not interval_hours or interval_hours <= 0:
+            return False
+        last = self.last_digest_at()
+        now = now or datetime.now()
+        return last is None or now - last >= timedelta(hours=interval_hours)
+
+    def record_digest(self, now: Optional[datetime] = None) -> None:
+        """Remember that a full digest was sent."""
+        now = now or datetime.now()
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO ledger_meta (name, value) VALUES ('last_digest_at', ?)",
+                (now.strftime("%Y-%m-%d %H:%M:%S"),)
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
@@ -0,0 +1,97 @@
+"""
+Parallel sharded due checking
+Partitions the fleet by location (or by a hash of the serial number), evaluates the
+shards in a process pool and merges the results into one ordered due_items list
+"""
+
+import zlib
+from concurrent.futures import Executor
+from datetime import date, datetime, time
+from typing import List, Dict, Any, Tuple
+
+from due_engine import DueTable, FREQUENCY_LABELS, FREQUENCY_ORDER
+from equipment_model import schedule_last_date
+
+
+SHARD_BY_LOCATION = "location"
+SHARD_BY_SERIAL_HASH = "serial_hash"
+
+
+def shard_key(equipment: Dict[str, Any], shard_by: str, shard_count: int) -> str:
+    """Shard an equipment record belongs to."""
+    if shard_by == SHARD_BY_LOCATION:
+        return str(equipment.get("location") or "")
+    # crc32 is stable across processes and runs, unlike hash()
+    serial_number = str(equipment.get("serial_number") or equipment.get("equipment_name", ""))
+    return str(zlib.crc32(serial_number.encode("utf-8")) % shard_count)
+
+
+def partition(equipment_list: List[Dict[str, Any]], shard_by: str, shard_count: int) -> List[List[int]]:
+    """Split the fleet into shards of record indices (largest shard first)."""
+    shards: Dict[str, List[int]] = {}
+    for index, equipment in enumerate(equipment_list):
+        shards.setdefault(shard_key(equipment, shard_by, shard_count), []).append(index)
+    return sorted(shards.values(), key=len, reverse=True)
+
+
+def _slim_record(equipment: Dict[str, Any]) -> Dict[str, Any]:
+    """Only the fields the due check needs, so shards are cheap to send to worker processes."""
+    return {
+        "last_maintenance_date": equipment.get("last_maintenance_date"),
+        "maintenance_schedule": {
+            frequency: {"tasks": (), "last_maintenance_date": entry.get("last_maintenance_date")}
+            for frequency, entry in equipment.get("maintenance_schedule", {}).items()
+        }
+    }
+
+
+def evaluate_shard(records: List[Dict[str, Any]], indices: List[int], today_ordinal: int, alert_days_before: int) -> List[Tuple[int, str, int]]:
+    """
+    Worker: evaluate one shard and return its due entries as compact tuples
+    (fleet index, frequency, next due date ordinal) so results are cheap to send back.
+    """
+    table = DueTable(records)
+    results = []
+    for row in table.due_rows(date.fromordinal(today_ordinal), alert_days_before):
+        results.append((
+            indices[table.record_index[row]],
+            table.frequencies[row],
+            table.next_due_date(row).toordinal()
+        ))
+    return results
+
+
+def find_due_parallel(
+    equipment_list: List[Dict[str, Any]],
+    today: date,
+    alert_days_before: int,
+    executor: Executor,
+    shard_by: str = SHARD_BY_LOCATION,
+    shard_count: int = 8
+) -> List[Dict[str, Any]]:
+    """
+    Evaluate the fleet shard by shard in the executor and merge the results into
+    the same due_items list (and order) as DueTable.due_items would return.
+    """
+    futures = []
+    for indices in partition(equipment_list, shard_by, shard_count):
+        records = [_slim_record(equipment_list[index]) for index in indices]
+        futures.append(executor.submit(evaluate_shard, records, indices, today.toordinal(), alert_days_before))
+
+    rows = []
+    for future in futures:
+        rows.extend(future.result())
+    # Same order as a single-process scan: fleet order, then frequency order
+    rows.sort(key=lambda row: (row[0], FREQUENCY_ORDER.index(row[1])))
+
+    due_items = []
+    for index, frequency, next_due_ordinal in rows:
+        equipment = equipment_list[index]
+        due_items.append({
+            "equipment": equipment,
+            "frequency": FREQUENCY_LABELS[frequency],
+            "tasks": equipment["maintenance_schedule"][frequency]["tasks"],
+            "last_maintenance_date": schedule_last_date(equipment, frequency),
+            "next_due_date": datetime.combine(date.fromordinal(next_due_ordinal), time())
+        })
+    return due_items
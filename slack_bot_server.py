@@ -3,22 +3,30 @@ Slack Bot Server for Equipment Maintenance Updates
 Allows users to update maintenance dates via Slack commands
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
+import requests
+import atexit
 import json
 import os
+import sqlite3
 import sys
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
 
 # Import functions from update_maintenance_date module
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from update_maintenance_date import (
-    load_equipment_data,
-    save_equipment_data,
-    find_equipment,
-    update_maintenance_date as update_date
-)
-from excel_updater import update_excel_maintenance
+from update_maintenance_date import update_maintenance_date as update_date
+from excel_write_behind import DEFAULT_MAX_BATCH, ExcelWriteBehind
+from due_engine import FREQUENCY_LABELS, record_key
+from due_index import DueIndex
+from equipment_model import equipment_from_json
+from equipment_index import get_equipment_index, normalize_key
+from equipment_store import equipment_reads, open_store, reset_equipment_reads
+from maintenance_history import format_rate, load_stats
+from slack_pages import PAGE_ACTIONS, PagedView, cache_stats, decode_cursor, get_view, location_matches, page_body
 
 app = Flask(__name__)
 
@@ -32,6 +40,87 @@ def load_config():
 
 config = load_config()
 SLACK_VERIFICATION_TOKEN = config.get("slack_verification_token", "")
+# Fuzzy equipment search: time allowed per search, candidates shown, and the score lead
+# the best candidate needs over the next one to be used without asking
+FUZZY_SEARCH_BUDGET_MS = float(config.get("fuzzy_search_budget_ms", 50))
+FUZZY_SEARCH_LIMIT = 5
+FUZZY_SEARCH_MARGIN = 0.15
+# Items per page of list and status (Slack allows 50 blocks per message)
+LIST_PAGE_SIZE = 20
+STATUS_PAGE_SIZE = 15
+# Longest look-ahead (status due) and look-back (stats) accepted from a command
+MAX_COMMAND_DAYS = 3650
+# Print the response time and number of equipment data reads of every request
+LOG_REQUEST_TIMING = config.get("log_request_timing", True)
+# Excel log entries are written in the background and the result posted to the command's response_url
+excel_writer = ExcelWriteBehind(max_batch=int(config.get("excel_write_batch_size", DEFAULT_MAX_BATCH)))
+# Production server (python slack_bot_server.py; --debug runs the Flask development server)
+SERVER_HOST = config.get("slack_bot_host", "0.0.0.0")
+SERVER_PORT = int(config.get("slack_bot_port", 5000))
+SERVER_THREADS = int(config.get("slack_bot_threads", 8))
+SHUTDOWN_DRAIN_SECONDS = float(config.get("slack_bot_shutdown_seconds", 30))
+
+
+@app.before_request
+def start_request_timing():
+    g.request_start = time.perf_counter()
+    reset_equipment_reads()
+
+
+@app.after_request
+def log_request_timing(response):
+    if LOG_REQUEST_TIMING and "request_start" in g:
+        elapsed = (time.perf_counter() - g.request_start) * 1000
+        print(f"{request.method} {request.path} {response.status_code} - {elapsed:.1f} ms, "
+              f"{equipment_reads()} equipment data read(s)")
+    return response
+
+
+def equipment_index():
+    """
+    Index of the equipment data, parsed once and shared by all requests until the store
+    changes (file stamp or data version; the bot's own updates are written through).
+    None if the data cannot be read. Read-only.
+    """
+    try:
+        return get_equipment_index(open_store(config=config))
+    except FileNotFoundError:
+        print("Error: equipment data not found!")
+    except json.JSONDecodeError:
+        print("Error: Invalid JSON in equipment data!")
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Error: Could not read equipment data: {e}")
+    return None
+
+
+def get_equipment() -> list:
+    """Equipment data shared by all requests (see equipment_index). Read-only."""
+    index = equipment_index()
+    return index.equipment if index is not None else []
+
+
+# Frequency words of an update command
+UPDATE_FREQUENCIES = ["monthly", "bi_annual", "annual", "bi-annual"]
+
+
+def is_update_word(part: str) -> bool:
+    """True for a frequency or a YYYY-MM-DD date, which only appear in update commands."""
+    return part.lower() in UPDATE_FREQUENCIES or (len(part) == 10 and part.count("-") == 2)
+
+
+def subcommand(parts: list) -> str:
+    """
+    Subcommand ("list", "stats", "status" or "dates") named by the first word, or "" if the
+    text is an update instead (e.g. `Status Board monthly 2025-11-15`). stats is followed
+    by nothing or a day count; the others only by a view, day count or location, never by
+    a frequency or date.
+    """
+    command = parts[0].lower() if parts else ""
+    if command == "stats":
+        return command if len(parts) == 1 or (len(parts) == 2 and parts[1].isdigit()) else ""
+    if command in ("list", "status", "dates") and not any(is_update_word(part) for part in parts[1:]):
+        return command
+    return ""
 
 
 def parse_slack_message(text: str) -> dict:
@@ -69,7 +158,7 @@ def parse_slack_message(text: str) -> dict:
     
     for i, part in enumerate(parts):
         part_lower = part.lower()
-        if part_lower in ["monthly", "bi_annual", "annual", "bi-annual"]:
+        if part_lower in UPDATE_FREQUENCIES:
             frequency = part_lower.replace("-", "_")
         elif len(part) == 10 and part.count("-") == 2:  # Date format YYYY-MM-DD
             date = part
@@ -86,10 +175,9 @@ def parse_slack_message(text: str) -> dict:
         # Check if it starts with S/N:
         if remaining.upper().startswith("S/N:") or remaining.upper().startswith("SN:"):
             s_n_part = remaining.split()[0]
-            if ":" in s_n_part:
-                serial_number = s_n_part.split(":", 1)[1].strip()
-            else:
-                # S/N: is separate, get next part
+            serial_number = s_n_part.split(":", 1)[1].strip()
+            if not serial_number:
+                # "S/N: 14024": the serial number is the next part
                 remaining_parts = remaining.split()
                 if len(remaining_parts) > 1:
                     serial_number = remaining_parts[1]
@@ -97,9 +185,7 @@ def parse_slack_message(text: str) -> dict:
             # Try to extract equipment name from remaining parts (before frequency)
             name_parts = []
             for part in parts:
-                if part.lower() in ["monthly", "bi_annual", "annual", "bi-annual"]:
-                    break
-                if len(part) == 10 and part.count("-") == 2:
+                if is_update_word(part):
                     break
                 name_parts.append(part)
             if name_parts:
@@ -114,16 +200,20 @@ def parse_slack_message(text: str) -> dict:
     }
 
 
-def find_equipment_by_name_or_sn(equipment_name: str = None, serial_number: str = None):
-    """Find equipment by name or serial number."""
-    data = load_equipment_data()
+def find_equipment_by_name_or_sn(equipment_name: str = None, serial_number: str = None) -> Optional[list]:
+    """
+    Find equipment by name or serial number.
+    Returns the matching equipment: one entry for a clear match, several when the
+    name is ambiguous (the user has to pick one), none when nothing matches.
+    None if the equipment data cannot be read.
+    """
+    index = equipment_index()
+    if index is None:
+        return None
     
     if serial_number:
-        serial_number = serial_number.strip()
-        for eq in data:
-            eq_sn = str(eq.get("serial_number", "")).strip().lower()
-            if eq_sn == serial_number.lower():
-                return eq
+        equipment = index.get_by_serial(serial_number)
+        return [equipment] if equipment is not None else []
     elif equipment_name:
         equipment_name = equipment_name.strip()
         # Remove quotes if present
@@ -131,20 +221,239 @@ def find_equipment_by_name_or_sn(equipment_name: str = None, serial_number: str
             equipment_name = equipment_name[1:-1]
         
         # Try exact match first
-        for eq in data:
-            eq_name = str(eq.get("equipment_name", "")).strip().lower()
-            if eq_name == equipment_name.lower():
-                return eq
+        matches = index.get_by_name(equipment_name)
+        if matches:
+            return matches[:FUZZY_SEARCH_LIMIT]
+        
+        # Fuzzy match on name, model, manufacturer and location
+        ranked = index.search(equipment_name, limit=FUZZY_SEARCH_LIMIT, budget_ms=FUZZY_SEARCH_BUDGET_MS)
+        if len(ranked) == 1 or (ranked and ranked[0][0] - ranked[1][0] >= FUZZY_SEARCH_MARGIN):
+            return [ranked[0][1]]
+        return [equipment for _, equipment in ranked]
+    
+    return []
+
+
+def stats_response(stats, days: int) -> dict:
+    """Slack message with on-time rates, lateness and completions per technician."""
+    title = f"Maintenance Stats (Last {days} Days)"
+    if not len(stats):
+        return {
+            "response_type": "ephemeral",
+            "text": f"*{title}:* no completions recorded."
+        }
+    
+    overall = stats.overall()
+    summary = f"*Completions:* {overall['completions']} | *On time:* {format_rate(overall['on_time_rate'])} | "
+    summary += f"*Late:* {overall['late']} | *Avg days overdue:* {overall['average_days_overdue']:.1f}"
+    
+    locations = "*On-time rate by location:*\n"
+    for row in stats.by_location()[:10]:
+        locations += f"• {row['key']}: {format_rate(row['on_time_rate'])} ({row['completions']} done, "
+        locations += f"{row['late']} late, avg {row['average_days_overdue']:.1f} days overdue)\n"
+    
+    technicians = "*Completions by technician:*\n"
+    for row in stats.by_technician()[:10]:
+        technicians += f"• {row['key']}: {row['completions']} (on time {format_rate(row['on_time_rate'])})\n"
+    
+    most_overdue = "*Most overdue equipment (avg days late):*\n"
+    for row in stats.asset_lateness(period="M", limit=5):
+        most_overdue += f"• {row['equipment_name']} ({row['asset']}): {row['average_days_late']:+.1f}\n"
+    
+    blocks = [
+        {
+            "type": "header",
+            "text": {
+                "type": "plain_text",
+                "text": title
+            }
+        }
+    ]
+    for section in (summary, locations, technicians, most_overdue):
+        blocks.append({
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": section
+            }
+        })
+    
+    return {
+        "response_type": "ephemeral",
+        "text": title,
+        "blocks": blocks
+    }
+
+
+def disambiguation_response(search_term: str, candidates: list, parsed: dict):
+    """Ask the user to pick one of several matching equipment, with a ready-to-use command for each."""
+    blocks = [{
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": f"*{len(candidates)} equipment match* `{search_term}`*. Which one did you mean?*"
+        }
+    }]
+    
+    initials = f" {parsed['initials']}" if parsed.get("initials") else ""
+    for eq in candidates:
+        name = eq.get("equipment_name", "Unknown")
+        sn = eq.get("serial_number")
+        details = " | ".join(
+            str(eq[field]) for field in ("manufacturer", "model", "location") if eq.get(field)
+        )
+        target = f"S/N:{sn}" if sn else f"\"{name}\""
+        text = f"*{name}*\nS/N: {sn or 'N/A'}"
+        if details:
+            text += f" | {details}"
+        text += f"\n`/maintenance {target} {parsed['frequency']} {parsed['date']}{initials}`"
+        blocks.append({
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": text
+            }
+        })
+    
+    return jsonify({
+        "response_type": "ephemeral",
+        "text": f"Several equipment match {search_term}",
+        "blocks": blocks
+    })
+
+
+def _list_view(data: list, location_filter: str) -> PagedView:
+    """Equipment names, serial numbers and locations."""
+    items = []
+    for eq in data:
+        if not location_matches(eq.get("location"), location_filter):
+            continue
+        name = eq.get("equipment_name", "Unknown")
+        sn = eq.get("serial_number", "N/A")
+        location = eq.get("location", "N/A")
+        items.append((record_key(eq), [{
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"{len(items) + 1}. *{name}*\n   S/N: {sn} | Location: {location}"
+            }
+        }]))
+    return PagedView("list", location_filter, "Available Equipment", items, LIST_PAGE_SIZE, "equipment")
+
+
+def _status_view(data: list, location_filter: str) -> PagedView:
+    """Equipment with their last maintenance date per frequency."""
+    items = []
+    for raw, eq in zip(data, equipment_from_json(data)):
+        if not location_matches(eq.location, location_filter):
+            continue
+        name = eq.equipment_name or "Unknown"
+        sn = eq.serial_number or "N/A"
+        location = eq.location or "N/A"
+        
+        # Build maintenance dates text
+        dates_text = ""
+        for frequency in ["monthly", "bi_annual", "annual"]:
+            if frequency in eq.schedule:
+                dates_text += f"*{eq.schedule[frequency].label}:* {eq.last_date_display(frequency, '%b %d, %Y')}\n"
+        
+        if not dates_text:
+            dates_text = "No maintenance schedule"
+        
+        equipment_text = f"*{name}*\n"
+        equipment_text += f"S/N: {sn} | Location: {location}\n\n"
+        equipment_text += dates_text
+        
+        items.append((record_key(raw), [{
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": equipment_text
+            }
+        }]))
+    return PagedView("status", location_filter, "Equipment Maintenance Status", items, STATUS_PAGE_SIZE,
+                     "equipment", item_divider=True)
+
+
+def _due_view(view: str, title: str, entries: list, today, location_filter: str) -> PagedView:
+    """Schedule entries from the next-due index with how long until (or since) they are due."""
+    items = []
+    for entry in entries:
+        if not location_matches(entry["location"], location_filter):
+            continue
+        due_date = datetime.fromisoformat(entry["next_due_date"]).date()
+        days_until_due = (due_date - today).days
+        if days_until_due < 0:
+            due_status = f"*OVERDUE by {abs(days_until_due)} day(s)*"
+        elif days_until_due == 0:
+            due_status = "*DUE TODAY*"
+        else:
+            due_status = f"Due in {days_until_due} day(s)"
+        
+        entry_text = f"*{entry['equipment_name']}*\n"
+        entry_text += f"S/N: {entry['serial_number'] or 'N/A'} | Location: {entry['location'] or 'N/A'}\n"
+        entry_text += f"*{FREQUENCY_LABELS[entry['frequency']]}:* {due_date.strftime('%b %d, %Y')} - {due_status}"
+        
+        items.append((f"{entry['key']}/{entry['frequency']}", [{
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": entry_text
+            }
+        }]))
+    return PagedView(view, location_filter, title, items, STATUS_PAGE_SIZE, "item(s)")
+
+
+def open_view(view: str, location_filter: str):
+    """
+    Paged view by name ("list", "status", "overdue" or "due:<days>") for the current
+    data, built once per data version (and day, for due dates), as (cache key, view).
+    None if the equipment data cannot be read or the name is unknown.
+    """
+    location_filter = location_filter.strip()
+    if view in ("list", "status"):
+        index = equipment_index()
+        if index is None or not index.equipment:
+            return None
+        build_view = _list_view if view == "list" else _status_view
+        key = (view, normalize_key(location_filter), index.stamp, None)
+        return key, get_view(key, lambda: build_view(index.equipment, location_filter))
+    
+    if view == "overdue" or (view.startswith("due:") and view[4:].isdigit()):
+        store = open_store(config=config)
+        today = datetime.now().date()
+        
+        def build():
+            # The next-due index is only read when the view is not cached for this data version
+            due_index = DueIndex.load_or_build(store)
+            if view == "overdue":
+                return _due_view(view, "Overdue Maintenance", due_index.overdue(today), today, location_filter)
+            days = min(int(view[4:]), MAX_COMMAND_DAYS)
+            return _due_view(view, f"Maintenance Due Within {days} Days", due_index.due_within(days, today),
+                             today, location_filter)
         
-        # Try partial match
-        for eq in data:
-            eq_name = str(eq.get("equipment_name", "")).strip().lower()
-            if equipment_name.lower() in eq_name or eq_name in equipment_name.lower():
-                return eq
+        key = (view, normalize_key(location_filter), store.stamp(), today)
+        return key, get_view(key, build)
     
     return None
 
 
+def paged_response(view: str, location_filter: str, cursor: dict = None, replace_original: bool = False):
+    """
+    Response with the page of a view that a cursor points to (the first page without one).
+    Page bodies are serialized once per data version and then served from the response cache.
+    """
+    opened = open_view(view, location_filter)
+    if opened is None:
+        return jsonify({
+            "response_type": "ephemeral",
+            "text": "No equipment found."
+        })
+    key, paged = opened
+    body = page_body(key, paged, paged.page_for(cursor), replace_original)
+    return app.response_class(body, mimetype="application/json")
+
+
 @app.route('/slack/command', methods=['POST'])
 def slack_command():
     """Handle Slack slash command."""
@@ -157,118 +466,32 @@ def slack_command():
     user_name = request.form.get('user_name', 'Unknown')
     channel = request.form.get('channel_name', '')
     
-    # Handle list command
-    if text.lower() == 'list':
-        data = load_equipment_data()
-        if not data:
-            return jsonify({
-                "response_type": "ephemeral",
-                "text": "No equipment found."
-            })
-        
-        text_response = "*Available Equipment:*\n\n"
-        for i, eq in enumerate(data[:20], 1):  # Limit to 20 for Slack
-            name = eq.get("equipment_name", "Unknown")
-            sn = eq.get("serial_number", "N/A")
-            location = eq.get("location", "N/A")
-            text_response += f"{i}. *{name}*\n   S/N: {sn} | Location: {location}\n\n"
-        
-        if len(data) > 20:
-            text_response += f"\n_Showing 20 of {len(data)} equipment. Use more specific search._"
-        
-        return jsonify({
-            "response_type": "ephemeral",
-            "text": text_response
-        })
+    parts = text.split()
+    command = subcommand(parts)
     
-    # Handle status command - show equipment with maintenance dates
-    if text.lower() in ['status', 'dates', 'maintenance dates']:
-        data = load_equipment_data()
-        if not data:
-            return jsonify({
-                "response_type": "ephemeral",
-                "text": "No equipment found."
-            })
-        
-        blocks = [
-            {
-                "type": "header",
-                "text": {
-                    "type": "plain_text",
-                    "text": "Equipment Maintenance Status"
-                }
-            },
-            {
-                "type": "divider"
-            }
-        ]
-        
-        for eq in data[:15]:  # Limit to 15 for Slack blocks
-            name = eq.get("equipment_name", "Unknown")
-            sn = eq.get("serial_number", "N/A")
-            location = eq.get("location", "N/A")
-            schedule = eq.get("maintenance_schedule", {})
-            
-            # Build maintenance dates text
-            dates_text = ""
-            if "monthly" in schedule:
-                last_date = schedule["monthly"].get("last_maintenance_date") or eq.get("last_maintenance_date", "N/A")
-                try:
-                    date_obj = datetime.strptime(last_date, "%Y-%m-%d")
-                    formatted = date_obj.strftime("%b %d, %Y")
-                except:
-                    formatted = last_date
-                dates_text += f"*Monthly:* {formatted}\n"
-            
-            if "bi_annual" in schedule:
-                last_date = schedule["bi_annual"].get("last_maintenance_date") or eq.get("last_maintenance_date", "N/A")
-                try:
-                    date_obj = datetime.strptime(last_date, "%Y-%m-%d")
-                    formatted = date_obj.strftime("%b %d, %Y")
-                except:
-                    formatted = last_date
-                dates_text += f"*Bi-Annual:* {formatted}\n"
-            
-            if "annual" in schedule:
-                last_date = schedule["annual"].get("last_maintenance_date") or eq.get("last_maintenance_date", "N/A")
-                try:
-                    date_obj = datetime.strptime(last_date, "%Y-%m-%d")
-                    formatted = date_obj.strftime("%b %d, %Y")
-                except:
-                    formatted = last_date
-                dates_text += f"*Annual:* {formatted}\n"
-            
-            if not dates_text:
-                dates_text = "No maintenance schedule"
-            
-            equipment_text = f"*{name}*\n"
-            equipment_text += f"S/N: {sn} | Location: {location}\n\n"
-            equipment_text += dates_text
-            
-            blocks.append({
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": equipment_text
-                }
-            })
-            blocks.append({
-                "type": "divider"
-            })
-        
-        if len(data) > 15:
-            blocks.append({
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"_Showing 15 of {len(data)} equipment._"
-                }
-            })
-        
-        return jsonify({
-            "response_type": "ephemeral",
-            "blocks": blocks
-        })
+    # Handle list [location]
+    if command == 'list':
+        return paged_response("list", " ".join(parts[1:]))
+    
+    # Handle stats [days] - answered from the columnar completion history
+    if command == 'stats':
+        days = min(int(parts[1]), MAX_COMMAND_DAYS) if len(parts) > 1 else 365
+        since = datetime.now().date() - timedelta(days=days)
+        return jsonify(stats_response(load_stats(open_store(config=config).path, since=since), days))
+    
+    # Handle status overdue / status due [days] [location] - answered from the next-due index,
+    # and status [location] - equipment with maintenance dates
+    if command in ['status', 'dates'] or text.lower() == 'maintenance dates':
+        rest = parts[1:] if command in ['status', 'dates'] else []
+        if rest and rest[0].lower() == 'overdue':
+            return paged_response("overdue", " ".join(rest[1:]))
+        if rest and rest[0].lower() == 'due':
+            if len(rest) > 1 and rest[1].isdigit():
+                days, location_filter = min(int(rest[1]), MAX_COMMAND_DAYS), " ".join(rest[2:])
+            else:
+                days, location_filter = config.get("alert_days_before", 14), " ".join(rest[1:])
+            return paged_response(f"due:{days}", location_filter)
+        return paged_response("status", " ".join(rest))
     
     if not text:
         return jsonify({
@@ -276,6 +499,9 @@ def slack_command():
             "text": "Usage:\n"
                    "• `/maintenance list` - List all equipment\n"
                    "• `/maintenance status` - List equipment with maintenance dates\n"
+                   "• `/maintenance status overdue` - List overdue maintenance\n"
+                   "• `/maintenance status due [days]` - List maintenance due within the next days\n"
+                   "• `/maintenance stats [days]` - On-time rates and completions per technician (default: last 365 days)\n"
                    "• `/maintenance \"Equipment Name\" frequency YYYY-MM-DD [initials]` - Update date\n"
                    "• `/maintenance S/N: serial_number frequency YYYY-MM-DD [initials]` - Update by S/N\n\n"
                    "Examples:\n"
@@ -297,13 +523,22 @@ def slack_command():
         })
     
     # Find equipment
-    equipment = find_equipment_by_name_or_sn(
+    candidates = find_equipment_by_name_or_sn(
         parsed["equipment_name"],
         parsed["serial_number"]
     )
     
-    if not equipment:
-        search_term = parsed["serial_number"] if parsed["serial_number"] else parsed["equipment_name"]
+    if candidates is None:
+        return jsonify({
+            "response_type": "ephemeral",
+            "text": "No equipment found."
+        })
+    
+    search_term = parsed["serial_number"] if parsed["serial_number"] else parsed["equipment_name"]
+    if len(candidates) > 1:
+        return disambiguation_response(search_term, candidates, parsed)
+    
+    if not candidates:
         return jsonify({
             "response_type": "ephemeral",
             "text": f"Equipment not found: {search_term}\n"
@@ -311,28 +546,31 @@ def slack_command():
         })
     
     # Update the date
+    equipment = candidates[0]
     equipment_name = equipment.get("equipment_name")
     serial_number = equipment.get("serial_number")
     
+    # Get initials from parsed message or use username
+    user_initials = parsed.get('initials') or user_name
+    
     success = update_date(
         equipment_name,
         parsed["frequency"],
         parsed["date"],
-        serial_number
+        serial_number,
+        user=user_initials
     )
     
     if success:
-        # Get initials from parsed message or use username
-        user_initials = parsed.get('initials') or user_name
         
-        # Update Excel file for all frequencies
-        excel_result = update_excel_maintenance(
-            equipment_name=equipment_name,
-            serial_number=serial_number or "",
-            frequency=parsed['frequency'],
-            date=parsed['date'],
-            user_name=user_initials
-        )
+        # Update Excel file for all frequencies (in the background; the result follows as a message)
+        ahead = excel_writer.submit({
+            "equipment_name": equipment_name,
+            "serial_number": serial_number or "",
+            "frequency": parsed['frequency'],
+            "date": parsed['date'],
+            "user_name": user_initials
+        }, request.form.get('response_url'))
         
         # Build response message
         response_text = f"*Maintenance Updated*\n"
@@ -341,12 +579,7 @@ def slack_command():
         response_text += f"*Frequency:* {parsed['frequency'].replace('_', '-').title()}\n"
         response_text += f"*Date:* {parsed['date']}\n"
         response_text += f"*Updated by:* {user_initials}"
-        
-        if excel_result:
-            if excel_result['success']:
-                response_text += f"\n*Excel:* Updated successfully"
-            else:
-                response_text += f"\n*Excel:* {excel_result['message']}"
+        response_text += f"\n*Excel:* Queued" + (f" ({ahead} ahead)" if ahead else "")
         
         return jsonify({
             "response_type": "in_channel",
@@ -370,43 +603,57 @@ def slack_command():
 
 @app.route('/slack/list', methods=['POST'])
 def slack_list():
-    """List all equipment."""
+    """List all equipment (same as /maintenance list [location])."""
     token = request.form.get('token')
     if SLACK_VERIFICATION_TOKEN and token != SLACK_VERIFICATION_TOKEN:
         return jsonify({"text": "Invalid token"}), 403
     
-    data = load_equipment_data()
-    
-    if not data:
-        return jsonify({
-            "response_type": "ephemeral",
-            "text": "No equipment found."
-        })
-    
-    text = "*Available Equipment:*\n\n"
-    for i, eq in enumerate(data[:20], 1):  # Limit to 20 for Slack
-        name = eq.get("equipment_name", "Unknown")
-        sn = eq.get("serial_number", "N/A")
-        location = eq.get("location", "N/A")
-        text += f"{i}. *{name}*\n   S/N: {sn} | Location: {location}\n\n"
-    
-    if len(data) > 20:
-        text += f"\n_Showing 20 of {len(data)} equipment. Use more specific search._"
-    
-    return jsonify({
-        "response_type": "ephemeral",
-        "text": text
-    })
+    return paged_response("list", request.form.get('text', ''))
 
 
 @app.route('/slack/interactive', methods=['POST'])
 def slack_interactive():
-    """Handle Slack interactive components (buttons, etc.)."""
-    payload = json.loads(request.form.get('payload', '{}'))
+    """Handle Slack interactive components: Prev/Next buttons of paged listings."""
+    try:
+        payload = json.loads(request.form.get('payload', '{}'))
+    except json.JSONDecodeError:
+        return jsonify({"text": "Invalid payload"}), 400
+    if SLACK_VERIFICATION_TOKEN and payload.get('token') != SLACK_VERIFICATION_TOKEN:
+        return jsonify({"text": "Invalid token"}), 403
+    
+    for action in payload.get('actions', []):
+        if action.get('action_id') not in PAGE_ACTIONS:
+            continue
+        cursor = decode_cursor(action.get('value'))
+        response_url = payload.get('response_url')
+        if cursor is None or not response_url:
+            continue
+        body = paged_response(cursor['v'], str(cursor.get('f', '')), cursor, replace_original=True).get_data()
+        # Slack expects the acknowledgement within 3 seconds; the page replaces the message via response_url
+        threading.Thread(target=post_to_response_url, args=(response_url, body), daemon=True).start()
     
-    # Handle button clicks or other interactions here
-    # For now, just acknowledge
-    return jsonify({"text": "OK"})
+    return "", 200
+
+
+def post_to_response_url(response_url: str, body: bytes):
+    """Send a serialized message to a Slack response_url (errors are printed)."""
+    try:
+        response = requests.post(response_url, data=body, headers={"Content-Type": "application/json"}, timeout=10)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"Error posting to Slack response_url: {e}")
+
+
+@app.route('/excel/status', methods=['GET'])
+def excel_status():
+    """Excel write-behind queue depth, write latency and failures."""
+    return jsonify(excel_writer.status())
+
+
+@app.route('/cache/status', methods=['GET'])
+def cache_status():
+    """Hit/miss counts of the paged view and response caches."""
+    return jsonify(cache_stats())
 
 
 @app.route('/health', methods=['GET'])
@@ -415,9 +662,26 @@ def health():
     return jsonify({"status": "ok", "service": "equipment-maintenance-slack-bot"})
 
 
+def finish_excel_writes():
+    """Write the Excel entries still queued before the process exits."""
+    status = excel_writer.status()
+    pending = status["queue_depth"] + status["in_flight"]
+    if pending:
+        print(f"Writing {pending} queued Excel entr{'y' if pending == 1 else 'ies'}...")
+    if not excel_writer.close(SHUTDOWN_DRAIN_SECONDS):
+        print(f"Warning: Excel writes still pending after {SHUTDOWN_DRAIN_SECONDS:g} seconds were not written")
+
+
+# Also covers servers that import the app (e.g. gunicorn workers stopping)
+atexit.register(finish_excel_writes)
+
+
 if __name__ == '__main__':
     print("Starting Slack Bot Server...")
     print("Make sure to configure Slack slash command to point to this server")
-    print("URL should be: http://your-server:5000/slack/command")
-    app.run(host='0.0.0.0', port=5000, debug=True)
-
+    print(f"URL should be: http://your-server:{SERVER_PORT}/slack/command")
+    if "--debug" in sys.argv:
+        app.run(host=SERVER_HOST, port=SERVER_PORT, debug=True)
+    else:
+        from wsgi_server import serve
+        serve(app, SERVER_HOST, SERVER_PORT, SERVER_THREADS, on_shutdown=finish_excel_writes)
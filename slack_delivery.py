@@ -0,0 +1,174 @@
+"""
+Slack webhook delivery layer
+Reuses one keep-alive HTTP session, splits large Block Kit messages into chunks that
+fit Slack's per-message limits, sends the chunks with bounded concurrency and retries
+with backoff, honouring HTTP 429 Retry-After
+"""
+
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Slack accepts at most 50 blocks per message and 3000 characters per section text
+MAX_BLOCKS_PER_MESSAGE = 50
+MAX_SECTION_TEXT_LENGTH = 3000
+
+# Status codes worth retrying (rate limited or temporary server errors)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def _truncate_block(block: Dict[str, Any]) -> Dict[str, Any]:
+    """Shorten a section's text if it exceeds Slack's limit."""
+    text = block.get("text", {}).get("text")
+    if block.get("type") == "section" and text and len(text) > MAX_SECTION_TEXT_LENGTH:
+        block = copy.deepcopy(block)
+        block["text"]["text"] = text[:MAX_SECTION_TEXT_LENGTH - 3] + "..."
+    return block
+
+
+def split_message(message: Dict[str, Any], max_blocks: int = MAX_BLOCKS_PER_MESSAGE) -> List[Dict[str, Any]]:
+    """
+    Split a Block Kit message into messages that fit Slack's limits.
+
+    The leading blocks up to the first divider (the header) are repeated on every
+    message, with "(n/total)" added to the header text. The remaining blocks are
+    grouped per item (each group ends with a divider) and a group is never split
+    across messages unless it is larger than a whole message on its own.
+    """
+    if "blocks" not in message:
+        return [message]
+    blocks = [_truncate_block(block) for block in message["blocks"]]
+    if len(blocks) <= max_blocks:
+        return [dict(message, blocks=blocks)]
+
+    # Header blocks, up to and including the first divider
+    preamble = []
+    for block in blocks:
+        preamble.append(block)
+        if block.get("type") == "divider":
+            break
+    if len(preamble) >= max_blocks:
+        preamble = []
+    body = blocks[len(preamble):]
+
+    # Item groups, each ending with a divider
+    groups = []
+    current = []
+    for block in body:
+        current.append(block)
+        if block.get("type") == "divider":
+            groups.append(current)
+            current = []
+    if current:
+        groups.append(current)
+
+    capacity = max_blocks - len(preamble)
+    chunks = []
+    chunk = []
+    for group in groups:
+        # Oversized groups are cut into pieces that fill a whole message
+        pieces = [group[i:i + capacity] for i in range(0, len(group), capacity)]
+        for piece in pieces:
+            if chunk and len(chunk) + len(piece) > capacity:
+                chunks.append(chunk)
+                chunk = []
+            chunk.extend(piece)
+    if chunk:
+        chunks.append(chunk)
+
+    messages = []
+    for number, chunk in enumerate(chunks, 1):
+        header = copy.deepcopy(preamble)
+        if header and header[0].get("type") == "header":
+            header[0]["text"]["text"] += f" ({number}/{len(chunks)})"
+        messages.append(dict(message, blocks=header + chunk))
+    return messages
+
+
+class SlackDelivery:
+    """Sends messages to a Slack incoming webhook over a pooled keep-alive session."""
+
+    def __init__(
+        self,
+        webhook_url: str,
+        max_concurrent_sends: int = 2,
+        max_retries: int = 5,
+        backoff_seconds: float = 1.0,
+        timeout: float = 10
+    ):
+        self.webhook_url = webhook_url
+        self.max_concurrent_sends = max(1, max_concurrent_sends)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrent_sends)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _retry_delay(self, response: Optional[requests.Response], attempt: int) -> float:
+        """Seconds to wait before the next attempt: Retry-After if given, else exponential backoff."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return max(0.0, float(retry_after))
+                except ValueError:
+                    pass
+        return self.backoff_seconds * (2 ** attempt)
+
+    def post(self, payload: Dict[str, Any]) -> bool:
+        """Post one message, retrying on rate limits, server errors and connection errors."""
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = self.session.post(self.webhook_url, json=payload, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    response.raise_for_status()
+                    return True
+                error = f"HTTP {response.status_code}"
+            except requests.exceptions.HTTPError as e:
+                status_code = e.response.status_code if e.response is not None else "Unknown"
+                if status_code == 403:
+                    print(f"✗ Slack webhook error (403 Forbidden):")
+                    print(f"  The webhook URL may be invalid, expired, or revoked.")
+                    print(f"  Please check your Slack webhook settings and update config.json")
+                else:
+                    print(f"✗ Slack webhook error ({status_code}): {e}")
+                return False
+            except requests.exceptions.RequestException as e:
+                error = str(e)
+
+            if attempt == self.max_retries:
+                print(f"✗ Error sending Slack notification after {attempt + 1} attempt(s): {error}")
+                return False
+
+            delay = self._retry_delay(response, attempt)
+            print(f"  Slack delivery failed ({error}), retrying in {delay:.1f}s...")
+            time.sleep(delay)
+        return False
+
+    def send(self, message: Dict[str, Any]) -> bool:
+        """
+        Split a message into Slack-sized chunks and send them concurrently. True if all succeeded.
+        With more than one concurrent send the parts can arrive out of order; each part's
+        header is numbered "(n/total)". Use max_concurrent_sends=1 to keep them in order.
+        """
+        chunks = split_message(message)
+        if len(chunks) == 1:
+            return self.post(chunks[0])
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_sends) as executor:
+            results = list(executor.map(self.post, chunks))
+        if not all(results):
+            print(f"✗ {results.count(False)} of {len(chunks)} Slack message(s) could not be sent")
+        return all(results)
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self.session.close()
@@ -0,0 +1,207 @@
+"""
+Paged Slack listings
+Long listings (list, status) are split into fixed-size pages once per data
+version and browsed with Next/Prev buttons, so every response has the same
+bounded size however large the fleet is. The buttons carry a cursor naming the
+view, its filter and the first item of the page; when the data changes between
+clicks, the page is found again by that item (or by page number if it is gone).
+
+Serialized page messages are cached by (view, filter, data version, page), so a
+repeated command is answered with a dict lookup and no JSON encoding; entries for
+older versions are dropped as soon as a new version is seen.
+"""
+
+import json
+import threading
+from typing import Callable, Hashable, List, Dict, Any, Optional, Tuple
+
+from equipment_index import normalize_key
+from render_cache import LRUCache
+
+# action_id of the navigation buttons (handled by the bot's /slack/interactive)
+PAGE_ACTIONS = ("page_prev", "page_next")
+# Built views kept in memory (one per command, filter and data version)
+VIEW_CACHE_SIZE = 64
+# Serialized page messages kept in memory
+RESPONSE_CACHE_SIZE = 512
+
+
+def location_matches(location: Optional[str], location_filter: str) -> bool:
+    """Case-insensitive substring match of a location filter ("" matches everything)."""
+    return normalize_key(location_filter) in normalize_key(location)
+
+
+class PagedView:
+    """
+    A listing split into pages of page_size items. Each item is a (key, blocks)
+    pair; pages are assembled once when the view is built.
+    """
+
+    def __init__(self, view: str, location_filter: str, title: str, items: List[Tuple[str, List[Dict[str, Any]]]],
+                 page_size: int, noun: str = "item(s)", item_divider: bool = False):
+        self.view = view
+        self.location_filter = location_filter
+        self.title = title
+        self.count = len(items)
+        self.noun = noun
+        page_size = max(1, page_size)
+
+        self.pages: List[List[Dict[str, Any]]] = []
+        self.first_keys: List[str] = []
+        self.page_of_key: Dict[str, int] = {}
+        for start in range(0, len(items), page_size):
+            blocks = []
+            for key, item_blocks in items[start:start + page_size]:
+                self.page_of_key.setdefault(key, len(self.pages))
+                blocks.extend(item_blocks)
+                if item_divider:
+                    blocks.append({"type": "divider"})
+            self.pages.append(blocks)
+            self.first_keys.append(items[start][0])
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    def page_for(self, cursor: Optional[Dict[str, Any]]) -> int:
+        """Page number a cursor points to in this (possibly newer) version of the view."""
+        if not cursor or not self.pages:
+            return 0
+        page = self.page_of_key.get(cursor.get("k"))
+        if page is None:
+            try:
+                page = int(cursor.get("p", 0))
+            except (TypeError, ValueError):
+                page = 0
+        return min(max(page, 0), len(self.pages) - 1)
+
+    def _cursor(self, page: int) -> str:
+        return encode_cursor(self.view, self.location_filter, page, self.first_keys[page])
+
+    def message(self, page: int = 0) -> Dict[str, Any]:
+        """Slack message for one page, with Prev/Next buttons when there is more than one."""
+        title = f"{self.title} - {self.location_filter}" if self.location_filter else self.title
+        if not self.pages:
+            return {
+                "response_type": "ephemeral",
+                "text": f"*{title}:* nothing found."
+            }
+
+        blocks = [
+            {
+                "type": "header",
+                "text": {
+                    "type": "plain_text",
+                    "text": title
+                }
+            },
+            {
+                "type": "divider"
+            }
+        ]
+        blocks.extend(self.pages[page])
+        blocks.append({
+            "type": "context",
+            "elements": [{
+                "type": "mrkdwn",
+                "text": f"Page {page + 1} of {len(self.pages)} ({self.count} {self.noun})"
+            }]
+        })
+
+        buttons = []
+        if page > 0:
+            buttons.append({
+                "type": "button",
+                "text": {"type": "plain_text", "text": "◀ Prev"},
+                "action_id": "page_prev",
+                "value": self._cursor(page - 1)
+            })
+        if page < len(self.pages) - 1:
+            buttons.append({
+                "type": "button",
+                "text": {"type": "plain_text", "text": "Next ▶"},
+                "action_id": "page_next",
+                "value": self._cursor(page + 1)
+            })
+        if buttons:
+            blocks.append({
+                "type": "actions",
+                "elements": buttons
+            })
+
+        return {
+            "response_type": "ephemeral",
+            "text": title,
+            "blocks": blocks
+        }
+
+
+def encode_cursor(view: str, location_filter: str, page: int, first_key: str) -> str:
+    """Button value for a page: view name, filter, page number and the key of its first item."""
+    return json.dumps({"v": view, "f": location_filter, "p": page, "k": first_key}, separators=(",", ":"))
+
+
+def decode_cursor(value: str) -> Optional[Dict[str, Any]]:
+    """Cursor from a button value, or None if it is not one."""
+    try:
+        cursor = json.loads(value)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(cursor, dict) or not isinstance(cursor.get("v"), str):
+        return None
+    return cursor
+
+
+_views = LRUCache(VIEW_CACHE_SIZE)
+_responses = LRUCache(RESPONSE_CACHE_SIZE)
+# One lock for both caches (LRUCache is not thread-safe)
+_cache_lock = threading.Lock()
+_current_version: Any = None
+
+
+def _forget_other_versions(version: Any) -> None:
+    """Drop cached views and pages of other data versions (caller holds _cache_lock)."""
+    global _current_version
+    if version != _current_version:
+        _current_version = version
+        _views.discard_matching(lambda key: key[2] != version)
+        _responses.discard_matching(lambda key: key[0][2] != version)
+
+
+def get_view(key: Tuple[str, str, Any, Any], build: Callable[[], PagedView]) -> PagedView:
+    """
+    Built view for key = (view name, normalized filter, data version, extra part such
+    as the day), building it on a miss. Views are shared between request threads and
+    must not be modified.
+    """
+    with _cache_lock:
+        _forget_other_versions(key[2])
+        view = _views.get(key)
+    if view is None:
+        view = build()
+        with _cache_lock:
+            _views.put(key, view)
+    return view
+
+
+def page_body(key: Hashable, view: PagedView, page: int, replace_original: bool = False) -> bytes:
+    """
+    JSON body of a page message of a view got with get_view(key, ...), serialized once.
+    replace_original is set for pages that replace the message the buttons were on.
+    """
+    response_key = (key, page, replace_original)
+    with _cache_lock:
+        body = _responses.get(response_key)
+    if body is None:
+        message = view.message(page)
+        if replace_original:
+            message["replace_original"] = True
+        body = json.dumps(message).encode("utf-8")
+        with _cache_lock:
+            _responses.put(response_key, body)
+    return body
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Size and hit/miss counts of the view and response caches."""
+    with _cache_lock:
+        return {"views": _views.stats(), "responses": _responses.stats()}
@@ -0,0 +1,150 @@
+"""
+Concurrency stress test for maintenance date updates
+Hammers update_maintenance_date from several processes and threads at once against a
+synthetic fleet in a temporary directory, while a reader keeps loading the data, then
+checks that no update was lost and that no reader ever saw a partial file.
+
+Usage:
+    python stress_update_dates.py [--backend json|journal|sqlite|sharded] [--processes N]
+                                  [--threads N] [--updates N] [--fleet N] [--group-commit-ms N]
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import List, Tuple
+
+from benchmark import generate_fleet
+from equipment_store import open_store
+from update_maintenance_date import update_maintenance_date
+
+
+# (equipment_name, serial_number, frequency, date)
+Update = Tuple[str, str, str, str]
+
+
+def _option(name: str, default):
+    """Value following --name on the command line, converted to the default's type."""
+    if name in sys.argv:
+        position = sys.argv.index(name)
+        if position + 1 < len(sys.argv):
+            return type(default)(sys.argv[position + 1])
+    return default
+
+
+def _init_worker(directory: str) -> None:
+    """Run workers inside the test directory (its config.json selects the backend), quietly."""
+    os.chdir(directory)
+    sys.stdout = open(os.devnull, 'w')
+
+
+def _run_updates(updates: List[Update], threads: int) -> int:
+    """Apply updates from a thread pool in this process. Returns the number that failed."""
+    def apply(update: Update) -> bool:
+        name, serial, frequency, completed = update
+        try:
+            return update_maintenance_date(name, frequency, completed, serial, user="stress")
+        except (SystemExit, Exception):
+            # The CLI exits on unreadable or unwritable data
+            return False
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return sum(1 for ok in pool.map(apply, updates) if not ok)
+
+
+def _plan_updates(fleet: list, count: int) -> List[Update]:
+    """
+    Distinct (equipment, frequency) pairs, each with its own date, packed onto as few
+    records as possible so writers contend for the same records.
+    """
+    updates = []
+    for i, equipment in enumerate(fleet):
+        for frequency in equipment["maintenance_schedule"]:
+            completed = (date(2030, 1, 1) + timedelta(days=len(updates))).isoformat()
+            updates.append((equipment["equipment_name"], equipment["serial_number"], frequency, completed))
+            if len(updates) == count:
+                return updates
+    return updates
+
+
+def main():
+    """Main entry point."""
+    backend = _option("--backend", "json")
+    processes = _option("--processes", 4)
+    threads = _option("--threads", 8)
+    update_count = _option("--updates", 400)
+    fleet_size = _option("--fleet", 2000)
+    group_commit_ms = _option("--group-commit-ms", 0)
+
+    directory = tempfile.mkdtemp(prefix="stress_update_dates_")
+    try:
+        fleet = generate_fleet(fleet_size)
+        with open(os.path.join(directory, "equipment_data.json"), 'w') as f:
+            json.dump(fleet, f, indent=2)
+        config = {"storage_backend": backend, "group_commit_ms": group_commit_ms,
+                  "sqlite_database": os.path.join(directory, "equipment.db")}
+        with open(os.path.join(directory, "config.json"), 'w') as f:
+            json.dump(config, f)
+
+        store = open_store(os.path.join(directory, "equipment_data.json"), config)
+        if backend in ("sqlite", "sharded"):
+            store.save_all(fleet)
+
+        updates = _plan_updates(fleet, update_count)
+        shards = [updates[i::processes] for i in range(processes)]
+
+        print(f"Backend: {backend} | {processes} process(es) x {threads} thread(s) | "
+              f"{len(updates)} update(s) | fleet {fleet_size} | group commit {group_commit_ms} ms")
+
+        # Keep reading while the writers run: every read must see a complete file
+        stop = threading.Event()
+        reads = [0, 0]  # [successful, failed]
+
+        def reader():
+            while not stop.is_set():
+                try:
+                    store.load_all()
+                    reads[0] += 1
+                except Exception:
+                    reads[1] += 1
+
+        reader_thread = threading.Thread(target=reader, daemon=True)
+        reader_thread.start()
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(directory,)) as pool:
+            failed = sum(pool.map(_run_updates, shards, [threads] * processes))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        reader_thread.join()
+
+        try:
+            final = {(eq["equipment_name"], eq["serial_number"]): eq for eq in store.load_all()}
+        except Exception as e:
+            print(f"✗ Stress test FAILED: final data is unreadable ({e})")
+            sys.exit(1)
+        lost = [
+            update for update in updates
+            if final[(update[0], update[1])]["maintenance_schedule"][update[2]].get("last_maintenance_date") != update[3]
+        ]
+
+        print(f"Elapsed: {elapsed:.2f} s ({len(updates) / elapsed:.1f} updates/s)")
+        print(f"Failed updates: {failed}")
+        print(f"Lost updates: {len(lost)}")
+        print(f"Reads during the run: {reads[0]} ok, {reads[1]} failed")
+        if failed or lost or reads[1]:
+            print("✗ Stress test FAILED")
+            sys.exit(1)
+        print("✓ Stress test passed")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Deduplicated task catalog
+Each distinct maintenance task text is stored once in <base>.tasks.json and
+schedules in equipment_data.json refer to tasks by id ("task_ids": [0, 3])
+instead of repeating the text. Loaders expand the ids back into the usual
+"tasks" list of strings (all records sharing one string object per task), so
+callers are unaffected. Files without a catalog keep plain task lists.
+
+Usage:
+    python task_catalog.py migrate [equipment_data.json]
+    python task_catalog.py restore [equipment_data.json]
+"""
+
+import json
+import os
+import sys
+from typing import Iterable, Iterator, List, Dict, Any, Optional
+
+from file_lock import FileLock, atomic_write_json
+
+
+def catalog_path_for(equipment_file: str) -> str:
+    """Path of the task catalog that belongs to an equipment data file."""
+    base, _ = os.path.splitext(equipment_file)
+    return f"{base}.tasks.json"
+
+
+class TaskCatalog:
+    """
+    Task texts by id (the position in the list). The catalog is append-only:
+    writers save it before the equipment file, so any reader that loads it after
+    reading the equipment file finds every id that file uses.
+    """
+
+    def __init__(self, tasks: Optional[List[str]] = None):
+        self.tasks: List[str] = list(tasks or [])
+        self.ids: Dict[str, int] = {}
+        for task_id, task in enumerate(self.tasks):
+            self.ids.setdefault(task, task_id)
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["TaskCatalog"]:
+        """Load a catalog file, or return None if there is none."""
+        try:
+            with open(path, 'r') as f:
+                return cls(json.load(f)["tasks"])
+        except FileNotFoundError:
+            return None
+
+    def save(self, path: str) -> None:
+        """Atomically write the catalog (caller holds the equipment file's lock)."""
+        atomic_write_json(path, {"tasks": self.tasks})
+
+    def id_for(self, task: str) -> int:
+        """Id of a task text, added to the catalog if new."""
+        task_id = self.ids.get(task)
+        if task_id is None:
+            task_id = self.ids[task] = len(self.tasks)
+            self.tasks.append(task)
+        return task_id
+
+    def text_for(self, task_id: int) -> str:
+        """Task text of an id (ValueError if the catalog does not have it)."""
+        if not isinstance(task_id, int) or not 0 <= task_id < len(self.tasks):
+            raise ValueError(f"Unknown task id {task_id!r} in the task catalog")
+        return self.tasks[task_id]
+
+
+def _replace_key(schedule: Dict[str, Any], old: str, new: str, value: Any) -> Dict[str, Any]:
+    """Copy of a schedule entry with one key renamed (and re-valued) in place, keeping key order."""
+    return {(new if key == old else key): (value if key == old else item) for key, item in schedule.items()}
+
+
+def expand_tasks(equipment_file: str, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield records with every schedule's "task_ids" replaced by the "tasks" list of strings.
+    The catalog is read on the first record that needs it, i.e. after the equipment file.
+    Plain task lists are passed through, sharing strings with the catalog where they match.
+    """
+    catalog: Optional[TaskCatalog] = None
+    shared: Dict[str, str] = {}
+    for equipment in records:
+        schedule = equipment.get("maintenance_schedule")
+        if isinstance(schedule, dict):
+            for frequency, entry in schedule.items():
+                if not isinstance(entry, dict):
+                    continue
+                if "task_ids" in entry:
+                    if catalog is None:
+                        catalog = TaskCatalog.load(catalog_path_for(equipment_file))
+                        if catalog is None:
+                            raise ValueError(f"{equipment_file} uses task ids but {catalog_path_for(equipment_file)} is missing")
+                        shared.update((task, task) for task in catalog.tasks)
+                    tasks = [catalog.text_for(task_id) for task_id in entry["task_ids"]]
+                    schedule[frequency] = _replace_key(entry, "task_ids", "tasks", tasks)
+                elif isinstance(entry.get("tasks"), list):
+                    entry["tasks"] = [shared.setdefault(task, task) if isinstance(task, str) else task for task in entry["tasks"]]
+        yield equipment
+
+
+def compact_tasks(equipment_file: str, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Data to write to equipment_file: if it has a task catalog, a copy with task lists
+    replaced by ids (new tasks are added to the catalog, which is saved first);
+    otherwise data itself. The caller holds the equipment file's lock.
+    """
+    catalog_path = catalog_path_for(equipment_file)
+    catalog = TaskCatalog.load(catalog_path)
+    if catalog is None:
+        return data
+
+    known = len(catalog)
+    compacted = []
+    for equipment in data:
+        schedule = equipment.get("maintenance_schedule")
+        if isinstance(schedule, dict):
+            new_schedule = {}
+            for frequency, entry in schedule.items():
+                if isinstance(entry, dict) and isinstance(entry.get("tasks"), list) \
+                        and all(isinstance(task, str) for task in entry["tasks"]):
+                    entry = _replace_key(entry, "tasks", "task_ids", [catalog.id_for(task) for task in entry["tasks"]])
+                new_schedule[frequency] = entry
+            equipment = dict(equipment, maintenance_schedule=new_schedule)
+        compacted.append(equipment)
+
+    if len(catalog) > known:
+        catalog.save(catalog_path)
+    return compacted
+
+
+def main():
+    """Convert an equipment file to the task catalog format and back."""
+    if len(sys.argv) < 2 or sys.argv[1] not in ("migrate", "restore"):
+        print("Usage:")
+        print("  python task_catalog.py migrate [equipment_data.json]")
+        print("  python task_catalog.py restore [equipment_data.json]")
+        return
+
+    from equipment_snapshot import save_equipment_json
+    from equipment_store import DEFAULT_EQUIPMENT_FILE, open_store
+
+    store = open_store(sys.argv[2] if len(sys.argv) > 2 else DEFAULT_EQUIPMENT_FILE)
+    if not hasattr(store, "snapshot"):
+        print(f"Error: The task catalog is only used by the json and journal backends, not {type(store).__name__}")
+        sys.exit(1)
+    catalog_path = catalog_path_for(store.path)
+    size_before = os.path.getsize(store.path)
+
+    # The file is rewritten directly (a pending journal is simply replayed on top again)
+    with FileLock(store.path):
+        data = store.load_all()
+        if sys.argv[1] == "migrate":
+            if not os.path.exists(catalog_path):
+                TaskCatalog().save(catalog_path)
+            save_equipment_json(store.path, compact_tasks(store.path, data), store.snapshot)
+        elif os.path.exists(catalog_path):
+            # Plain lists are written before the catalog goes, so readers never miss it
+            save_equipment_json(store.path, data, store.snapshot)
+            os.remove(catalog_path)
+        else:
+            print(f"{store.path} has no task catalog, nothing to restore")
+            return
+
+    size_after = os.path.getsize(store.path)
+    if sys.argv[1] == "migrate":
+        catalog_size = os.path.getsize(catalog_path)
+        print(f"✓ Migrated {store.path} to task ids ({len(TaskCatalog.load(catalog_path))} distinct task(s) in {catalog_path})")
+        print(f"  {size_before / 1e6:.2f} MB -> {size_after / 1e6:.2f} MB + {catalog_size / 1e6:.2f} MB catalog "
+              f"({100 * (1 - (size_after + catalog_size) / size_before):.0f}% smaller)")
+    else:
+        print(f"✓ Restored plain task lists in {store.path} ({size_before / 1e6:.2f} MB -> {size_after / 1e6:.2f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Tests for the vectorized due-date engine
+
+Usage:
+    python -m pytest test_due_engine.py
+"""
+
+import unittest
+from datetime import date, datetime
+
+import numpy as np
+
+from due_engine import DueTable, add_months, parse_dates
+
+
+def _equipment(serial_number: str, last_maintenance_date: str, frequency: str = "monthly") -> dict:
+    return {
+        "equipment_name": "Crimper",
+        "serial_number": serial_number,
+        "maintenance_schedule": {frequency: {"tasks": ["Clean the unit"], "last_maintenance_date": last_maintenance_date}}
+    }
+
+
+class DueEngineTest(unittest.TestCase):
+    def test_add_months_clamps_to_month_end(self):
+        dates = np.array(["2025-08-31", "2024-01-31"], dtype="datetime64[D]")
+        result = add_months(dates, np.array([6, 1]))
+        self.assertEqual(result.tolist(), [date(2026, 2, 28), date(2024, 2, 29)])
+
+    def test_year_zero_is_invalid(self):
+        # strptime("%Y-%m-%d") rejects year 0; NumPy alone would accept it
+        self.assertTrue(np.isnat(parse_dates(["0000-01-01"])[0]))
+
+    def test_dates_outside_python_range_are_skipped(self):
+        table = DueTable([
+            _equipment("1", "0000-01-01"),
+            _equipment("2", "9999-12-15"),
+            _equipment("3", "2026-09-01"),
+        ])
+        self.assertIsNone(table.next_due_date(0))
+        self.assertIsNone(table.next_due_date(1))
+        self.assertEqual(table.next_due_date(2), date(2026, 10, 1))
+
+        items = table.due_items(date(2026, 10, 17), 14)
+        self.assertEqual([item["equipment"]["serial_number"] for item in items], ["3"])
+        self.assertEqual(items[0]["next_due_date"], datetime(2026, 10, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
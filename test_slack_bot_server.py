@@ -0,0 +1,101 @@
+"""
+Tests for slack_bot_server's /maintenance command, run with Flask's test client
+against equipment data in a temporary directory
+
+Usage:
+    python -m pytest test_slack_bot_server.py
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import slack_bot_server
+from excel_write_behind import ExcelWriteBehind
+from equipment_store import open_store
+
+
+def _equipment(name: str, serial_number: str, location: str = "Cleanroom") -> dict:
+    return {
+        "equipment_name": name,
+        "manufacturer": "Blockwise",
+        "model": "CX",
+        "serial_number": serial_number,
+        "location": location,
+        "last_maintenance_date": "2025-01-01",
+        "maintenance_schedule": {"monthly": {"tasks": ["Clean the unit"], "last_maintenance_date": "2025-01-01"}}
+    }
+
+
+class SlackCommandTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(directory.name)
+
+        config = {"log_request_timing": False}
+        with open("config.json", "w") as f:
+            json.dump(config, f)
+        with open("equipment_data.json", "w") as f:
+            json.dump([
+                _equipment("Crimper", "111"),
+                _equipment("Crimper", "222", "Warehouse"),
+                _equipment("Status Board", "333"),
+                _equipment("Stats Logger", "444"),
+            ], f)
+
+        # Excel log entries go to a workbook in the temporary directory
+        excel_writer = ExcelWriteBehind(os.path.join(directory.name, "log.xlsx"))
+        self.addCleanup(excel_writer.close, 10)
+        for name, value in (("config", config), ("LOG_REQUEST_TIMING", False), ("excel_writer", excel_writer)):
+            patcher = mock.patch.object(slack_bot_server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = slack_bot_server.app.test_client()
+
+    def command(self, text: str) -> dict:
+        response = self.client.post("/slack/command", data={"text": text, "user_name": "tester", "channel_name": "test"})
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def last_date(self, serial_number: str) -> str:
+        equipment = next(eq for eq in open_store().load_all() if eq["serial_number"] == serial_number)
+        return equipment["maintenance_schedule"]["monthly"]["last_maintenance_date"]
+
+    def test_disambiguation_suggestion_updates_the_record(self):
+        message = self.command("Crimper monthly 2026-10-01 AB")
+        suggestions = [block["text"]["text"].split("`/maintenance ")[1].rstrip("`")
+                       for block in message["blocks"] if "`/maintenance " in block["text"]["text"]]
+        self.assertEqual(len(suggestions), 2)
+
+        message = self.command(suggestions[1])
+        self.assertIn("Maintenance Updated", message["blocks"][0]["text"]["text"])
+        self.assertEqual(self.last_date("222"), "2026-10-01")
+        self.assertEqual(self.last_date("111"), "2025-01-01")
+
+    def test_serial_number_after_separate_prefix(self):
+        message = self.command("S/N: 111 monthly 2026-10-02")
+        self.assertIn("Maintenance Updated", message["blocks"][0]["text"]["text"])
+        self.assertEqual(self.last_date("111"), "2026-10-02")
+
+    def test_subcommands_with_location(self):
+        self.assertIn("Warehouse", self.command("list Warehouse")["text"])
+        self.assertIn("Cleanroom", self.command("status Cleanroom")["text"])
+
+    def test_equipment_named_like_a_subcommand_is_updated(self):
+        message = self.command("Status Board monthly 2026-10-03")
+        self.assertIn("Maintenance Updated", message["blocks"][0]["text"]["text"])
+        self.assertEqual(self.last_date("333"), "2026-10-03")
+
+    def test_stats_only_with_a_day_count(self):
+        self.assertIn("Last 30 Days", self.command("stats 30")["text"])
+        message = self.command("Stats Logger monthly 2026-10-04")
+        self.assertIn("Maintenance Updated", message["blocks"][0]["text"]["text"])
+        self.assertEqual(self.last_date("444"), "2026-10-04")
+
+
+if __name__ == "__main__":
+    unittest.main()
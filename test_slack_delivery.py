@@ -0,0 +1,120 @@
+"""
+Tests for slack_delivery against a local stub webhook server
+
+Usage:
+    python -m pytest test_slack_delivery.py
+"""
+
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from slack_delivery import MAX_BLOCKS_PER_MESSAGE, MAX_SECTION_TEXT_LENGTH, SlackDelivery
+
+
+class StubWebhook:
+    """
+    Local webhook that records every payload. The first rate_limited requests are
+    answered with 429 and Retry-After; each request takes delay seconds.
+    """
+
+    def __init__(self, rate_limited: int = 0, retry_after: str = "1", delay: float = 0.0):
+        self.rate_limited = rate_limited
+        self.retry_after = retry_after
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub.lock:
+                    stub.requests.append((time.monotonic(), payload))
+                    limited = len(stub.requests) <= stub.rate_limited
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                time.sleep(stub.delay)
+                with stub.lock:
+                    stub.in_flight -= 1
+                if limited:
+                    self.send_response(429)
+                    self.send_header("Retry-After", stub.retry_after)
+                else:
+                    self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/webhook"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _due_message(items: int, text_length: int = 100) -> dict:
+    """A notification like the checker's: header, divider, then 4 blocks per item."""
+    blocks = [{"type": "header", "text": {"type": "plain_text", "text": "Equipment Maintenance Due"}}, {"type": "divider"}]
+    for i in range(items):
+        for _ in range(3):
+            blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": f"{i} " + "x" * text_length}})
+        blocks.append({"type": "divider"})
+    return {"blocks": blocks}
+
+
+class SlackDeliveryTest(unittest.TestCase):
+    def start_stub(self, **kwargs) -> StubWebhook:
+        stub = StubWebhook(**kwargs)
+        self.addCleanup(stub.close)
+        return stub
+
+    def test_retry_waits_for_retry_after(self):
+        stub = self.start_stub(rate_limited=1, retry_after="1")
+        delivery = SlackDelivery(stub.url, backoff_seconds=0.01)
+        self.addCleanup(delivery.close)
+
+        self.assertTrue(delivery.send({"text": "hello"}))
+        self.assertEqual(len(stub.requests), 2)
+        (first, _), (second, payload) = stub.requests
+        self.assertGreaterEqual(second - first, 1.0)
+        self.assertEqual(payload, {"text": "hello"})
+
+    def test_messages_are_split_at_slack_limits(self):
+        stub = self.start_stub()
+        delivery = SlackDelivery(stub.url, max_concurrent_sends=1)
+        self.addCleanup(delivery.close)
+
+        self.assertTrue(delivery.send(_due_message(40, text_length=5000)))
+        payloads = [payload for _, payload in stub.requests]
+        self.assertGreater(len(payloads), 1)
+        for number, payload in enumerate(payloads, 1):
+            self.assertLessEqual(len(payload["blocks"]), MAX_BLOCKS_PER_MESSAGE)
+            self.assertTrue(payload["blocks"][0]["text"]["text"].endswith(f"({number}/{len(payloads)})"))
+            for block in payload["blocks"]:
+                if block["type"] == "section":
+                    self.assertLessEqual(len(block["text"]["text"]), MAX_SECTION_TEXT_LENGTH)
+        # Every item block arrives exactly once (4 per item, minus the repeated header and divider)
+        self.assertEqual(sum(len(payload["blocks"]) - 2 for payload in payloads), 40 * 4)
+
+    def test_concurrent_sends_are_bounded(self):
+        stub = self.start_stub(delay=0.1)
+        delivery = SlackDelivery(stub.url, max_concurrent_sends=2)
+        self.addCleanup(delivery.close)
+
+        self.assertTrue(delivery.send(_due_message(60)))
+        self.assertGreaterEqual(len(stub.requests), 4)
+        self.assertEqual(stub.max_in_flight, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,23 +1,26 @@
 """
 Quick test script to verify the Slack endpoint is working
+
+Usage:
+    python test_slack_endpoint.py
+    python test_slack_endpoint.py load [--requests 500] [--concurrency 20] [--text "status"] [--url http://localhost:5000]
+
+The load test sends slash commands from several threads at once and reports
+latency percentiles and throughput. Use read-only commands (list, status, stats):
+updates would change the equipment data and the Excel log.
 """
 
 import requests
 import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-# Test the health endpoint
-print("Testing health endpoint...")
-try:
-    response = requests.get("http://localhost:5000/health", timeout=5)
-    print(f"Health check: {response.status_code} - {response.json()}")
-except Exception as e:
-    print(f"ERROR: Could not connect to server: {e}")
-    print("Make sure slack_bot_server.py is running!")
-    exit(1)
-
-# Test the Slack command endpoint (simulating Slack's POST request)
-print("\nTesting Slack command endpoint...")
-test_data = {
+DEFAULT_URL = "http://localhost:5000"
+
+# Fields Slack sends with a slash command
+TEST_DATA = {
     'token': 'test-token',
     'team_id': 'T123456',
     'team_domain': 'test',
@@ -31,15 +34,97 @@ test_data = {
     'trigger_id': '123456'
 }
 
-try:
-    response = requests.post("http://localhost:5000/slack/command", data=test_data, timeout=5)
-    print(f"Status: {response.status_code}")
-    print(f"Response: {response.text[:500]}")  # First 500 chars
-except Exception as e:
-    print(f"ERROR: {e}")
 
-print("\n" + "="*60)
-print("If both tests passed, your server is working!")
-print("The issue is likely with Slack app configuration.")
-print("="*60)
+def get_arg(name: str, default):
+    """Value following a --name argument, converted to the default's type."""
+    if name in sys.argv:
+        position = sys.argv.index(name)
+        if position + 1 < len(sys.argv):
+            return type(default)(sys.argv[position + 1])
+    return default
+
+
+def smoke_test(base_url: str):
+    # Test the health endpoint
+    print("Testing health endpoint...")
+    try:
+        response = requests.get(f"{base_url}/health", timeout=5)
+        print(f"Health check: {response.status_code} - {response.json()}")
+    except Exception as e:
+        print(f"ERROR: Could not connect to server: {e}")
+        print("Make sure slack_bot_server.py is running!")
+        exit(1)
+
+    # Test the Slack command endpoint (simulating Slack's POST request)
+    print("\nTesting Slack command endpoint...")
+    try:
+        response = requests.post(f"{base_url}/slack/command", data=TEST_DATA, timeout=5)
+        print(f"Status: {response.status_code}")
+        print(f"Response: {response.text[:500]}")  # First 500 chars
+    except Exception as e:
+        print(f"ERROR: {e}")
+
+    print("\n" + "="*60)
+    print("If both tests passed, your server is working!")
+    print("The issue is likely with Slack app configuration.")
+    print("="*60)
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def load_test(base_url: str, total: int, concurrency: int, text: str):
+    """Send total slash commands from concurrency threads and print latency and throughput."""
+    print(f"Sending {total} '/maintenance {text}' commands to {base_url} from {concurrency} threads...")
+    data = dict(TEST_DATA, text=text)
+    sessions = threading.local()
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def send(_):
+        if not hasattr(sessions, "session"):
+            sessions.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            response = sessions.session.post(f"{base_url}/slack/command", data=data, timeout=30)
+            # Slack gives up on a slash command after 3 seconds
+            ok = response.status_code == 200
+            error = None if ok else f"HTTP {response.status_code}"
+        except requests.exceptions.RequestException as e:
+            ok, error = False, str(e)
+        elapsed = time.perf_counter() - start
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors.append(error)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, range(total)))
+    duration = time.perf_counter() - started
+
+    print(f"\nCompleted {len(latencies)} of {total} request(s) in {duration:.2f} s "
+          f"({len(latencies) / duration:.1f} requests/s)")
+    if latencies:
+        latencies.sort()
+        print(f"Latency: p50 {percentile(latencies, 0.50) * 1000:.1f} ms | "
+              f"p95 {percentile(latencies, 0.95) * 1000:.1f} ms | "
+              f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms | "
+              f"max {latencies[-1] * 1000:.1f} ms")
+        slow = sum(1 for latency in latencies if latency > 3)
+        if slow:
+            print(f"WARNING: {slow} request(s) took over 3 seconds (Slack would show a timeout)")
+    if errors:
+        print(f"Errors: {len(errors)} (first: {errors[0]})")
+
 
+if __name__ == "__main__":
+    base_url = get_arg("--url", DEFAULT_URL).rstrip("/")
+    if len(sys.argv) > 1 and sys.argv[1] == "load":
+        load_test(base_url, get_arg("--requests", 500), get_arg("--concurrency", 20), get_arg("--text", "list"))
+    else:
+        smoke_test(base_url)
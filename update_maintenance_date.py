@@ -3,48 +3,48 @@ Utility script to update maintenance dates after maintenance is completed.
 This ensures each maintenance frequency (monthly, bi-annual, annual) has its own independent date.
 """
 
+import csv
 import json
+import os
+import sqlite3
 import sys
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from equipment_index import EquipmentIndex, get_equipment_index, normalize_key
+from equipment_model import Equipment
+from maintenance_history import format_rate, load_stats
+from equipment_store import open_store
 
 
 def load_equipment_data(filename: str = "equipment_data.json") -> list:
-    """Load equipment data from JSON file."""
+    """Load equipment data from the configured store (filename is used by the JSON backend)."""
+    store = open_store(filename)
     try:
-        with open(filename, 'r') as f:
-            return json.load(f)
+        return store.load_all()
     except FileNotFoundError:
         print(f"Error: {filename} not found!")
         sys.exit(1)
     except json.JSONDecodeError:
         print(f"Error: Invalid JSON in {filename}!")
         sys.exit(1)
+    except sqlite3.Error as e:
+        print(f"Error reading {store.path}: {e}")
+        sys.exit(1)
 
 
 def save_equipment_data(data: list, filename: str = "equipment_data.json") -> None:
-    """Save equipment data to JSON file."""
+    """Save equipment data to the configured store (filename is used by the JSON backend)."""
+    store = open_store(filename)
     try:
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
-        print(f"✓ Successfully updated {filename}")
+        store.save_all(data)
+        print(f"✓ Successfully updated {store.path}")
     except Exception as e:
         print(f"Error saving file: {e}")
         sys.exit(1)
 
 
-def find_equipment(data: list, equipment_name: str, serial_number: Optional[str] = None) -> Optional[dict]:
-    """Find equipment by name and optionally serial number."""
-    for equipment in data:
-        if equipment.get("equipment_name", "").lower() == equipment_name.lower():
-            if serial_number is None:
-                return equipment
-            elif equipment.get("serial_number", "").lower() == serial_number.lower():
-                return equipment
-    return None
-
-
-def list_equipment(data: list) -> None:
+def list_equipment(data: Iterable[dict]) -> None:
     """List all equipment with their details."""
     print("\n=== Available Equipment ===\n")
     for i, equipment in enumerate(data, 1):
@@ -54,17 +54,11 @@ def list_equipment(data: list) -> None:
         print(f"{i}. {name} (S/N: {serial}) - {location}")
         
         # Show maintenance frequencies
-        schedule = equipment.get("maintenance_schedule", {})
+        model = Equipment.from_dict(equipment)
         frequencies = []
-        if "monthly" in schedule:
-            last_date = schedule["monthly"].get("last_maintenance_date") or equipment.get("last_maintenance_date", "N/A")
-            frequencies.append(f"Monthly (last: {last_date})")
-        if "bi_annual" in schedule:
-            last_date = schedule["bi_annual"].get("last_maintenance_date") or equipment.get("last_maintenance_date", "N/A")
-            frequencies.append(f"Bi-Annual (last: {last_date})")
-        if "annual" in schedule:
-            last_date = schedule["annual"].get("last_maintenance_date") or equipment.get("last_maintenance_date", "N/A")
-            frequencies.append(f"Annual (last: {last_date})")
+        for frequency in ["monthly", "bi_annual", "annual"]:
+            if frequency in model.schedule:
+                frequencies.append(f"{model.schedule[frequency].label} (last: {model.last_date_display(frequency)})")
         
         if frequencies:
             print(f"   Maintenance: {', '.join(frequencies)}")
@@ -76,7 +70,8 @@ def update_maintenance_date(
     frequency: str,
     date: str,
     serial_number: Optional[str] = None,
-    filename: str = "equipment_data.json"
+    filename: str = "equipment_data.json",
+    user: Optional[str] = None
 ) -> bool:
     """
     Update the last maintenance date for a specific equipment and frequency.
@@ -87,6 +82,7 @@ def update_maintenance_date(
         date: Date in YYYY-MM-DD format
         serial_number: Optional serial number to identify specific equipment
         filename: Path to equipment data file
+        user: Who did the maintenance (kept in the completion history by the journal backend)
     
     Returns:
         True if successful, False otherwise
@@ -104,17 +100,22 @@ def update_maintenance_date(
         print(f"Error: Invalid frequency. Must be one of: {', '.join(valid_frequencies)}")
         return False
     
-    # Load data
-    data = load_equipment_data(filename)
-    
     # Find equipment
-    equipment = find_equipment(data, equipment_name, serial_number)
+    store = open_store(filename)
+    try:
+        equipment = store.find(equipment_name, serial_number)
+    except FileNotFoundError:
+        print(f"Error: {filename} not found!")
+        sys.exit(1)
+    except json.JSONDecodeError:
+        print(f"Error: Invalid JSON in {filename}!")
+        sys.exit(1)
     if not equipment:
         print(f"Error: Equipment '{equipment_name}' not found!")
         if serial_number:
             print(f"   (with serial number: {serial_number})")
         print("\nAvailable equipment:")
-        list_equipment(data)
+        list_equipment(store.iter_all())
         return False
     
     # Check if frequency exists in schedule
@@ -123,18 +124,13 @@ def update_maintenance_date(
         print(f"Error: Equipment '{equipment_name}' does not have {frequency} maintenance schedule!")
         return False
     
-    # Update the date
-    # Store frequency-specific date in the schedule
-    maintenance_schedule[frequency.lower()]["last_maintenance_date"] = date
-    
-    # Also update the general last_maintenance_date if it's the only/maintenance type
-    # (for backward compatibility)
-    schedule_keys = list(maintenance_schedule.keys())
-    if len(schedule_keys) == 1 and schedule_keys[0] == frequency.lower():
-        equipment["last_maintenance_date"] = date
-    
-    # Save data
-    save_equipment_data(data, filename)
+    # Update the date (the store also keeps the next-due index in step)
+    try:
+        store.set_last_maintenance_date(equipment, frequency.lower(), date, user)
+        print(f"✓ Successfully updated {store.path}")
+    except Exception as e:
+        print(f"Error saving file: {e}")
+        sys.exit(1)
     
     print(f"\n✓ Updated {equipment_name} {frequency} maintenance date to {date}")
     if serial_number:
@@ -143,12 +139,242 @@ def update_maintenance_date(
     return True
 
 
+# Column names accepted in bulk files, mapped to the field they fill
+BULK_COLUMNS = {
+    "equipment_name": "equipment_name",
+    "name": "equipment_name",
+    "serial_number": "serial_number",
+    "serial": "serial_number",
+    "s/n": "serial_number",
+    "frequency": "frequency",
+    "date": "date",
+    "initials": "initials",
+    "user": "initials",
+}
+
+
+def read_bulk_rows(path: str) -> List[Tuple[int, Dict[str, str]]]:
+    """
+    Read completion rows from a CSV file (with a header row) or a JSON Lines file.
+    Returns (line number, row) pairs with normalized field names.
+    """
+    def normalize(raw: dict) -> Dict[str, str]:
+        row = {}
+        for key, value in raw.items():
+            field = BULK_COLUMNS.get(str(key).strip().lower())
+            if field and value is not None and str(value).strip():
+                row[field] = str(value).strip()
+        return row
+    
+    rows = []
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        if os.path.splitext(path)[1].lower() in (".jsonl", ".ndjson", ".json"):
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    raw = json.loads(line)
+                except json.JSONDecodeError as e:
+                    rows.append((line_number, {"error": f"Invalid JSON ({e.msg})"}))
+                    continue
+                rows.append((line_number, normalize(raw) if isinstance(raw, dict) else {"error": "Expected a JSON object"}))
+        else:
+            reader = csv.DictReader(f)
+            for raw in reader:
+                rows.append((reader.line_num, normalize(raw)))
+    return rows
+
+
+def bulk_update(path: str, filename: str = "equipment_data.json", excel: bool = False, dry_run: bool = False) -> bool:
+    """
+    Record many completions from a CSV or JSON Lines file in one load/validate/save pass.
+    
+    Each row needs a frequency, a date (YYYY-MM-DD) and an equipment name and/or
+    serial number; initials are optional. Rows that fail validation are reported
+    and skipped, the rest are saved together.
+    
+    Args:
+        path: CSV (header: name/serial/frequency/date/initials) or .jsonl file
+        filename: Path to equipment data file
+        excel: Also add the entries to the Excel maintenance log (one workbook save)
+        dry_run: Only validate, do not save anything
+    
+    Returns:
+        True if every row was recorded (or would be, with dry_run)
+    """
+    try:
+        rows = read_bulk_rows(path)
+    except OSError as e:
+        print(f"Error: Could not read {path}: {e}")
+        return False
+    
+    store = open_store(filename)
+    try:
+        index = get_equipment_index(store)
+    except FileNotFoundError:
+        print(f"Error: {filename} not found!")
+        return False
+    except json.JSONDecodeError:
+        print(f"Error: Invalid JSON in {filename}!")
+        return False
+    
+    valid_frequencies = ["monthly", "bi_annual", "annual"]
+    errors: List[Tuple[int, str]] = []  # (line number, message)
+    accepted = []  # (line number, equipment, frequency, date, initials)
+    for line_number, row in rows:
+        if "error" in row:
+            errors.append((line_number, row["error"]))
+            continue
+        
+        frequency = row.get("frequency", "").lower().replace("-", "_")
+        if frequency not in valid_frequencies:
+            errors.append((line_number, f"Invalid frequency '{row.get('frequency', '')}'. Must be one of: {', '.join(valid_frequencies)}"))
+            continue
+        
+        date = row.get("date", "")
+        try:
+            datetime.strptime(date, "%Y-%m-%d")
+        except ValueError:
+            errors.append((line_number, f"Invalid date '{date}'. Please use YYYY-MM-DD"))
+            continue
+        
+        name = row.get("equipment_name")
+        serial = row.get("serial_number")
+        if serial:
+            equipment = index.get_by_serial(serial)
+            matches = [equipment] if equipment is not None else []
+            if name:
+                matches = [eq for eq in matches if normalize_key(eq.get("equipment_name")) == normalize_key(name)]
+        elif name:
+            matches = index.get_by_name(name)
+        else:
+            errors.append((line_number, "Equipment name or serial number is required"))
+            continue
+        
+        label = f"'{name}'" if name else f"S/N {serial}"
+        if not matches:
+            errors.append((line_number, f"Equipment {label} not found"))
+            continue
+        if len(matches) > 1:
+            serials = ", ".join(str(eq.get("serial_number", "N/A")) for eq in matches)
+            errors.append((line_number, f"{len(matches)} equipment match {label} (S/N: {serials}); add the serial number"))
+            continue
+        equipment = matches[0]
+        if frequency not in equipment.get("maintenance_schedule", {}):
+            errors.append((line_number, f"Equipment {label} does not have {frequency} maintenance schedule"))
+            continue
+        
+        accepted.append((line_number, equipment, frequency, date, row.get("initials")))
+    
+    recorded = []
+    if accepted and not dry_run:
+        try:
+            results = store.record_completions([(eq, frequency, date, initials) for _, eq, frequency, date, initials in accepted])
+        except Exception as e:
+            print(f"Error saving file: {e}")
+            return False
+        for entry, error in zip(accepted, results):
+            if error:
+                errors.append((entry[0], error))
+            else:
+                recorded.append(entry)
+    
+    if dry_run:
+        print(f"\n✓ {len(accepted)} of {len(rows)} row(s) valid (dry run, nothing saved)")
+    else:
+        print(f"\n✓ Recorded {len(recorded)} of {len(rows)} completion(s) in {store.path}")
+    if errors:
+        print(f"\n{len(errors)} row(s) with errors:")
+        for line_number, message in sorted(errors):
+            print(f"  Line {line_number}: {message}")
+    
+    if excel and recorded:
+        from excel_updater import update_excel_maintenance_batch
+        excel_results = update_excel_maintenance_batch([
+            {
+                "equipment_name": equipment.get("equipment_name"),
+                "serial_number": equipment.get("serial_number") or "",
+                "frequency": frequency,
+                "date": date,
+                "user_name": initials or "Bulk import"
+            }
+            for _, equipment, frequency, date, initials in recorded
+        ])
+        excel_failures = [(entry[0], result["message"]) for entry, result in zip(recorded, excel_results) if not result["success"]]
+        print(f"\nExcel: {len(recorded) - len(excel_failures)} of {len(recorded)} entry(ies) added")
+        for line_number, message in excel_failures:
+            print(f"  Line {line_number}: {message}")
+    
+    return not errors
+
+
+def show_history(equipment_name: Optional[str] = None, serial_number: Optional[str] = None) -> None:
+    """Print recorded completions (journal storage backend only)."""
+    store = open_store()
+    if not store.keeps_history:
+        print("Completion history is only kept with \"storage_backend\": \"journal\" in config.json.")
+        return
+    
+    events = store.history(equipment_name, serial_number)
+    print(f"\n=== Maintenance History ({len(events)} completion(s)) ===\n")
+    for event in events:
+        serial = event.get("serial_number") or "N/A"
+        by = f" by {event['user']}" if event.get("user") else ""
+        print(f"{event['date']}  {event['equipment_name']} (S/N: {serial}) - {event['frequency']}{by}  [recorded {event['recorded_at']}]")
+
+
+def show_stats(since: Optional[str] = None, asset: Optional[str] = None) -> None:
+    """Print on-time rates, lateness and completions per technician from the completion history."""
+    store = open_store()
+    try:
+        since_date = datetime.strptime(since, "%Y-%m-%d").date() if since else None
+    except ValueError:
+        print(f"Error: Invalid date format '{since}'. Use YYYY-MM-DD")
+        return
+    stats = load_stats(store.path, since=since_date)
+    
+    period = f" since {since}" if since else ""
+    print(f"\n=== Maintenance Statistics ({len(stats)} completion(s){period}) ===\n")
+    if not len(stats):
+        print("No completions recorded yet.")
+        return
+    
+    if asset:
+        for row in stats.asset_lateness(asset, period="M"):
+            print(f"{row['equipment_name']} ({row['asset']}): {row['average_days_late']:+.1f} days late on average "
+                  f"over {row['completions']} completion(s)")
+            for cell in row["periods"]:
+                print(f"  {cell['period']}  {cell['average_days_late']:+6.1f} days  ({cell['completions']} completion(s))")
+            return
+        print(f"No completions with a known due date for '{asset}'.")
+        return
+    
+    overall = stats.overall()
+    print(f"On time: {format_rate(overall['on_time_rate'])} | Late: {overall['late']} | "
+          f"Average days overdue: {overall['average_days_overdue']:.1f}")
+    
+    print("\nBy location:")
+    for row in stats.by_location():
+        print(f"  {row['key']:<24} on time {format_rate(row['on_time_rate']):>4} | {row['completions']:>6} completion(s) | "
+              f"{row['late']} late, {row['average_days_overdue']:.1f} days overdue on average")
+    
+    print("\nBy technician:")
+    for row in stats.by_technician():
+        print(f"  {row['key']:<24} {row['completions']:>6} completion(s) | on time {format_rate(row['on_time_rate'])}")
+    
+    print("\nMost overdue equipment (average days late per year):")
+    for row in stats.asset_lateness(period="Y"):
+        years = ", ".join(f"{cell['period']}: {cell['average_days_late']:+.1f}" for cell in row["periods"])
+        print(f"  {row['equipment_name']} ({row['asset']}): {row['average_days_late']:+.1f}  [{years}]")
+
+
 def interactive_update():
     """Interactive mode to update maintenance dates."""
     print("=== Equipment Maintenance Date Updater ===\n")
     
     data = load_equipment_data()
     list_equipment(data)
+    index = EquipmentIndex(data)
     
     # Get equipment name
     equipment_name = input("Enter equipment name: ").strip()
@@ -157,7 +383,7 @@ def interactive_update():
         return
     
     # Check if multiple equipment with same name
-    matches = [eq for eq in data if eq.get("equipment_name", "").lower() == equipment_name.lower()]
+    matches = index.get_by_name(equipment_name)
     if len(matches) > 1:
         print(f"\nFound {len(matches)} equipment with name '{equipment_name}':")
         for i, eq in enumerate(matches, 1):
@@ -192,8 +418,36 @@ def main():
     if len(sys.argv) > 1:
         # Command-line mode
         if sys.argv[1] == "list":
-            data = load_equipment_data()
-            list_equipment(data)
+            # Stream the records so output starts right away on large files
+            try:
+                list_equipment(open_store().iter_all())
+            except FileNotFoundError:
+                print("Error: equipment_data.json not found!")
+            except ValueError:
+                print("Error: Invalid JSON in equipment_data.json!")
+        elif sys.argv[1] == "history":
+            # update_maintenance_date.py history [equipment_name] [serial_number]
+            equipment_name = sys.argv[2] if len(sys.argv) > 2 else None
+            serial_number = sys.argv[3] if len(sys.argv) > 3 else None
+            show_history(equipment_name, serial_number)
+        elif sys.argv[1] == "stats":
+            # update_maintenance_date.py stats [--since YYYY-MM-DD] [--asset serial_number]
+            since = sys.argv[sys.argv.index("--since") + 1] if "--since" in sys.argv[:-1] else None
+            asset = sys.argv[sys.argv.index("--asset") + 1] if "--asset" in sys.argv[:-1] else None
+            show_stats(since, asset)
+        elif sys.argv[1] == "bulk":
+            # update_maintenance_date.py bulk <file.csv|file.jsonl> [--excel] [--dry-run]
+            if len(sys.argv) < 3:
+                print("Usage: python update_maintenance_date.py bulk <file.csv|file.jsonl> [--excel] [--dry-run]")
+                sys.exit(1)
+            ok = bulk_update(sys.argv[2], excel="--excel" in sys.argv, dry_run="--dry-run" in sys.argv)
+            sys.exit(0 if ok else 1)
+        elif sys.argv[1] == "compact":
+            store = open_store()
+            if hasattr(store, "compact"):
+                print(f"✓ Folded {store.compact()} journal event(s) into {store.path}")
+            else:
+                print("Nothing to compact: the configured storage backend has no journal.")
         elif len(sys.argv) >= 4:
             # update_maintenance_date.py <equipment_name> <frequency> <date> [serial_number]
             equipment_name = sys.argv[1]
@@ -204,11 +458,17 @@ def main():
         else:
             print("Usage:")
             print("  python update_maintenance_date.py list")
+            print("  python update_maintenance_date.py history [equipment_name] [serial_number]")
+            print("  python update_maintenance_date.py compact")
+            print("  python update_maintenance_date.py stats [--since YYYY-MM-DD] [--asset serial_number]")
+            print("  python update_maintenance_date.py bulk <file.csv|file.jsonl> [--excel] [--dry-run]")
             print("  python update_maintenance_date.py <equipment_name> <frequency> <date> [serial_number]")
             print("  python update_maintenance_date.py  (interactive mode)")
             print("\nExample:")
             print("  python update_maintenance_date.py 'Oil Free Air Compressor' monthly 2025-08-25")
             print("  python update_maintenance_date.py 'Blockwise Crimper' bi_annual 2025-08-25 14024")
+            print("  python update_maintenance_date.py bulk completions.csv --excel")
+            print("\nBulk file columns: name, serial, frequency, date, initials")
     else:
         # Interactive mode
         interactive_update()
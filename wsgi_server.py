@@ -0,0 +1,69 @@
+"""
+Production WSGI server for the Slack bot
+Serves the Flask app with a fixed pool of request threads (waitress when it is
+installed, otherwise a thread-pooled werkzeug server) instead of the development
+server, and shuts down gracefully on Ctrl+C or SIGTERM: no new connections are
+accepted, requests in progress finish, then the on_shutdown callback runs (the bot
+uses it to finish queued Excel writes).
+
+Several processes can serve the same app (e.g. gunicorn -w 4 slack_bot_server:app
+on Linux); each keeps its own caches, which are revalidated against the equipment
+data on every request.
+"""
+
+import signal
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from werkzeug.serving import BaseWSGIServer
+
+try:
+    import waitress
+except ImportError:
+    waitress = None
+
+
+class PooledWSGIServer(socketserver.ThreadingMixIn, BaseWSGIServer):
+    """werkzeug server that handles requests on a fixed number of threads."""
+
+    def __init__(self, host: str, port: int, app: Any, threads: int):
+        super().__init__(host, port, app)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="wsgi")
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self):
+        # Stop listening, then let accepted requests finish
+        print("Shutting down: finishing requests in progress...")
+        super().server_close()
+        self._pool.shutdown(wait=True)
+
+
+def _stop_on_sigterm() -> None:
+    """Treat SIGTERM (service stop, container shutdown) like Ctrl+C."""
+    def handler(signum, frame):
+        raise KeyboardInterrupt
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, handler)
+
+
+def serve(app: Any, host: str = "0.0.0.0", port: int = 5000, threads: int = 8,
+          on_shutdown: Optional[Callable[[], None]] = None) -> None:
+    """Serve app until interrupted, then shut down gracefully."""
+    _stop_on_sigterm()
+    try:
+        if waitress is not None:
+            print(f"Serving on http://{host}:{port} with waitress ({threads} threads)")
+            # waitress waits for requests in progress when interrupted
+            waitress.serve(app, host=host, port=port, threads=threads)
+        else:
+            server = PooledWSGIServer(host, port, app, threads)
+            print(f"Serving on http://{host}:{port} ({threads} threads; install waitress for a faster server)")
+            # Returns on Ctrl+C / SIGTERM once requests in progress have finished (server_close)
+            server.serve_forever()
+    finally:
+        if on_shutdown is not None:
+            on_shutdown()
+        print("Server stopped.")